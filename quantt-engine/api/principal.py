@@ -5,6 +5,8 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 
 from core.bot import TradingBot
+from data.cache import cache_stats
+from data.resilience import breaker_states
 from utils.stream_manager import log_stream
 
 route = APIRouter()
@@ -69,6 +71,18 @@ def get_status():
     return {"status": "Online"}
 
 
+@route.get("/bot/cache")
+def get_cache_stats():
+    """Hit / miss / load latency counters of the market data caches."""
+    return cache_stats()
+
+
+@route.get("/bot/circuits")
+def get_circuits():
+    """Circuit breaker state of every exchange endpoint called so far."""
+    return breaker_states()
+
+
 @route.get("/bot/logging")
 def log_sink():
     return StreamingResponse(log_stream.generator(), media_type="text/event-stream")
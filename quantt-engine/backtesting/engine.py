@@ -0,0 +1,474 @@
+"""
+engine.py
+Event-driven backtester replaying the live strategy over historical candles.
+
+Every closed candle of every symbol is one event, processed in time order on
+a simulated clock (nothing waits between candles):
+    - verdicts come from the evaluation graph core.engine uses, on the same
+      42-candle windows and the same streamed indicators (IndicatorStreams
+      fed every candle from the first one), computed up front through
+      strategy.batch in stacked chunks (spread over worker processes), so
+      replay is not paced by the per-candle Python loop.
+    - a tradable verdict on a flat symbol goes through the live gates:
+      confidence, stops from signal_generator.get_loss_and_profit_stops,
+      size from risk_manager.position_size on the simulated free balance
+      scaled by strength, SL distance and risk/reward checks.
+    - the entry is placed at the signal close and fills on the next candle:
+      at its open for market execution; for limit execution when the candle
+      trades through the price, cancelled otherwise (there is no order book
+      to run blp on).
+    - SL / TP / liquidation are checked within every candle: a stop wins over
+      a take profit hit in the same candle, a candle that gaps past a level
+      fills at its open.
+    - open positions pay (or receive) funding every 8 hours.
+Closed trades are dicts shaped as reporting_portfolio.roll.get_closed_trades
+builds them, plus their exit reason and funding, so BacktestResult serves the
+same reporting_portfolio.series as the live reports.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from loguru import logger
+from numpy.lib.stride_tricks import sliding_window_view
+
+import execution.risk_manager as risk_manager
+import strategy.batch as batch
+import strategy.signal_generator as sg
+import utils.math as smath
+from config import risk, settings
+from data.archive import archive
+from data.frame import CandleFrame
+from reporting_portfolio import series
+from strategy.streaming import STREAMED, IndicatorStreams
+
+# Candles per evaluated window, the cached_p42 window of the live engine
+WINDOW = 42
+# Windows stacked per strategy.batch pass (and per worker job)
+CHUNK = 2048
+
+MAKER_FEE = 0.0002
+TAKER_FEE = 0.0004
+# Funding paid by longs (received by shorts) per interval, as a fraction of
+# the position value
+FUNDING_RATE = 0.0001
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+# Fraction of the position value that has to stay as margin
+MAINTENANCE_MARGIN = 0.004
+
+# Live engine gates (core.engine)
+MIN_AMOUNT = 0.01
+MIN_STOP_DISTANCE = 0.003
+MIN_RISK_REWARD = 1.5
+
+
+def _ts_to_dt(ts_ms: float) -> datetime:
+    """Convert a millisecond Unix timestamp to a UTC datetime."""
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+
+
+class BacktestResult(NamedTuple):
+    trades: List[dict]
+    balance_curve: List[dict]  # {timestamp (ISO), balance} at every exit
+    balance: float
+    bars: int
+    elapsed: float
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.elapsed if self.elapsed > 0 else 0.0
+
+    # Same series as reporting_portfolio.roll, from the simulated trades
+
+    @property
+    def equity_curve(self) -> List[dict]:
+        """Cumulative trade P&L, {timestamp (ISO), equity} at every exit."""
+        return series.equity_curve(self.trades)
+
+    @property
+    def daily_pnl(self) -> List[dict]:
+        return series.daily_pnl(self.trades)
+
+    @property
+    def drawdown_series(self) -> List[dict]:
+        return series.drawdown_series(self.trades)
+
+    @property
+    def daily_trade_count(self) -> List[dict]:
+        return series.daily_trade_count(self.trades)
+
+
+# ---------------- Signals ---------------- #
+
+
+def _stream_readings(candles: np.ndarray, names: List[str]) -> List[dict]:
+    """IndicatorStreams readings of `names` after each candle of `candles`, in order."""
+    streams = IndicatorStreams(WINDOW, names)
+    readings = []
+    for candle in np.asarray(candles).tolist():
+        streams.push(candle)
+        readings.append(streams.readings())
+    return readings
+
+
+def _evaluate_chunk(
+    symbol: str,
+    candles: np.ndarray,
+    readings: List[dict],
+    parameters: list,
+    acceptable_confidence: int,
+):
+    """
+    Tradable verdicts of every WINDOW-candle window of `candles`, aligned to
+    the window's last candle: (side +1 / -1 / 0, strength, (stop loss, take
+    profit)). `readings` holds the stream readings at the last candle of each
+    window. Windows the per-symbol path rejects (ValueError) stay 0.
+    """
+    windows = np.swapaxes(sliding_window_view(candles, WINDOW, axis=0), 1, 2)
+    side = np.zeros(len(windows), dtype=np.int8)
+    strength = np.zeros(len(windows))
+    stops = np.full((len(windows), 2), np.nan)
+
+    evaluations = batch.evaluate_frames(
+        [symbol] * len(windows), windows, parameters, readings
+    )
+    for i, evaluation in enumerate(evaluations):
+        if evaluation is None:
+            evaluation = sg.MarketEvaluation(
+                symbol, CandleFrame(windows[i]), readings[i]
+            )
+            try:
+                evaluation.evaluate(parameters)
+            except ValueError:
+                continue
+
+        verdict = evaluation.verdict
+        direction = verdict["direction"]
+        if direction == "neutral":
+            continue
+        if verdict["confidence"] * 100 < acceptable_confidence:
+            continue
+
+        side[i] = 1 if direction == "buy" else -1
+        strength[i] = verdict["strength"]
+        stops[i] = sg.get_loss_and_profit_stops(symbol, direction, evaluation)[:2]
+
+    return side, strength, stops
+
+
+# ---------------- Backtester ---------------- #
+
+
+class Backtester:
+    """
+    One net position per symbol, margined from one shared quote balance.
+    Defaults (parameters, execution, leverage, sizing, confidence) are the
+    live configuration's.
+    """
+
+    def __init__(
+        self,
+        balance: float = 10_000.0,
+        parameters: Optional[List[str]] = None,
+        execution_order: Optional[str] = None,
+        maker_fee: float = MAKER_FEE,
+        taker_fee: float = TAKER_FEE,
+        funding_rate: float = FUNDING_RATE,
+        maintenance_margin: float = MAINTENANCE_MARGIN,
+        workers: Optional[int] = None,
+    ):
+        trading_config = settings.watcher.get_config()
+        self.initial_balance = balance
+        self.parameters = parameters or trading_config.list_of_parameters
+        self.execution_order = execution_order or trading_config.execution_order
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.funding_rate = funding_rate
+        self.maintenance_margin = maintenance_margin
+        self.workers = workers or os.cpu_count() or 1
+
+    def signals(self, candles: Dict[str, np.ndarray]) -> Dict[str, tuple]:
+        """_evaluate_chunk arrays of every candle of every symbol."""
+        acceptable_confidence = risk.watcher.get_config().acceptable_confidence
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers)
+
+        # Only the streamed indicators the parameters vote with
+        parameters_lower = [p.lower() for p in self.parameters]
+        names = [name for name in STREAMED if name in parameters_lower]
+        histories = list(candles.values())
+
+        try:
+            # The streams run along the whole series, one job per symbol
+            if pool is not None and len(candles) > 1:
+                streamed = list(
+                    pool.map(_stream_readings, histories, [names] * len(histories))
+                )
+            else:
+                streamed = [_stream_readings(rows, names) for rows in histories]
+
+            jobs = []
+            for (symbol, rows), readings in zip(candles.items(), streamed):
+                for start in range(0, len(rows) - WINDOW + 1, CHUNK):
+                    chunk = rows[start : start + CHUNK + WINDOW - 1]
+                    chunk_readings = readings[
+                        start + WINDOW - 1 : start + CHUNK + WINDOW - 1
+                    ]
+                    jobs.append(
+                        (
+                            symbol,
+                            chunk,
+                            chunk_readings,
+                            self.parameters,
+                            acceptable_confidence,
+                        )
+                    )
+
+            if pool is not None and len(jobs) > 1:
+                results = list(pool.map(_evaluate_chunk, *zip(*jobs)))
+            else:
+                results = [_evaluate_chunk(*job) for job in jobs]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        # Candles before the first full window have no verdict
+        parts = {
+            symbol: [
+                (
+                    np.zeros(min(WINDOW - 1, len(rows)), dtype=np.int8),
+                    np.zeros(min(WINDOW - 1, len(rows))),
+                    np.full((min(WINDOW - 1, len(rows)), 2), np.nan),
+                )
+            ]
+            for symbol, rows in candles.items()
+        }
+        for (symbol, *_), result in zip(jobs, results):
+            parts[symbol].append(result)
+
+        return {
+            symbol: tuple(np.concatenate(arrays) for arrays in zip(*chunks))
+            for symbol, chunks in parts.items()
+        }
+
+    def run(
+        self, candles: Dict[str, np.ndarray], timeframe: Optional[str] = None
+    ) -> BacktestResult:
+        """Replay {symbol: (n, 6) ccxt candles} of `timeframe` (default: config's)."""
+        started = time.perf_counter()
+        timeframe = timeframe or settings.watcher.get_config().timeframe
+        tf_ms = smath.timeframe_to_ms(timeframe)
+
+        candles = {
+            symbol: np.array(rows, dtype=float).reshape(-1, 6)
+            for symbol, rows in candles.items()
+        }
+        signals = self.signals(candles)
+
+        r = risk_manager.r
+        leverage = getattr(r, "leverage", 1.0)
+        cross = getattr(r, "cross_isolated", "cross") == "cross"
+        limit_entries = self.execution_order == "limit"
+        entry_fee = self.maker_fee if limit_entries else self.taker_fee
+        taker_fee = self.taker_fee
+        mmr = self.maintenance_margin
+
+        symbols = list(candles)
+        # Plain lists: the loop below reads one value at a time
+        rows = [candles[s][:, :5].tolist() for s in symbols]
+        sides = [signals[s][0].tolist() for s in symbols]
+        strengths = [signals[s][1].tolist() for s in symbols]
+        stops = [signals[s][2].tolist() for s in symbols]
+        # Funding settlements within each candle (ts <= settlement < ts + tf)
+        fundings = [
+            (
+                (candles[s][:, 0] + tf_ms - 1) // FUNDING_INTERVAL_MS
+                - (candles[s][:, 0] - 1) // FUNDING_INTERVAL_MS
+            ).tolist()
+            for s in symbols
+        ]
+
+        # Merged clock: every candle of every symbol in time order
+        ts_all = np.concatenate([candles[s][:, 0] for s in symbols])
+        sym_all = np.concatenate(
+            [np.full(len(candles[s]), k, dtype=np.int64) for k, s in enumerate(symbols)]
+        )
+        bar_all = np.concatenate([np.arange(len(candles[s])) for s in symbols])
+        order = np.lexsort((sym_all, ts_all))
+
+        balance = self.initial_balance
+        used_margin = 0.0
+        positions: Dict[int, dict] = {}
+        pending: Dict[int, dict] = {}
+        trades: List[dict] = []
+        balance_curve: List[dict] = []
+
+        def close(k: int, price: float, ts: float, reason: str):
+            nonlocal balance, used_margin
+            pos = positions.pop(k)
+            gross = (price - pos["entry_price"]) * pos["amount"] * pos["side"]
+            fee = pos["amount"] * price * taker_fee
+            balance += gross - fee
+            used_margin -= pos["margin"]
+
+            fees = pos["fee"] + fee
+            entry_dt, exit_dt = _ts_to_dt(pos["entry_time"]), _ts_to_dt(ts)
+            trades.append(
+                {
+                    "symbol": symbols[k],
+                    "side": "buy" if pos["side"] > 0 else "sell",
+                    "entry_price": pos["entry_price"],
+                    "exit_price": price,
+                    "amount": pos["amount"],
+                    "untracked_pnl": 0.0,
+                    "pnl": gross - fees - pos["funding"],
+                    "fees": fees,
+                    "entry_time": entry_dt,
+                    "exit_time": exit_dt,
+                    "hold_time_sec": (exit_dt - entry_dt).total_seconds(),
+                    "exit_reason": reason,
+                    "funding": pos["funding"],
+                }
+            )
+            balance_curve.append(
+                {"timestamp": exit_dt.isoformat(), "balance": round(balance, 4)}
+            )
+
+        for k, i in zip(sym_all[order].tolist(), bar_all[order].tolist()):
+            ts, open_, high, low, close_ = rows[k][i]
+
+            # 1. Funding of positions held into this candle
+            pos = positions.get(k)
+            if pos is not None and fundings[k][i]:
+                paid = (
+                    pos["amount"] * open_ * self.funding_rate * fundings[k][i]
+                ) * pos["side"]
+                pos["funding"] += paid
+                balance -= paid
+
+            # 2. Entry placed at the previous close
+            entry = pending.pop(k, None)
+            if entry is not None:
+                side, price = entry["side"], entry["price"]
+                if limit_entries:
+                    crossed = low <= price if side > 0 else high >= price
+                    price = min(price, open_) if side > 0 else max(price, open_)
+                else:
+                    crossed, price = True, open_
+
+                amount = entry["amount"]
+                margin = amount * price / leverage
+                fee = amount * price * entry_fee
+                if crossed and margin + fee <= balance - used_margin:
+                    # Cross margin: the whole free balance backs the position
+                    collateral = balance - used_margin if cross else margin
+                    liquidation = (
+                        price - side * (collateral - mmr * amount * price) / amount
+                    )
+                    balance -= fee
+                    used_margin += margin
+                    pos = positions[k] = {
+                        "side": side,
+                        "amount": amount,
+                        "entry_price": price,
+                        "entry_time": ts,
+                        "sl": entry["sl"],
+                        "tp": entry["tp"],
+                        "liquidation": liquidation,
+                        "margin": margin,
+                        "fee": fee,
+                        "funding": 0.0,
+                    }
+
+            # 3. Exits within the candle, the adverse level first
+            if pos is not None and k in positions:
+                side, tp = pos["side"], pos["tp"]
+                if side > 0:
+                    stop = max(pos["sl"], pos["liquidation"])
+                    stopped, gapped = low <= stop, open_ <= stop
+                    taken, tp_gapped = high >= tp, open_ >= tp
+                else:
+                    stop = min(pos["sl"], pos["liquidation"])
+                    stopped, gapped = high >= stop, open_ >= stop
+                    taken, tp_gapped = low <= tp, open_ <= tp
+
+                if stopped:
+                    reason = (
+                        "liquidation" if stop == pos["liquidation"] else "stop_loss"
+                    )
+                    if gapped:
+                        close(k, open_, ts, reason)
+                    else:
+                        close(k, stop, ts + tf_ms, reason)
+                elif taken:
+                    if tp_gapped:
+                        close(k, open_, ts, "take_profit")
+                    else:
+                        close(k, tp, ts + tf_ms, "take_profit")
+
+            # 4. Signal of the closed candle on a flat symbol
+            direction = sides[k][i]
+            if not direction or k in positions or i + 1 >= len(rows[k]):
+                continue
+
+            sl, tp = stops[k][i]
+
+            nn = risk_manager.position_size(balance - used_margin, close_)
+            nn = math.floor(nn * (0.5 + (strengths[k][i] / 2)) * 1000) / 1000
+            if nn < MIN_AMOUNT:
+                continue
+
+            if abs(close_ - sl) / close_ < MIN_STOP_DISTANCE:
+                continue
+            if abs(tp - close_) / abs(close_ - sl) < MIN_RISK_REWARD:
+                continue
+
+            pending[k] = {
+                "side": int(direction),
+                "amount": round(nn, 2),
+                "price": round(close_, 4),
+                "sl": round(sl, 4),
+                "tp": round(tp, 4),
+            }
+
+        # Whatever is still open is closed at the last close
+        for k in list(positions):
+            close(k, rows[k][-1][4], rows[k][-1][0] + tf_ms, "end")
+
+        elapsed = time.perf_counter() - started
+        result = BacktestResult(trades, balance_curve, balance, len(ts_all), elapsed)
+        logger.info(
+            f"Backtest: {len(trades)} trades over {result.bars} candles in {elapsed:.2f}s "
+            f"({result.bars_per_second:.0f}/s), balance {self.initial_balance:.2f} -> {balance:.2f}"
+        )
+        return result
+
+    def run_archive(
+        self,
+        symbols: List[str],
+        timeframe: Optional[str] = None,
+        exchange: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> BacktestResult:
+        """run() over the data.archive candles with start <= ts < end (ms)."""
+        trading_config = settings.watcher.get_config()
+        timeframe = timeframe or trading_config.timeframe
+        exchange = exchange or trading_config.exchange
+
+        candles = {
+            symbol: archive.read(exchange, symbol, timeframe, start, end)
+            for symbol in symbols
+        }
+        for symbol, rows in candles.items():
+            if len(rows) < WINDOW + 1:
+                logger.warning(
+                    f"Not enough archived {timeframe} candles of {symbol} on {exchange}: {len(rows)}"
+                )
+        return self.run(candles, timeframe)
@@ -8,7 +8,7 @@ import os
 # ── Paths ──────────────────────────────────────────────────────────────────────
 import sys
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 
 from loguru import logger
 from pydantic import BaseModel, Field
@@ -27,7 +27,7 @@ TRADING_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
 class TradingConfig(BaseModel):
     is_demo_enabled: bool = True
     timeframe: str = "15m"
-    exchange: Literal["binance", "bybit", "okx", "mexc"] = "binance"
+    exchange: Literal["binance", "bybit", "okx", "mexc", "simulator"] = "binance"
     execution_order: Literal["market", "limit"] = "limit"
     future_spot: Literal["future", "spot"] = "future"
     list_of_interest: list[str] = Field(
@@ -45,6 +45,13 @@ class TradingConfig(BaseModel):
     list_of_parameters: list[str] = Field(
         default_factory=lambda: ["RSI", "SMR", "TnK", "EMA", "ATR", "DSCP"]
     )
+    # Evaluate every symbol of a cycle in one stacked pass (strategy.batch)
+    batch_evaluation: bool = True
+    # Cached market metadata older than this is refreshed in the background
+    markets_max_age_hours: float = 24.0
+    # exchange="simulator" replays the archived candles of this exchange,
+    # synthetic candles without one
+    simulator_replay: Optional[str] = None
 
 
 # ── Watcher Logic ─────────────────────────────────────────────────────────────
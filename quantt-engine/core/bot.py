@@ -9,7 +9,11 @@ from loguru import logger
 
 import core.engine as e
 from config import risk, settings
+from data.async_fetch import market_data
 from data.client import cached_client
+from data.resilience import safe_exchange_call
+from data.scheduler import scheduler as prefetch_scheduler
+from exchange.markets import markets_cache
 from execution.position_manager import manage_open_limit
 from persistance.connection import Base, engine
 from utils.math import scale_0_100
@@ -32,21 +36,23 @@ class TradingBot:
         self.client = cached_client()
 
         try:
-            self.client.load_markets()
+            self.load_markets()
         except Exception as err:
             logger.error(f"Failed to reload markets: {err}")
 
+    def load_markets(self):
+        """Markets from the client or the on-disk cache, downloaded only on a miss."""
+        if self.client.markets or markets_cache.inject(self.client):
+            return
+        self.safe_client_call(self.client.load_markets)
+        markets_cache.save(self.client)
+
     def safe_client_call(self, func, *args, **kwargs):
         try:
-            return func(*args, **kwargs)
-
-        except Exception as err:
-            logger.warning(f"Client error detected: {err}")
-            logger.info("Refreshing exchange client...")
-
-            self.refresh_client()
-
-            return func(*args, **kwargs)
+            return safe_exchange_call(func, *args, **kwargs)
+        finally:
+            # The call recreates the client itself when an error requires it
+            self.client = cached_client()
 
     def setup_environment(self):
         """Initializes database and exchange settings."""
@@ -58,7 +64,7 @@ class TradingBot:
             logger.info("Initializing database...")
             Base.metadata.create_all(bind=engine)
 
-        self.safe_client_call(self.client.load_markets)
+        self.load_markets()
 
         for symbol in settings.watcher.get_config().list_of_interest:
             try:
@@ -72,6 +78,7 @@ class TradingBot:
         """Main execution loop."""
         self.is_running = True
         self.stop_event.clear()
+        prefetch_scheduler.start()
         logger.info("Bot started.")
 
         try:
@@ -90,6 +97,9 @@ class TradingBot:
             self.stop()
         finally:
             self.is_running = False
+            prefetch_scheduler.stop()
+            # A cycle still running when stop() came may have reopened it
+            market_data.close()
 
     def check_bal(self):
         bal = self.safe_client_call(self.client.fetch_balance)
@@ -111,6 +121,8 @@ class TradingBot:
         """Graceful shutdown."""
         self.is_running = False
         self.stop_event.set()
+        prefetch_scheduler.stop()
+        market_data.close()
         logger.info("Loop stopped by user. Cleaning up...")
 
     def close_order(self, symbol: str, id: str):
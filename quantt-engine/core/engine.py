@@ -1,14 +1,16 @@
 import math
-import time
+from concurrent.futures import CancelledError
 
 from loguru import logger
 
 import execution.order_manager as order_manager
 import execution.position_manager as pm
 import execution.risk_manager as risk_manager
+import strategy.batch as batch
 import strategy.signal_generator as sg
 from config import risk, settings, store
-from data import fetch
+from data import cache, fetch
+from data.snapshot import MarketSnapshot
 
 
 def avaliation_and_place(client):
@@ -20,7 +22,6 @@ def avaliation_and_place(client):
     max_loss_amt_t = store_cfg.balances.get("USDT", 0.0) * risk_cfg.maximum_loss
     max_loss_amt_c = store_cfg.balances.get("USDC", 0.0) * risk_cfg.maximum_loss
 
-    time.sleep(0.5)
     actual = fetch.balance()
     actual_t = actual.get("USDT", {}).get("total", 0.0)
     actual_c = actual.get("USDC", {}).get("total", 0.0)
@@ -43,14 +44,45 @@ def avaliation_and_place(client):
     open_closed = pm.manage_open_symbols()
     logger.info(f"Market states: {open_closed}")
 
-    for symbol, status in open_closed.items():
-        if status != "open":
-            continue
+    open_symbols = [
+        symbol for symbol, status in open_closed.items() if status == "open"
+    ]
+
+    # 4. Market Evaluation: candles of every open symbol are pulled concurrently,
+    #    then evaluated at once in batch mode
+    try:
+        cache.prefetch_windows(open_symbols)
+    except CancelledError:
+        logger.info("Market data prefetch cancelled, skipping this cycle.")
+        return
+    except Exception as e:
+        logger.warning(f"Market data prefetch failed, fetching per symbol: {e}")
+
+    evaluations = {}
+    if trading_config.batch_evaluation:
+        evaluations = batch.evaluate_markets(
+            open_symbols, trading_config.list_of_parameters
+        )
 
-        time.sleep(1)
+    # 4.1. Tickers of every open symbol in one request, order books only for
+    #    the ones with a tradable verdict
+    snapshot = MarketSnapshot()
+    try:
+        snapshot.load_tickers(open_symbols)
+        snapshot.load_order_books(
+            symbol
+            for symbol, evaluation in evaluations.items()
+            if evaluation.verdict["direction"] != "neutral"
+            and evaluation.verdict["confidence"] * 100 >= risk_cfg.acceptable_confidence
+        )
+    except Exception as e:
+        logger.warning(f"Market snapshot incomplete, fetching per symbol: {e}")
 
-        # 4. Market Evaluation
-        data = sg.avaliation_of_market(symbol, trading_config.list_of_parameters)
+    for symbol in open_symbols:
+        evaluation = evaluations.get(symbol) or sg.evaluate_market(
+            symbol, trading_config.list_of_parameters
+        )
+        data = evaluation.verdict
         side = data["direction"]
 
         if side == "neutral":
@@ -70,11 +102,11 @@ def avaliation_and_place(client):
                 f"High strength ({data['strength']}) detected in range regime for {symbol}. Proceeding with caution."
             )
 
-        stops = sg.get_loss_and_profit_stops(symbol, side)
+        stops = sg.get_loss_and_profit_stops(symbol, side, evaluation)
         sl, tp = stops[0], stops[1]
 
         # 5. Dynamic Sizing based on Strength
-        raw_nn = risk_manager.smart_amount(symbol)
+        raw_nn = risk_manager.smart_amount(symbol, snapshot)
         if math.isnan(raw_nn):
             nn = 0.0
         else:
@@ -88,10 +120,9 @@ def avaliation_and_place(client):
             continue
 
         # 6. Entry Price Calculation
-        entry_price = risk_manager.blp(symbol, side, nn)
+        entry_price = risk_manager.blp(symbol, side, nn, snapshot)
 
-        time.sleep(0.5)
-        act_price = fetch.get_ticker(symbol)
+        act_price = snapshot.ticker(symbol)
         act_price = act_price.get("last")
 
         # 7.1. Minimum Structural Distance Check
@@ -117,7 +148,9 @@ def avaliation_and_place(client):
         sl = round(sl, 4)
         tp = round(tp, 4)
 
-        valid = sg.is_iceberg(symbol, risk_cfg.maximum_iceberg_share, nn, act_price)
+        valid = sg.is_iceberg(
+            symbol, risk_cfg.maximum_iceberg_share, nn, act_price, evaluation
+        )
         approval = valid[0]
         nn = valid[1]
 
@@ -128,7 +161,6 @@ def avaliation_and_place(client):
                     f"Placing {side} order for {symbol} | Conf: {conf_score:.1f}% | Regime: {data['regime']}, | TP: {tp} | SL: {sl}"
                 )
                 order_manager.execute_iceberg(client, symbol, nn, side, tp, sl)
-                time.sleep(1)
             except Exception as e:
                 logger.error(f"Critical failure executing order for {symbol}: {e}")
         else:
@@ -146,7 +178,6 @@ def avaliation_and_place(client):
                     sl,
                     tp,
                 )
-                time.sleep(1)
             except Exception as e:
                 logger.error(f"Critical failure executing order for {symbol}: {e}")
 
@@ -0,0 +1,217 @@
+"""
+archive.py
+Persistent OHLCV history per (exchange, symbol, timeframe).
+
+Closed candles are appended to one fixed-width binary file per series:
+six little-endian float64 per candle ([ts, open, high, low, close, volume],
+48 bytes), sorted by timestamp. Reads are np.memmap views, so years of
+history can be sliced without loading the file into memory.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+import data.fetch as fetch
+from utils import math
+
+if getattr(sys, "frozen", False):
+    DIR = Path(sys.executable).parent
+else:
+    DIR = Path(__file__).resolve().parent.parent
+
+ARCHIVE_DIR = DIR / "qdata" / "ohlcv"
+ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+
+ROW_DTYPE = np.dtype("<f8")
+ROW_FIELDS = 6
+ROW_BYTES = ROW_DTYPE.itemsize * ROW_FIELDS
+
+# Candles asked for per request while backfilling
+BACKFILL_PAGE = 1000
+
+
+class OHLCVArchive:
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = root
+        self._lock = threading.RLock()
+
+    def path(self, exchange: str, symbol: str, timeframe: str) -> Path:
+        name = symbol.replace("/", "_").replace(":", "_")
+        return self.root / exchange / name / f"{timeframe}.f8"
+
+    # ---------------- Reads ---------------- #
+
+    def read(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> np.ndarray:
+        """Candles with start <= ts < end as a read-only (n, 6) memmap view."""
+        path = self.path(exchange, symbol, timeframe)
+        # A torn row left by an interrupted append is ignored
+        rows = path.stat().st_size // ROW_BYTES if path.exists() else 0
+        if rows == 0:
+            return np.empty((0, ROW_FIELDS))
+
+        candles = np.memmap(path, dtype=ROW_DTYPE, mode="r", shape=(rows, ROW_FIELDS))
+
+        ts = candles[:, 0]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = rows if end is None else int(np.searchsorted(ts, end, side="left"))
+        return candles[lo:hi]
+
+    def last_timestamp(self, exchange: str, symbol: str, timeframe: str):
+        candles = self.read(exchange, symbol, timeframe)
+        return float(candles[-1, 0]) if len(candles) else None
+
+    def gaps(self, exchange: str, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """Every hole as (first missing ts, ts of the next stored candle)."""
+        ts = self.read(exchange, symbol, timeframe)[:, 0]
+        timeframe_ms = math.timeframe_to_ms(timeframe)
+
+        holes = np.flatnonzero(np.diff(ts) > timeframe_ms)
+        return [(int(ts[i]) + timeframe_ms, int(ts[i + 1])) for i in holes]
+
+    # ---------------- Writes ---------------- #
+
+    def append(self, exchange: str, symbol: str, timeframe: str, candles) -> int:
+        """
+        Store the closed candles of `candles` that are newer than the newest
+        stored one. Returns how many were written.
+        """
+        rows = self._closed(candles, timeframe)
+        path = self.path(exchange, symbol, timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            last_ts = self.last_timestamp(exchange, symbol, timeframe)
+            if last_ts is not None:
+                rows = rows[rows[:, 0] > last_ts]
+            if len(rows) == 0:
+                return 0
+
+            with open(path, "ab") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size % ROW_BYTES:
+                    f.truncate(size - size % ROW_BYTES)
+                rows.astype(ROW_DTYPE).tofile(f)
+
+        return len(rows)
+
+    def merge(self, exchange: str, symbol: str, timeframe: str, candles) -> int:
+        """
+        Store closed candles anywhere in the series (e.g. inside a gap).
+        Stored candles win over new ones with the same timestamp.
+        Returns how many were added.
+        """
+        rows = self._closed(candles, timeframe)
+        if len(rows) == 0:
+            return 0
+
+        with self._lock:
+            stored = self.read(exchange, symbol, timeframe)
+            if len(stored) == 0 or rows[0, 0] > stored[-1, 0]:
+                return self.append(exchange, symbol, timeframe, rows)
+
+            rows = rows[~np.isin(rows[:, 0], stored[:, 0])]
+            if len(rows) == 0:
+                return 0
+
+            merged = np.concatenate((stored, rows))
+            merged = merged[np.argsort(merged[:, 0], kind="stable")]
+
+            # Rewritten aside and swapped in: readers holding a memmap keep
+            # the old file until they drop it
+            path = self.path(exchange, symbol, timeframe)
+            tmp_path = path.with_suffix(".tmp")
+            merged.astype(ROW_DTYPE).tofile(tmp_path)
+            os.replace(tmp_path, path)
+
+        return len(rows)
+
+    # ---------------- Exchange sync ---------------- #
+
+    def backfill(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        since: float,
+        until: Optional[float] = None,
+    ) -> int:
+        """
+        Fetch [since, until) page by page from the exchange data.fetch is bound
+        to (which should be `exchange`) and merge it. Returns candles added.
+        """
+        timeframe_ms = math.timeframe_to_ms(timeframe)
+        until = until if until is not None else time.time() * 1000
+
+        pages = []
+        cursor = since
+        while cursor < until:
+            page = fetch.get_OHLCV(
+                symbol=symbol,
+                timeframe=timeframe,
+                limit=BACKFILL_PAGE,
+                since=int(cursor),
+            )
+            if not page:
+                break
+
+            page = np.asarray(page, dtype=float).reshape(-1, ROW_FIELDS)
+            pages.append(page[page[:, 0] < until])
+
+            next_cursor = page[-1, 0] + timeframe_ms
+            if next_cursor <= cursor:
+                break
+            cursor = next_cursor
+
+        if not pages:
+            return 0
+        return self.merge(exchange, symbol, timeframe, np.concatenate(pages))
+
+    def sync(
+        self, exchange: str, symbol: str, timeframe: str, since: Optional[float] = None
+    ) -> int:
+        """
+        Bring the series up to the last closed candle. An empty series starts
+        at `since`, or is left empty without it.
+        """
+        last_ts = self.last_timestamp(exchange, symbol, timeframe)
+        if last_ts is None and since is None:
+            return 0
+        start = since if last_ts is None else last_ts + math.timeframe_to_ms(timeframe)
+        return self.backfill(exchange, symbol, timeframe, start)
+
+    def fill_gaps(self, exchange: str, symbol: str, timeframe: str):
+        """Backfill every hole; returns the ones the exchange has no candles for."""
+        for start, end in self.gaps(exchange, symbol, timeframe):
+            added = self.backfill(exchange, symbol, timeframe, start, end)
+            logger.debug(
+                f"Backfilled {added} candles of {symbol} {timeframe} in [{start}, {end})"
+            )
+        return self.gaps(exchange, symbol, timeframe)
+
+    # ---------------- Helpers ---------------- #
+
+    @staticmethod
+    def _closed(candles, timeframe: str) -> np.ndarray:
+        """Sorted, de-duplicated candles whose period has already ended."""
+        rows = np.asarray(candles, dtype=float).reshape(-1, ROW_FIELDS)
+        now_ms = time.time() * 1000
+        rows = rows[rows[:, 0] + math.timeframe_to_ms(timeframe) <= now_ms]
+        _, first = np.unique(rows[:, 0], return_index=True)
+        return rows[first]
+
+
+archive = OHLCVArchive()
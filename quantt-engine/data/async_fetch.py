@@ -0,0 +1,235 @@
+"""
+async_fetch.py
+Asynchronous counterpart of data.fetch, built on ccxt.async_support.
+
+Coroutines run on one background event loop thread with a single async
+client and a shared aiohttp session. Per-symbol fetches fan out with
+asyncio.gather under a semaphore, and the blocking helpers below can be
+called from any (sync) thread. cancel() aborts whatever is in flight and
+close() also releases the client, session and loop; TradingBot.stop calls
+close(), the next request starts a fresh loop.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+import ccxt.async_support as ccxt_async
+from loguru import logger
+
+from config import settings
+from data.client import cached_client
+from data.limiter import limiter
+
+# Requests in flight at once, across all symbols
+MAX_CONCURRENCY = 8
+# Seconds a blocking helper waits for its whole fan-out
+FAN_OUT_TIMEOUT = 120
+
+# Exchanges whose sync client (exchange/*.py) toggles demo trading
+DEMO_EXCHANGES = ("binance", "bybit")
+
+
+class AsyncMarketData:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client = None
+        self._client_lock: Optional[asyncio.Lock] = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._close_lock = threading.Lock()
+
+    # ---------------- Event loop ---------------- #
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="market-data", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = FAN_OUT_TIMEOUT):
+        """
+        Run `coro` on the background loop and block for its result.
+        Raises concurrent.futures.CancelledError once cancel() is called.
+        """
+        future: Future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        with self._lock:
+            self._pending.add(future)
+        try:
+            return future.result(timeout=timeout)
+        finally:
+            with self._lock:
+                self._pending.discard(future)
+
+    def cancel(self):
+        """Cancel every fan-out in flight (the loop and client stay usable)."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.cancel()
+        if pending:
+            logger.info(f"Cancelled {len(pending)} market data request(s)")
+
+    def close(self):
+        """Cancel what is in flight, close the client and session, stop the loop."""
+        self.cancel()
+        with self._close_lock:
+            if self._loop is None or self._loop.is_closed():
+                return
+
+            future = asyncio.run_coroutine_threadsafe(self._close_client(), self._loop)
+            try:
+                future.result(30)
+            except Exception as err:
+                logger.warning(f"Failed to close the async client: {err}")
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+                self._loop.close()
+                # Both are bound to the loop just closed
+                self._semaphore = None
+                self._client_lock = None
+
+    # ---------------- Client ---------------- #
+
+    async def _get_client(self):
+        """Async client mirroring the configured sync client (credentials, markets)."""
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+
+        async with self._client_lock:
+            sync_client = cached_client()
+            if self._client is None or self._client.id != sync_client.id:
+                await self._close_client()
+                self._client = self._new_client(sync_client)
+            return self._client
+
+    def _new_client(self, sync_client):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        exchange_class = getattr(ccxt_async, sync_client.id, None)
+        if exchange_class is None:
+            # In-process clients (exchange.simulator) have no async twin,
+            # their methods run on executor threads instead
+            return sync_client
+
+        client = exchange_class(
+            {
+                "apiKey": sync_client.apiKey,
+                "secret": sync_client.secret,
+                "session": self._session,
+                "enableRateLimit": True,
+                "timeout": sync_client.timeout,
+                "throwOnError": True,
+                "precisionMode": sync_client.precisionMode,
+                "options": dict(sync_client.options),
+            }
+        )
+        if sync_client.id in DEMO_EXCHANGES:
+            client.enable_demo_trading(settings.watcher.get_config().is_demo_enabled)
+        if sync_client.markets:
+            client.set_markets(sync_client.markets, sync_client.currencies)
+        return client
+
+    async def _close_client(self):
+        if self._client is not None:
+            if asyncio.iscoroutinefunction(getattr(self._client, "close", None)):
+                await self._client.close()
+            self._client = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _call(self, endpoint: str, *args, weight_params=None, **kwargs):
+        client = await self._get_client()
+        async with self._semaphore:
+            # The shared limiter blocks, keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: limiter.acquire(client.id, endpoint, **(weight_params or {})),
+            )
+            method = getattr(client, endpoint)
+            if asyncio.iscoroutinefunction(method):
+                return await method(*args, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(method, *args, **kwargs)
+            )
+
+    async def _gather(self, calls: Dict[str, Awaitable]) -> Dict[str, object]:
+        """{key: result or the exception it raised}, failures never abort the rest."""
+        keys = list(calls)
+        results = await asyncio.gather(*calls.values(), return_exceptions=True)
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Async fetch failed for {key}: {result}")
+        return dict(zip(keys, results))
+
+    # ---------------- Fan-out helpers (blocking) ---------------- #
+
+    def ohlcv_many(
+        self, requests: Dict[str, Tuple[int, Optional[int]]], timeframe: str
+    ) -> Dict[str, object]:
+        """requests: {symbol: (limit, since)} -> {symbol: candles | exception}."""
+
+        async def fan_out():
+            return await self._gather(
+                {
+                    symbol: self._call(
+                        "fetch_ohlcv",
+                        symbol,
+                        timeframe,
+                        since=since,
+                        limit=limit,
+                        weight_params={"limit": limit},
+                    )
+                    for symbol, (limit, since) in requests.items()
+                }
+            )
+
+        return self.run(fan_out())
+
+    def tickers_many(self, symbols: Iterable[str]) -> Dict[str, object]:
+        async def fan_out():
+            return await self._gather(
+                {symbol: self._call("fetch_ticker", symbol) for symbol in symbols}
+            )
+
+        return self.run(fan_out())
+
+    def order_books_many(
+        self, symbols: Iterable[str], limit: Optional[int] = None
+    ) -> Dict[str, object]:
+        async def fan_out():
+            return await self._gather(
+                {
+                    symbol: self._call(
+                        "fetch_order_book",
+                        symbol,
+                        limit,
+                        weight_params={"limit": limit},
+                    )
+                    for symbol in symbols
+                }
+            )
+
+        return self.run(fan_out())
+
+    def balance(self):
+        return self.run(self._call("fetch_balance"))
+
+
+market_data = AsyncMarketData()
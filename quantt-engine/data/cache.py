@@ -1,52 +1,313 @@
+import threading
 import time
+from collections import OrderedDict
 from functools import wraps
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple, Union
 
-import data.fetch as fetch
 from config import settings
+from data.async_fetch import market_data
+from data.candles import store as candle_store
 from utils import math
 
+# ---------------- TTL cache ---------------- #
+
+# Entries kept per cache before the least recently used one is evicted
+DEFAULT_MAXSIZE = 1024
+
+# name -> TTLCache, for cache_stats()
+caches = {}
+
+
+class _Flight:
+    """A load in progress, other callers missing the same key wait on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.loaded = False
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    Thread-safe TTL cache with LRU eviction.
+
+    Concurrent misses on one key are coalesced: the first caller loads, the
+    others wait for its result (or its exception). `ttl` is seconds, or a
+    callable of the key evaluated on every store, so it follows config changes.
+    """
+
+    def __init__(
+        self,
+        ttl: Union[float, Callable[[Hashable], float]],
+        maxsize: int = DEFAULT_MAXSIZE,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.load_errors = 0
+        self.load_seconds = 0.0
+        self.max_load_seconds = 0.0
+
+    def _lookup(self, key, now: float):
+        """Fresh entry of `key` or None, expired entries are dropped. Lock held."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now >= entry[0]:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, value, expiry: float):
+        """Lock held."""
+        self._entries[key] = (expiry, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def expiry(self, key) -> float:
+        """When an entry of `key` loaded now expires."""
+        ttl = self.ttl(key) if callable(self.ttl) else self.ttl
+        return time.time() + ttl
+
+    def get_or_load(self, key, loader: Callable[[], object]):
+        while True:
+            with self._lock:
+                entry = self._lookup(key, time.time())
+                if entry is not None:
+                    self.hits += 1
+                    return entry[1]
+
+                self.misses += 1
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.loaded:
+                return flight.value
+            # A load_many() call left the key out, load it here
+
+        # The TTL runs from the request, not from when a slow load returned
+        expiry = self.expiry(key)
+        started = time.perf_counter()
+        try:
+            flight.value = loader()
+            flight.loaded = True
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                if flight.error is None:
+                    self._store(key, flight.value, expiry)
+                else:
+                    self.load_errors += 1
+                self.load_seconds += elapsed
+                self.max_load_seconds = max(self.max_load_seconds, elapsed)
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.value
+
+    def load_many(self, keys: Iterable, loader: Callable[[list], Dict]) -> Dict:
+        """
+        Load every key of `keys` that is neither fresh nor already loading
+        with a single loader(due_keys) -> {key: value} call. get_or_load
+        callers of those keys wait for it like for any other load; keys left
+        out of the result (or all, if it raises) are stored for nobody and
+        their waiters load them themselves. Returns what was loaded.
+        """
+        with self._lock:
+            now = time.time()
+            flights = {}
+            for key in keys:
+                if self._lookup(key, now) is None and key not in self._flights:
+                    flights[key] = self._flights[key] = _Flight()
+            self.misses += len(flights)
+        if not flights:
+            return {}
+
+        expiries = {key: self.expiry(key) for key in flights}
+        started = time.perf_counter()
+        loaded = {}
+        try:
+            loaded = loader(list(flights))
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                for key, flight in flights.items():
+                    if key in loaded:
+                        flight.value = loaded[key]
+                        flight.loaded = True
+                        self._store(key, flight.value, expiries[key])
+                    else:
+                        self.load_errors += 1
+                    del self._flights[key]
+                self.load_seconds += elapsed
+                self.max_load_seconds = max(self.max_load_seconds, elapsed)
+            for flight in flights.values():
+                flight.done.set()
+
+        return loaded
+
+    def invalidate(self, key=None):
+        """Drop `key`, or every entry without one. Loads in flight still finish."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            loads = self.misses - self.coalesced
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "load_errors": self.load_errors,
+                "avg_load_seconds": self.load_seconds / loads if loads else 0.0,
+                "max_load_seconds": self.max_load_seconds,
+            }
+
+
+def ttl_cache(
+    ttl_seconds: Union[float, Callable[[Hashable], float]],
+    maxsize: int = DEFAULT_MAXSIZE,
+):
+    """
+    Memoize a function in a TTLCache keyed by its (hashable) arguments.
+    The wrapper exposes .cache, .invalidate(*args, **kwargs) and .stats().
+    """
 
-def ttl_cache(ttl_seconds: int):
     def decorator(func):
-        # Store data as: { (args, kwargs): {"value": result, "expiry": time} }
-        cache = {}
+        cache = caches[func.__qualname__] = TTLCache(ttl_seconds, maxsize)
+
+        def make_key(args, kwargs):
+            return (args, frozenset(kwargs.items()))
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Note: args must be hashable (like strings or tuples)
-            cache_key = (args, frozenset(kwargs.items()))
+            return cache.get_or_load(
+                make_key(args, kwargs), lambda: func(*args, **kwargs)
+            )
 
-            now = time.time()
-            cached_item = cache.get(cache_key)
-
-            if cached_item is None or now >= cached_item["expiry"]:
-                # Fetch new data and update the specific key
-                result = func(*args, **kwargs)
-                cache[cache_key] = {"value": result, "expiry": now + ttl_seconds}
+        def invalidate(*args, **kwargs):
+            cache.invalidate(make_key(args, kwargs) if args or kwargs else None)
 
-            return cache[cache_key]["value"]
+        wrapper.cache = cache
+        wrapper.invalidate = invalidate
+        wrapper.stats = cache.stats
 
         return wrapper
 
     return decorator
 
 
-@ttl_cache(ttl_seconds=math.get_cache_timing(settings.watcher.get_config().timeframe))
-def cached_p42(market: str):
-    return fetch.get_OHLCV(
-        symbol=market, timeframe=settings.watcher.get_config().timeframe, limit=42
+def cache_stats() -> Dict[str, dict]:
+    """Counters of every named cache, {name: TTLCache.stats()}."""
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+# ---------------- OHLCV windows ---------------- #
+
+
+def _window_ttl(key) -> float:
+    # key is (market, timeframe, exchange). The forming candle keeps changing,
+    # so a sync holds at most get_cache_timing(timeframe) seconds, and never
+    # past the close: the candle closed there must be picked up at once
+    # (data.scheduler prefetches it)
+    timeframe = key[1]
+    until_close = math.next_candle_close(timeframe) / 1000 - time.time()
+    return max(min(math.get_cache_timing(timeframe), until_close), 0.0)
+
+
+# Keyed by (market, timeframe, exchange), a fresh entry means no sync is due
+_window_syncs = caches["windows"] = TTLCache(_window_ttl)
+
+
+def _archived_exchange(exchange: str) -> Optional[str]:
+    # Simulated candles are not history worth persisting (data.archive)
+    return None if exchange == "simulator" else exchange
+
+
+def cached_window(market: str, limit: int, timeframe: Optional[str] = None):
+    """
+    Last `limit` candles of `market` as a (limit, 6) array.
+
+    Candles live in data.candles.store, synced incrementally at most once per
+    TTL; every window is a copy of that history taken under its buffer lock,
+    later syncs do not change it.
+    """
+    trading_config = settings.watcher.get_config()
+    timeframe = timeframe or trading_config.timeframe
+    exchange = _archived_exchange(trading_config.exchange)
+    key = (market, timeframe, exchange)
+
+    _window_syncs.get_or_load(
+        key, lambda: candle_store.sync(market, timeframe, exchange)
     )
+    return candle_store.window(market, timeframe, limit, exchange)
+
+
+def cached_history(market: str, timeframe: Optional[str] = None):
+    """Every candle data.candles.store holds for `market`, see cached_window."""
+    return cached_window(market, candle_store.capacity, timeframe)
+
+
+def prefetch_windows(markets: Iterable[str], timeframe: Optional[str] = None):
+    """
+    Sync every due market concurrently (data.async_fetch), so the
+    cached_window calls of the cycle are served without a request each.
+    The syncs are in flight in the window cache: cached_window calls of
+    those markets wait for them. Markets whose fetch failed are left to
+    cached_window.
+    """
+    trading_config = settings.watcher.get_config()
+    timeframe = timeframe or trading_config.timeframe
+    exchange = _archived_exchange(trading_config.exchange)
+
+    def sync_due(keys):
+        synced = candle_store.sync_many(
+            [market for market, _, _ in keys],
+            timeframe,
+            exchange,
+            lambda requests: market_data.ohlcv_many(requests, timeframe),
+        )
+        return {(market, timeframe, exchange): True for market in synced}
+
+    _window_syncs.load_many([(m, timeframe, exchange) for m in markets], sync_due)
+
+
+def cached_p42(market: str):
+    return cached_window(market, 42)
 
 
-@ttl_cache(ttl_seconds=math.get_cache_timing(settings.watcher.get_config().timeframe))
 def cached_p14(market: str):
-    return fetch.get_OHLCV(
-        symbol=market, timeframe=settings.watcher.get_config().timeframe, limit=14
-    )
+    return cached_window(market, 14)
 
 
-@ttl_cache(ttl_seconds=math.get_cache_timing(settings.watcher.get_config().timeframe))
 def cached_p28(market: str):
-    return fetch.get_OHLCV(
-        symbol=market, timeframe=settings.watcher.get_config().timeframe, limit=28
-    )
+    return cached_window(market, 28)
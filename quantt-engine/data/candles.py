@@ -0,0 +1,229 @@
+"""
+candles.py
+Incrementally synced OHLCV history per (market, timeframe).
+
+The first sync loads `capacity` candles, later syncs only ask the exchange
+for candles opened since the newest one held (ccxt `since`): that candle was
+still forming, so it is replaced in place and newer ones are appended.
+Syncs of one series are serialized, and a buffer is only read or written
+under its lock, so the scheduler and the engine can sync concurrently.
+
+With an archive, buffers are seeded from disk after a restart and every
+closed candle synced is persisted (see data.archive). Holes in the archive
+(downtime longer than a buffer, failed backfills) are filled when a series
+is seeded and after every full reload.
+"""
+
+import threading
+import time
+from contextlib import ExitStack
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+import data.fetch as fetch
+from data.archive import OHLCVArchive, archive
+from utils import math
+
+# Candles kept per (market, timeframe)
+DEFAULT_CAPACITY = 500
+
+
+class RingBuffer:
+    """
+    Fixed-capacity candle buffer. Every row is written twice, at i and at
+    i + capacity, so the newest `limit` rows are always one contiguous slice
+    and tail() never copies.
+
+    Not thread-safe by itself: threads sharing a buffer hold `lock`.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, fields: int = 6):
+        self.capacity = capacity
+        self._data = np.zeros((2 * capacity, fields))
+        self._end = 0  # rows written so far (next write at _end % capacity)
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return min(self._end, self.capacity)
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        return self.tail(1)[0, 0] if len(self) else None
+
+    def _write(self, pos: int, row):
+        self._data[pos] = row
+        self._data[pos + self.capacity] = row
+
+    def append(self, row):
+        self._write(self._end % self.capacity, row)
+        self._end += 1
+
+    def replace_last(self, row):
+        self._write((self._end - 1) % self.capacity, row)
+
+    def clear(self):
+        self._end = 0
+
+    def tail(self, limit: int) -> np.ndarray:
+        """
+        Newest `limit` rows (oldest first) as a read-only view. The view is
+        rewritten by later appends: hold `lock` while reading it, or copy it.
+        """
+        limit = min(limit, len(self))
+        stop = (self._end - 1) % self.capacity + self.capacity + 1
+        view = self._data[stop - limit : stop]
+        view.flags.writeable = False
+        return view
+
+
+class CandleStore:
+    """
+    Ring buffers of candles per (market, timeframe, exchange), kept current
+    with sync(). window() returns copies: a view of the ring would be
+    overwritten by the next sync while the caller still reads it.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        archive: Optional[OHLCVArchive] = None,
+    ):
+        self.capacity = capacity
+        self.archive = archive
+        self._buffers: Dict[Tuple[str, str, Optional[str]], RingBuffer] = {}
+        # One lock per series, held for a whole sync (seed, fetch, merge)
+        self._sync_locks: Dict[Tuple[str, str, Optional[str]], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def sync(
+        self, market: str, timeframe: str, exchange: Optional[str] = None
+    ) -> RingBuffer:
+        """`exchange` names the archived series, without it nothing is persisted."""
+        with self._sync_lock((market, timeframe, exchange)):
+            buffer = self._buffer(market, timeframe, exchange)
+            limit, since = self._request(buffer, timeframe)
+
+            rows = fetch.get_OHLCV(
+                symbol=market, timeframe=timeframe, limit=limit, since=since
+            )
+            self._apply(buffer, rows, since, market, timeframe, exchange)
+        return buffer
+
+    def sync_many(
+        self,
+        markets: Iterable[str],
+        timeframe: str,
+        exchange: Optional[str],
+        fetch_many: Callable[[Dict[str, Tuple[int, Optional[int]]]], Dict[str, object]],
+    ) -> List[str]:
+        """
+        sync() for many markets with one concurrent fetch:
+        fetch_many({market: (limit, since)}) -> {market: candles | exception}.
+        Returns the markets that were synced.
+        """
+        markets = sorted(set(markets))
+        with ExitStack() as held:
+            # Always taken in the same (sorted) order, so batches can't deadlock
+            for market in markets:
+                held.enter_context(self._sync_lock((market, timeframe, exchange)))
+
+            buffers = {m: self._buffer(m, timeframe, exchange) for m in markets}
+            requests = {m: self._request(b, timeframe) for m, b in buffers.items()}
+
+            synced = []
+            for market, rows in fetch_many(requests).items():
+                if isinstance(rows, BaseException):
+                    continue
+                since = requests[market][1]
+                self._apply(buffers[market], rows, since, market, timeframe, exchange)
+                synced.append(market)
+        return synced
+
+    def _sync_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._sync_locks.setdefault(key, threading.Lock())
+
+    def _buffer(self, market: str, timeframe: str, exchange: Optional[str]):
+        """Buffer of the series, seeded on first use. Sync lock of the key held."""
+        key = (market, timeframe, exchange)
+        with self._lock:
+            buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._seed(market, timeframe, exchange)
+            with self._lock:
+                self._buffers[key] = buffer
+        return buffer
+
+    def _seed(self, market: str, timeframe: str, exchange: Optional[str]):
+        buffer = RingBuffer(self.capacity)
+        if self.archive is not None and exchange is not None:
+            # Close the gap left by the downtime first, so the archive stays
+            # contiguous and the buffer starts from the latest closed candle
+            self.archive.sync(exchange, market, timeframe)
+            self._fill_gaps(market, timeframe, exchange)
+            for row in self.archive.read(exchange, market, timeframe)[-self.capacity :]:
+                buffer.append(row)
+        return buffer
+
+    def _request(self, buffer: RingBuffer, timeframe: str):
+        """(limit, since) bringing `buffer` up to date, since=None for a full reload."""
+        last_ts = buffer.last_timestamp
+        if last_ts is not None:
+            # Candles opened since the forming one, plus the forming one itself
+            elapsed = time.time() * 1000 - last_ts
+            missing = int(elapsed // math.timeframe_to_ms(timeframe)) + 1
+            if missing < self.capacity:
+                return missing + 1, int(last_ts)
+        return self.capacity, None
+
+    def _apply(self, buffer: RingBuffer, rows, since, market, timeframe, exchange):
+        if since is not None and not rows:
+            logger.debug(f"No new candles for {market} {timeframe} since {since}")
+        with buffer.lock:
+            if since is None and rows:
+                buffer.clear()
+            self._merge(buffer, rows or [])
+
+        if self.archive is not None and exchange is not None and rows:
+            self.archive.append(exchange, market, timeframe, rows)
+            if since is None:
+                # A full reload skips whatever happened since the last sync
+                self._fill_gaps(market, timeframe, exchange)
+
+    def _fill_gaps(self, market: str, timeframe: str, exchange: str):
+        try:
+            holes = self.archive.fill_gaps(exchange, market, timeframe)
+        except Exception as err:
+            logger.warning(
+                f"Failed to fill archive gaps of {market} {timeframe}: {err}"
+            )
+            return
+        if holes:
+            logger.debug(
+                f"{len(holes)} gap(s) left in the {market} {timeframe} archive, "
+                "the exchange has no candles for them"
+            )
+
+    def _merge(self, buffer: RingBuffer, rows):
+        for row in rows:
+            last_ts = buffer.last_timestamp
+            if last_ts is None or row[0] > last_ts:
+                buffer.append(row)
+            elif row[0] == last_ts:
+                buffer.replace_last(row)
+
+    def window(
+        self, market: str, timeframe: str, limit: int, exchange: Optional[str] = None
+    ) -> np.ndarray:
+        """Newest `limit` candles held for (market, timeframe), a (n, 6) copy."""
+        with self._lock:
+            buffer = self._buffers.get((market, timeframe, exchange))
+        if buffer is None:
+            return np.empty((0, 6))
+        with buffer.lock:
+            return buffer.tail(limit).copy()
+
+
+store = CandleStore(archive=archive)
@@ -1,10 +1,10 @@
 import time
 from functools import wraps
 
-from exchange.selector import get_exchange_client
+from exchange.selector import get_exchange_client, registry
 
 
-def ttl_cache(ttl_seconds: int):
+def ttl_cache(ttl_seconds: int, on_reset=None):
     def decorator(func):
         cache = {"value": None, "expiry": 0}
 
@@ -20,6 +20,8 @@ def ttl_cache(ttl_seconds: int):
             return cache["value"]
 
         def reset():
+            if on_reset is not None and cache["value"] is not None:
+                on_reset(cache["value"])
             cache["value"] = None
             cache["expiry"] = 0
 
@@ -30,6 +32,7 @@ def ttl_cache(ttl_seconds: int):
     return decorator
 
 
-@ttl_cache(ttl_seconds=86399)  # Cache for the specified timeframe
+# reset() also makes the registry rebuild the client (markets are kept)
+@ttl_cache(ttl_seconds=86399, on_reset=registry.discard)
 def cached_client():
     return get_exchange_client()
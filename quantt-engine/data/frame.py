@@ -0,0 +1,131 @@
+"""
+frame.py
+Column-oriented container for a window of OHLCV candles.
+"""
+
+from functools import cached_property
+from typing import List, Union
+
+import numpy as np
+
+# ccxt OHLCV layout: [timestamp, open, high, low, close, volume]
+FIELDS = ("ts", "open", "high", "low", "close", "volume")
+
+
+class CandleFrame:
+    """
+    Candles stored as one contiguous (6, n) float array, one row per field.
+    Derived series (typical price, HL2, true range, close diffs) are computed
+    on first access and memoized, so every indicator reading the same frame
+    shares them.
+
+    A stack of equally long windows, (symbols, n, 6), gives a batched frame:
+    columns are (6, symbols, n) and every series runs along the last axis.
+    """
+
+    def __init__(self, candles: Union[List[List[float]], np.ndarray]):
+        data = np.asarray(candles, dtype=float)
+        if data.size == 0 and data.ndim < 3:
+            data = np.empty((0, len(FIELDS)))
+
+        self.columns = np.ascontiguousarray(
+            np.moveaxis(data[..., : len(FIELDS)], -1, 0)
+        )
+
+    @classmethod
+    def _from_columns(cls, columns: np.ndarray) -> "CandleFrame":
+        frame = cls.__new__(cls)
+        frame.columns = columns
+        return frame
+
+    # ---------------- Raw columns ---------------- #
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self.columns[0]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.columns[1]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.columns[2]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.columns[3]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.columns[4]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.columns[5]
+
+    @property
+    def rows(self) -> np.ndarray:
+        """(n, 6) row-major view, the layout of np.asarray(ccxt candles)."""
+        return np.moveaxis(self.columns, 0, -1)
+
+    # ---------------- Derived (memoized) ---------------- #
+
+    @cached_property
+    def typical_price(self) -> np.ndarray:
+        return (self.high + self.low + self.close) / 3
+
+    @cached_property
+    def hl2(self) -> np.ndarray:
+        return (self.high + self.low) / 2.0
+
+    @cached_property
+    def true_range(self) -> np.ndarray:
+        """True range from the second candle on (n - 1 values)."""
+        highs, lows = self.high[..., 1:], self.low[..., 1:]
+        prev_close = self.close[..., :-1]
+        tr = np.maximum(highs - lows, np.abs(highs - prev_close))
+        return np.maximum(tr, np.abs(lows - prev_close))
+
+    @cached_property
+    def close_diff(self) -> np.ndarray:
+        return np.diff(self.close)
+
+    # ---------------- Container protocol ---------------- #
+
+    def __len__(self) -> int:
+        return self.columns.shape[-1]
+
+    @property
+    def symbols(self) -> int:
+        """Number of stacked windows, 0 for a single-symbol frame."""
+        return self.columns.shape[1] if self.columns.ndim == 3 else 0
+
+    def symbol(self, index: int) -> "CandleFrame":
+        """Single-symbol view of one window of a batched frame."""
+        return CandleFrame._from_columns(self.columns[:, index])
+
+    def __getitem__(self, key):
+        """frame[i] -> candle row, frame[a:b] -> zero-copy CandleFrame view."""
+        if isinstance(key, slice):
+            return CandleFrame._from_columns(self.columns[..., key])
+        return self.columns[..., key]
+
+    def tail(self, limit: int) -> "CandleFrame":
+        return self[max(len(self) - limit, 0) :]
+
+    def __repr__(self) -> str:
+        if self.symbols:
+            return f"CandleFrame(symbols={self.symbols}, len={len(self)})"
+        return f"CandleFrame(len={len(self)})"
+
+
+# Anything the indicators accept as a candle window
+Candles = Union[CandleFrame, List[List[float]], np.ndarray]
+
+
+def as_frame(candles: Candles) -> CandleFrame:
+    """Compatibility shim: indicators accept a CandleFrame or raw ccxt candles."""
+    if isinstance(candles, CandleFrame):
+        return candles
+    return CandleFrame(candles)
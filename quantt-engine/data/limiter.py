@@ -0,0 +1,153 @@
+"""
+limiter.py
+Weight-aware token buckets shared by every exchange call.
+
+Each exchange publishes a request budget (weight per time window) and a
+weight per endpoint. A call takes its weight from the bucket of its
+(exchange, endpoint) pair and only blocks once that budget is exhausted.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+# ---------------- Published limits ---------------- #
+
+# (capacity in weight, refill window in seconds) per bucket. Endpoints without
+# a bucket of their own share "*".
+BUDGETS: Dict[str, Dict[str, Tuple[float, float]]] = {
+    # USD-M futures: 2400 request weight per minute per IP
+    "binance": {"*": (2400, 60.0)},
+    # v5 API: 600 requests per 5 seconds per IP
+    "bybit": {"*": (600, 5.0)},
+    # v5 API: limits are per endpoint, requests per 2 seconds
+    "okx": {
+        "fetch_ohlcv": (40, 2.0),
+        "fetch_ticker": (20, 2.0),
+        "fetch_tickers": (20, 2.0),
+        "fetch_order_book": (40, 2.0),
+        "fetch_balance": (10, 2.0),
+        "fetch_order": (60, 2.0),
+        "fetch_orders": (40, 2.0),
+        "fetch_open_orders": (60, 2.0),
+        "create_order": (60, 2.0),
+        "cancel_order": (60, 2.0),
+        "*": (20, 2.0),
+    },
+    # Contract API: 20 requests per 2 seconds
+    "mexc": {"*": (20, 2.0)},
+}
+
+
+def _binance_klines_weight(limit: Optional[int] = None, **_) -> float:
+    limit = limit or 500
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def _binance_depth_weight(limit: Optional[int] = None, **_) -> float:
+    limit = limit or 500
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def _binance_open_orders_weight(symbol: Optional[str] = None, **_) -> float:
+    return 1 if symbol else 40
+
+
+# Weight per endpoint (ccxt method name), a callable when it depends on the
+# call's parameters. Anything not listed weighs 1.
+WEIGHTS = {
+    "binance": {
+        "fetch_ohlcv": _binance_klines_weight,
+        "fetch_order_book": _binance_depth_weight,
+        "fetch_tickers": 40,
+        "fetch_balance": 5,
+        "fetch_orders": 5,
+        "fetch_open_orders": _binance_open_orders_weight,
+    },
+}
+
+
+# ---------------- Buckets ---------------- #
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() reserves its tokens immediately and
+    sleeps off any deficit outside the lock, so callers are served in order.
+    """
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period  # tokens per second
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: float = 1.0) -> float:
+        """Take `weight` tokens, blocking until they are available. Returns the wait."""
+        weight = min(weight, self.capacity)
+
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+            self._tokens -= weight
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class RateLimiter:
+    def __init__(self, budgets=BUDGETS, weights=WEIGHTS):
+        self.budgets = budgets
+        self.weights = weights
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, exchange: str, endpoint: str) -> Optional[TokenBucket]:
+        budgets = self.budgets.get(exchange)
+        if budgets is None:
+            return None
+
+        group = endpoint if endpoint in budgets else "*"
+        key = (exchange, group)
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(*budgets[group])
+            return self._buckets[key]
+
+    def weight(self, exchange: str, endpoint: str, **params) -> float:
+        weight = self.weights.get(exchange, {}).get(endpoint, 1)
+        return weight(**params) if callable(weight) else weight
+
+    def acquire(self, exchange: Optional[str], endpoint: str, **params) -> float:
+        """Block until `endpoint` may be called on `exchange`. Unknown exchanges never wait."""
+        bucket = self.bucket(exchange, endpoint) if exchange else None
+        if bucket is None:
+            return 0.0
+
+        waited = bucket.acquire(self.weight(exchange, endpoint, **params))
+        if waited > 1.0:
+            logger.debug(f"Rate limit: waited {waited:.2f}s for {exchange} {endpoint}")
+        return waited
+
+
+limiter = RateLimiter()
@@ -0,0 +1,227 @@
+"""
+resilience.py
+Shared wrapper for every exchange call.
+
+Failures are classified by their ccxt exception type instead of being
+answered with a client rebuild:
+    - rate limit / network: retried with jittered exponential backoff, and
+      counted by a per-(exchange, endpoint) circuit breaker that fails fast
+      while the endpoint keeps failing. Non-idempotent endpoints (orders)
+      are only retried on a rate limit: any other network error may have
+      reached the exchange.
+    - nonce: the clock offset is reloaded, then retried.
+    - auth: the client is recreated once (credentials may have changed).
+    - invalid order / bad request / other exchange errors: raised as is.
+"""
+
+import random
+import threading
+import time
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+import ccxt
+from loguru import logger
+
+from data.client import cached_client
+from data.limiter import limiter
+
+# Attempts per call, the first one included
+MAX_ATTEMPTS = 4
+# Backoff before retry n is uniform in [0, min(BACKOFF_CAP, base * 2 ** n)]
+BACKOFF_BASE = 0.5
+RATE_LIMIT_BACKOFF_BASE = 2.0
+BACKOFF_CAP = 30.0
+
+# Consecutive retryable failures that open an endpoint's circuit
+FAILURE_THRESHOLD = 5
+# Seconds an open circuit fails fast before letting one trial call through
+RESET_TIMEOUT = 30.0
+
+# Endpoints a retry could duplicate the action of: a network error (timeout,
+# exchange unavailable, dropped connection...) may come after the request
+# reached the exchange, only a rate limit rejects it before execution
+NON_IDEMPOTENT = ("create_order",)
+
+
+class ErrorKind(str, Enum):
+    RATE_LIMIT = "rate_limit"
+    NETWORK = "network"
+    NONCE = "nonce"
+    AUTH = "auth"
+    INVALID = "invalid"
+    EXCHANGE = "exchange"
+
+
+def classify(err: BaseException) -> ErrorKind:
+    # Order matters: the ccxt hierarchy nests these (RateLimitExceeded and
+    # InvalidNonce are NetworkErrors, PermissionDenied an AuthenticationError)
+    if isinstance(err, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+        return ErrorKind.RATE_LIMIT
+    if isinstance(err, ccxt.InvalidNonce):
+        return ErrorKind.NONCE
+    if isinstance(err, ccxt.NetworkError):
+        return ErrorKind.NETWORK
+    if isinstance(err, (ccxt.AuthenticationError, ccxt.AccountSuspended)):
+        return ErrorKind.AUTH
+    if isinstance(err, (ccxt.InvalidOrder, ccxt.InsufficientFunds, ccxt.BadRequest)):
+        return ErrorKind.INVALID
+    return ErrorKind.EXCHANGE
+
+
+class CircuitOpenError(ccxt.ExchangeNotAvailable):
+    """Raised without calling the exchange while an endpoint's circuit is open."""
+
+
+# ---------------- Circuit breaker ---------------- #
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures,
+    open -> half-open after `reset_timeout`, where one trial call decides
+    between closed and open again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(exchange: str, endpoint: str) -> CircuitBreaker:
+    with _breakers_lock:
+        key = (exchange, endpoint)
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker()
+        return _breakers[key]
+
+
+def breaker_states() -> Dict[str, dict]:
+    """{"exchange endpoint": {state, failures}} of every breaker used so far."""
+    with _breakers_lock:
+        items = list(_breakers.items())
+    return {
+        f"{exchange} {endpoint}": {"state": b.state, "failures": b.failures}
+        for (exchange, endpoint), b in items
+    }
+
+
+# ---------------- Calls ---------------- #
+
+
+def _backoff(kind: ErrorKind, attempt: int) -> float:
+    base = RATE_LIMIT_BACKOFF_BASE if kind == ErrorKind.RATE_LIMIT else BACKOFF_BASE
+    return random.uniform(0, min(BACKOFF_CAP, base * 2**attempt))
+
+
+def exchange_call(
+    endpoint: str,
+    *args,
+    client=None,
+    weight_params: Optional[dict] = None,
+    **kwargs,
+):
+    """
+    client.<endpoint>(*args, **kwargs) on `client` (default: cached_client()),
+    rate limited by data.limiter, with retries decided by the error kind.
+    """
+    client = client or cached_client()
+    recreated = False
+
+    for attempt in range(MAX_ATTEMPTS):
+        circuit = breaker(client.id, endpoint)
+        if not circuit.allow():
+            raise CircuitOpenError(
+                f"{client.id} {endpoint} is failing, circuit open for up to "
+                f"{circuit.reset_timeout:.0f}s"
+            )
+
+        limiter.acquire(client.id, endpoint, **(weight_params or {}))
+        try:
+            result = getattr(client, endpoint)(*args, **kwargs)
+        except Exception as err:
+            kind = classify(err)
+            last_attempt = attempt == MAX_ATTEMPTS - 1
+
+            if kind in (ErrorKind.RATE_LIMIT, ErrorKind.NETWORK):
+                circuit.record_failure()
+                ambiguous = kind == ErrorKind.NETWORK
+                if last_attempt or (ambiguous and endpoint in NON_IDEMPOTENT):
+                    raise
+                delay = _backoff(kind, attempt)
+                logger.warning(
+                    f"{client.id} {endpoint} {kind.value} error, retrying in {delay:.2f}s: {err}"
+                )
+                time.sleep(delay)
+                continue
+
+            # Any other error is an answer from a healthy endpoint
+            circuit.record_success()
+
+            if kind == ErrorKind.NONCE and not last_attempt:
+                logger.warning(
+                    f"{client.id} {endpoint} nonce rejected, resyncing clock"
+                )
+                client.load_time_difference()
+
+            elif kind == ErrorKind.AUTH and not recreated and not last_attempt:
+                logger.warning(
+                    f"{client.id} {endpoint} auth error, recreating client: {err}"
+                )
+                cached_client.reset()
+                client = cached_client()
+                recreated = True
+
+            else:
+                raise
+        else:
+            circuit.record_success()
+            return result
+
+
+def safe_exchange_call(func, *args, **kwargs):
+    """exchange_call for a bound ccxt method: safe_exchange_call(client.fetch_order, id)."""
+    return exchange_call(func.__name__, *args, client=func.__self__, **kwargs)
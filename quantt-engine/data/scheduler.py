@@ -0,0 +1,71 @@
+"""
+scheduler.py
+Candle-close aligned prefetching.
+
+Candle windows are cached for a short TTL that never outlives the forming
+candle (data.cache). The scheduler wakes shortly after every close of the
+configured timeframe and syncs the windows of every watched symbol, so the
+cache is warm when the engine evaluates instead of being refilled by the
+first cycle after a close.
+"""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Optional
+
+from loguru import logger
+
+from config import settings
+from data import cache
+from utils import math
+
+# Seconds after a close before fetching, so the exchange has published it
+CLOSE_DELAY = 0.3
+
+
+class PrefetchScheduler:
+    def __init__(self, delay: float = CLOSE_DELAY):
+        self.delay = delay
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            # Re-read every bar, timeframe and watch list are hot-reloaded
+            timeframe = settings.watcher.get_config().timeframe
+            wake_at = math.next_candle_close(timeframe) / 1000 + self.delay
+
+            if self._stop_event.wait(timeout=max(wake_at - time.time(), 0.0)):
+                break
+
+            trading_config = settings.watcher.get_config()
+            started = time.perf_counter()
+            try:
+                cache.prefetch_windows(
+                    trading_config.list_of_interest, trading_config.timeframe
+                )
+            except CancelledError:
+                continue
+            except Exception as e:
+                logger.warning(
+                    f"Candle prefetch after the {timeframe} close failed: {e}"
+                )
+                continue
+
+            logger.debug(
+                f"Prefetched {timeframe} candles in {time.perf_counter() - started:.2f}s"
+            )
+
+
+scheduler = PrefetchScheduler()
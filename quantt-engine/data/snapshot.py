@@ -0,0 +1,89 @@
+"""
+snapshot.py
+Cycle-scoped tickers and order books.
+
+A placement cycle takes one MarketSnapshot: tickers of every symbol come from
+a single fetch_tickers request and order books are loaded in bulk, so sizing,
+entry pricing and the engine's checks all read the same data. Entries older
+than `max_age` seconds are refetched on access.
+"""
+
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+import data.fetch as fetch
+from data.async_fetch import market_data
+from data.client import cached_client
+
+# Seconds a ticker / order book may be served from the snapshot
+SNAPSHOT_MAX_AGE = 5.0
+
+
+class MarketSnapshot:
+    def __init__(
+        self, max_age: float = SNAPSHOT_MAX_AGE, order_book_limit: Optional[int] = None
+    ):
+        self.max_age = max_age
+        self.order_book_limit = order_book_limit
+        self._tickers: Dict[str, Tuple[float, dict]] = {}
+        self._order_books: Dict[str, Tuple[float, dict]] = {}
+
+    def _fresh(self, entries: Dict[str, Tuple[float, dict]], symbol: str):
+        entry = entries.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] <= self.max_age:
+            return entry[1]
+        return None
+
+    # ---------------- Bulk loads ---------------- #
+
+    def load_tickers(self, symbols: Iterable[str]):
+        """Every ticker of `symbols` in one fetch_tickers request."""
+        symbols = list(symbols)
+        if not symbols:
+            return
+
+        tickers = fetch.get_tickers(symbols)
+        now = time.monotonic()
+        for symbol, ticker in tickers.items():
+            self._tickers[symbol] = (now, ticker)
+
+    def load_order_books(self, symbols: Iterable[str]):
+        """
+        Order books of `symbols` with fetch_order_books where the exchange
+        has it, concurrent fetch_order_book calls otherwise.
+        """
+        symbols = [s for s in symbols if self._fresh(self._order_books, s) is None]
+        if not symbols:
+            return
+
+        client = cached_client()
+        if client.has.get("fetchOrderBooks"):
+            books = fetch.get_order_books(symbols, self.order_book_limit)
+        else:
+            books = market_data.order_books_many(symbols, self.order_book_limit)
+
+        now = time.monotonic()
+        for symbol, book in books.items():
+            if isinstance(book, Exception):
+                continue
+            self._order_books[symbol] = (now, book)
+
+    # ---------------- Reads ---------------- #
+
+    def ticker(self, symbol: str) -> dict:
+        ticker = self._fresh(self._tickers, symbol)
+        if ticker is None:
+            logger.debug(f"Snapshot ticker of {symbol} missing or stale, refetching")
+            ticker = fetch.get_ticker(symbol)
+            self._tickers[symbol] = (time.monotonic(), ticker)
+        return ticker
+
+    def order_book(self, symbol: str) -> dict:
+        book = self._fresh(self._order_books, symbol)
+        if book is None:
+            logger.debug(f"Snapshot book of {symbol} missing or stale, refetching")
+            book = fetch.get_order_book(symbol, self.order_book_limit)
+            self._order_books[symbol] = (time.monotonic(), book)
+        return book
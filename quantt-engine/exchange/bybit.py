@@ -8,7 +8,7 @@ from config import settings
 from exchange.awm import ENV_PATH
 
 
-def create_client():
+def create_client(session=None):
     load_dotenv(dotenv_path=ENV_PATH, override=True)
 
     api_key = os.getenv("API_KEY_BYBIT")
@@ -21,6 +21,7 @@ def create_client():
         {
             "apiKey": api_key,
             "secret": api_secret,
+            "session": session,
             # Stability
             "enableRateLimit": True,
             "timeout": 30000,
@@ -41,6 +42,3 @@ def create_client():
     client.enableDemoTrading(settings.watcher.get_config().is_demo_enabled)
 
     return client
-
-
-bb_client = create_client()
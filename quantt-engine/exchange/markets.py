@@ -0,0 +1,128 @@
+"""
+markets.py
+On-disk cache of ccxt market metadata.
+
+load_markets() downloads and parses every market of an exchange (megabytes on
+Binance futures). The result is kept as JSON under qdata/markets and injected
+into new clients with set_markets. A file older than
+TradingConfig.markets_max_age_hours is still used, and refreshed in the
+background on a separate, unauthenticated client: the live client is shared
+by every thread and only gets the result through set_markets.
+"""
+
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import ccxt
+from loguru import logger
+
+from config import settings
+
+if getattr(sys, "frozen", False):
+    DIR = Path(sys.executable).parent
+else:
+    DIR = Path(__file__).resolve().parent.parent
+
+MARKETS_DIR = DIR / "qdata" / "markets"
+
+
+class MarketsCache:
+    def __init__(self, root: Path = MARKETS_DIR):
+        self.root = root
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def path(self, client) -> Path:
+        # Market ids and types differ per account type, keep them apart
+        market_type = client.options.get("defaultType", "default")
+        return self.root / f"{client.id}_{market_type}.json"
+
+    def load(self, client) -> Optional[Tuple[dict, Optional[dict], float]]:
+        """(markets, currencies, age in seconds) stored for `client`, or None."""
+        path = self.path(client)
+        try:
+            age = time.time() - path.stat().st_mtime
+            stored = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            logger.warning(f"Ignoring unreadable markets cache {path.name}: {err}")
+            return None
+        return stored["markets"], stored.get("currencies"), age
+
+    def save(self, client):
+        if not client.markets:
+            return
+        path = self.path(client)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"markets": client.markets, "currencies": client.currencies})
+        )
+        os.replace(tmp_path, path)
+
+    def inject(self, client) -> bool:
+        """
+        set_markets from the cache; False when there is nothing cached and the
+        caller has to load_markets (and save) itself.
+        """
+        stored = self.load(client)
+        if stored is None:
+            return False
+
+        markets, currencies, age = stored
+        client.set_markets(markets, currencies)
+
+        max_age = settings.watcher.get_config().markets_max_age_hours * 3600
+        if age > max_age:
+            self.refresh_in_background(client)
+        return True
+
+    @staticmethod
+    def _scratch_client(client):
+        """Public-data twin of a ccxt `client`: same class, options and URLs."""
+        return type(client)(
+            {
+                "options": copy.deepcopy(client.options),
+                "urls": copy.deepcopy(client.urls),
+                "timeout": client.timeout,
+                "enableRateLimit": True,
+            }
+        )
+
+    def refresh_in_background(self, client):
+        """Reload `client`'s markets from the exchange and store them, off-thread."""
+        key = self.path(client)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if isinstance(client, ccxt.Exchange):
+                    scratch = self._scratch_client(client)
+                    scratch.load_markets()
+                    client.set_markets(scratch.markets, scratch.currencies)
+                else:
+                    # In-process clients (exchange.simulator) reload under their lock
+                    client.load_markets(reload=True)
+                self.save(client)
+                logger.debug(f"Refreshed markets cache {key.name}")
+            except Exception as err:
+                logger.warning(f"Markets cache refresh of {client.id} failed: {err}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="markets-refresh", daemon=True).start()
+
+
+markets_cache = MarketsCache()
@@ -7,7 +7,7 @@ from loguru import logger
 from exchange.awm import ENV_PATH
 
 
-def create_client():
+def create_client(session=None):
     load_dotenv(dotenv_path=ENV_PATH, override=True)
 
     api_key = os.getenv("API_KEY_OKX")
@@ -20,6 +20,7 @@ def create_client():
         {
             "apiKey": api_key,
             "secret": api_secret,
+            "session": session,
             # Stability
             "enableRateLimit": True,
             "timeout": 30000,
@@ -36,6 +37,3 @@ def create_client():
     )
 
     return client
-
-
-okx_client = create_client()
@@ -1,38 +1,99 @@
+import importlib
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
 from loguru import logger
 
 from config import settings
 from exchange.awm import ENV_PATH, ensure_env_file
+from exchange.markets import markets_cache
+
+# exchange name -> module whose create_client(session) builds its ccxt client
+EXCHANGE_MODULES = {
+    "binance": "exchange.binance",
+    "bybit": "exchange.bybit",
+    "okx": "exchange.okx",
+    "mexc": "exchange.mexc",
+    "simulator": "exchange.simulator",
+}
+
+
+def _check_env():
+    logger.info(ensure_env_file())
+
+    if ENV_PATH.stat().st_size == 0:
+        logger.error(
+            "Oops, it seems you dont have data on your .env, write directly on it or use the API page to modify the values."
+        )
 
-logger.info(ensure_env_file())
 
-file_path = ENV_PATH
+class ClientRegistry:
+    """
+    Builds each exchange's client on first use, never at import.
 
-if file_path.stat().st_size == 0:
-    logger.error(
-        "Oops, it seems you dont have data on your .env, write directly on it or use the API page to modify the values."
-    )
+    Every exchange keeps one requests.Session across client rebuilds, and the
+    markets a client loaded are handed to its replacement (the first client
+    gets them from exchange.markets), so a rebuild does not pay for
+    load_markets again.
+    """
 
+    def __init__(self, modules: Dict[str, str] = EXCHANGE_MODULES):
+        self.modules = modules
+        self._clients = {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._markets: Dict[str, Tuple[dict, Optional[dict]]] = {}
+        self._env_checked = False
+        self._lock = threading.RLock()
 
-def get_exchange_client(exchange_name: str = settings.watcher.get_config().exchange):
-    if exchange_name == "bybit":
-        from exchange.bybit import bb_client
+    def get(self, exchange_name: str):
+        with self._lock:
+            client = self._clients.get(exchange_name)
+            if client is None:
+                client = self._clients[exchange_name] = self._build(exchange_name)
+            return client
 
-        return bb_client
+    def _build(self, exchange_name: str):
+        if not self._env_checked:
+            _check_env()
+            self._env_checked = True
 
-    elif exchange_name == "binance":
-        from exchange.binance import bi_client
+        module = importlib.import_module(self.modules[exchange_name])
+        if exchange_name not in self._sessions:
+            self._sessions[exchange_name] = requests.Session()
 
-        return bi_client
+        client = module.create_client(session=self._sessions[exchange_name])
+        if exchange_name in self._markets:
+            client.set_markets(*self._markets[exchange_name])
+        else:
+            markets_cache.inject(client)
 
-    elif exchange_name == "okx":
-        from exchange.okx import okx_client
+        logger.debug(f"Built {exchange_name} client")
+        return client
 
-        return okx_client
+    def cache_markets(self, exchange_name: str, client):
+        """Keep `client`'s loaded markets for the next client of `exchange_name`."""
+        if client.markets:
+            with self._lock:
+                self._markets[exchange_name] = (client.markets, client.currencies)
 
-    elif exchange_name == "mexc":
-        from exchange.mexc import mx_client
+    def discard(self, client):
+        """Drop `client` so the next get() builds a new one with its markets."""
+        with self._lock:
+            for exchange_name, cached in list(self._clients.items()):
+                if cached is client:
+                    self.cache_markets(exchange_name, client)
+                    del self._clients[exchange_name]
 
-        return mx_client
 
-    else:
+registry = ClientRegistry()
+
+
+def get_exchange_client(exchange_name: Optional[str] = None):
+    exchange_name = exchange_name or settings.watcher.get_config().exchange
+
+    if exchange_name not in registry.modules:
         logger.error(f"Unsupported exchange: {exchange_name}")
+        return None
+
+    return registry.get(exchange_name)
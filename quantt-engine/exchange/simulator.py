@@ -0,0 +1,597 @@
+"""
+simulator.py
+In-process simulated exchange with the ccxt surface the engine uses.
+
+Candles come from the OHLCV archive (recorded, replayed with their
+timestamps shifted so they play out from `start`) or from a seeded random
+walk (synthetic). The exchange clock is wall time by default, so the rest of
+the engine (caches, candle store, scheduler) runs as it would live; a `speed`
+above 1 compresses time for offline benchmarks.
+
+Orders are matched on every closed base candle opened at or after they were
+placed (the rest of the candle they were placed in is not known):
+    - limit: fills when the candle trades through the price (postOnly
+      orders that would cross are rejected, other crossing limits take).
+    - market: fills at the last price.
+    - STOP_MARKET / TAKE_PROFIT_MARKET: trigger on stopPrice, fill at it or
+      at the open when the candle gapped past it; a stop wins over a take
+      profit hit in the same candle.
+    - reduceOnly: capped to the open position, expired without one.
+One net position per symbol, margined in its quote currency, with fees.
+"""
+
+import itertools
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import ccxt
+import numpy as np
+from loguru import logger
+
+from config import settings
+from data.archive import OHLCVArchive
+from utils import math
+
+# Resolution the simulator keeps, larger timeframes are resampled from it
+BASE_TIMEFRAME = "1m"
+# Base candles available before the clock starts (500 candles of 15m)
+HISTORY = 7500
+# Per-candle log return volatility of synthetic markets
+SYNTHETIC_VOLATILITY = 0.002
+
+MAKER_FEE = 0.0002
+TAKER_FEE = 0.0004
+# Market orders pay this fraction past the last price
+MARKET_SLIPPAGE = 0.0002
+
+DEFAULT_BALANCES = {"USDT": 10_000.0, "USDC": 10_000.0}
+
+# Levels per side of a synthetic order book and their spacing (of price)
+BOOK_LEVELS = 100
+BOOK_STEP = 0.0001
+
+STOP_TYPES = ("stop_market", "stop")
+TAKE_PROFIT_TYPES = ("take_profit_market", "take_profit")
+
+
+class SimulatedExchange:
+    id = "simulator"
+    timeframes = {
+        tf: tf for tf in ("1m", "5m", "15m", "30m", "1h", "4h", "6h", "12h", "1d")
+    }
+    has = {
+        "fetchOHLCV": True,
+        "fetchTicker": True,
+        "fetchTickers": True,
+        "fetchOrderBook": True,
+        "fetchOrderBooks": True,
+        "fetchBalance": True,
+        "createOrder": True,
+        "cancelOrder": True,
+        "fetchOrder": True,
+        "fetchOrders": True,
+        "fetchOpenOrders": True,
+        "setLeverage": True,
+    }
+
+    def __init__(
+        self,
+        symbols: List[str],
+        balances: Optional[Dict[str, float]] = None,
+        replay_exchange: Optional[str] = None,
+        archive: Optional[OHLCVArchive] = None,
+        seed: int = 0,
+        start: Optional[float] = None,
+        speed: float = 1.0,
+        leverage: float = 1.0,
+    ):
+        """
+        replay_exchange: archived series (data.archive) to replay, None for
+        synthetic candles. start: exchange time (ms) at creation, default now.
+        speed: exchange ms per wall ms.
+        """
+        self.symbols = list(symbols)
+        self.seed = seed
+        self.speed = speed
+        self.default_leverage = leverage
+        self.options = {"defaultType": "future"}
+        self.markets = None
+        self.currencies = None
+        self.apiKey = self.secret = None
+        self.timeout = 30000
+        self.precisionMode = ccxt.TICK_SIZE
+
+        self._base_ms = math.timeframe_to_ms(BASE_TIMEFRAME)
+        self._wall_start = time.time() * 1000
+        self._start = self._wall_start if start is None else start
+        # First candle opened at or after `start` is the first one replayed
+        self._origin = (self._start // self._base_ms) * self._base_ms
+
+        self._candles: Dict[str, np.ndarray] = {}
+        self._rng: Dict[str, np.random.Generator] = {}
+        self._replay = replay_exchange is not None
+        for symbol in self.symbols:
+            if self._replay:
+                self._candles[symbol] = self._load_recorded(
+                    archive or OHLCVArchive(), replay_exchange, symbol
+                )
+            else:
+                self._rng[symbol] = np.random.default_rng(
+                    [seed, zlib.crc32(symbol.encode())]
+                )
+                self._candles[symbol] = np.empty((0, 6))
+
+        self._wallets = {k: float(v) for k, v in (balances or DEFAULT_BALANCES).items()}
+        self._positions: Dict[str, dict] = {}
+        self._leverage: Dict[str, float] = {}
+        self._orders: Dict[str, dict] = {}
+        self._open: Dict[str, List[str]] = {s: [] for s in self.symbols}
+        self._matched = {s: self._origin - self._base_ms for s in self.symbols}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # ---------------- Clock & candles ---------------- #
+
+    def milliseconds(self) -> int:
+        elapsed = time.time() * 1000 - self._wall_start
+        return int(self._start + elapsed * self.speed)
+
+    def _load_recorded(self, archive: OHLCVArchive, exchange: str, symbol: str):
+        recorded = np.array(archive.read(exchange, symbol, BASE_TIMEFRAME))
+        if len(recorded) < 2:
+            raise ValueError(
+                f"No archived {BASE_TIMEFRAME} candles of {symbol} on {exchange} to replay"
+            )
+        # Shift so the candle after the history (at most half the recording)
+        # opens at the origin
+        history = min(HISTORY, len(recorded) // 2)
+        recorded[:, 0] += self._origin - recorded[history, 0]
+        return recorded
+
+    def _extend_synthetic(self, symbol: str, until: float):
+        """Random walk up to the candle open at `until`."""
+        candles = self._candles[symbol]
+        first = self._origin - HISTORY * self._base_ms
+        last = candles[-1, 0] if len(candles) else first - self._base_ms
+        count = int((until - last) // self._base_ms)
+        if count <= 0:
+            return
+
+        rng = self._rng[symbol]
+        prev_close = (
+            candles[-1, 4]
+            if len(candles)
+            else 10.0 * (1 + zlib.crc32(symbol.encode()) % 1000)
+        )
+        returns = rng.normal(0.0, SYNTHETIC_VOLATILITY, count)
+        closes = prev_close * np.exp(np.cumsum(returns))
+        opens = np.concatenate(([prev_close], closes[:-1]))
+        wicks = np.abs(rng.normal(0.0, SYNTHETIC_VOLATILITY / 2, (2, count)))
+        highs = np.maximum(opens, closes) * np.exp(wicks[0])
+        lows = np.minimum(opens, closes) * np.exp(-wicks[1])
+        volumes = rng.lognormal(3.0, 0.5, count)
+        ts = last + self._base_ms * np.arange(1, count + 1)
+
+        new = np.column_stack((ts, opens, highs, lows, closes, volumes))
+        self._candles[symbol] = np.concatenate((candles, new))
+
+    def _visible(self, symbol: str) -> np.ndarray:
+        """Base candles opened up to now, the last one is still forming."""
+        if symbol not in self._candles:
+            raise ccxt.BadSymbol(f"simulator does not list {symbol}")
+
+        now = self.milliseconds()
+        if not self._replay:
+            self._extend_synthetic(symbol, now)
+        candles = self._candles[symbol]
+        return candles[: int(np.searchsorted(candles[:, 0], now, side="right"))]
+
+    def _last_price(self, symbol: str) -> float:
+        return float(self._visible(symbol)[-1, 4])
+
+    # ---------------- Matching ---------------- #
+
+    def _match(self):
+        """Run every open order against the base candles closed since last time."""
+        now = self.milliseconds()
+        for symbol in self.symbols:
+            candles = self._visible(symbol)
+            closed = candles[candles[:, 0] + self._base_ms <= now]
+            closed = closed[closed[:, 0] > self._matched[symbol]]
+            if len(closed) == 0:
+                continue
+
+            for candle in closed:
+                orders = [
+                    self._orders[order_id]
+                    for order_id in self._open[symbol]
+                    if self._orders[order_id]["timestamp"] <= candle[0]
+                ]
+                # Stops first: the candle's path is unknown, assume the worst
+                orders.sort(key=lambda order: order["type"].lower() not in STOP_TYPES)
+                for order in orders:
+                    self._match_order(order, candle)
+            self._matched[symbol] = closed[-1, 0]
+
+    def _match_order(self, order: dict, candle: np.ndarray):
+        ts, open_, high, low = candle[0], candle[1], candle[2], candle[3]
+        kind, side = order["type"].lower(), order["side"]
+        is_buy = side == "buy"
+
+        if kind == "limit":
+            price = order["price"]
+            if (low <= price) if is_buy else (high >= price):
+                fill = min(price, open_) if is_buy else max(price, open_)
+                self._fill(order, fill, MAKER_FEE, ts)
+            return
+
+        stop = order["stopPrice"]
+        if kind in STOP_TYPES:
+            # A buy stop protects a short: triggers on the way up
+            triggered = high >= stop if is_buy else low <= stop
+            gapped = open_ >= stop if is_buy else open_ <= stop
+        else:
+            triggered = low <= stop if is_buy else high >= stop
+            gapped = open_ <= stop if is_buy else open_ >= stop
+        if triggered:
+            self._fill(order, open_ if gapped else stop, TAKER_FEE, ts)
+
+    def _fill(self, order: dict, price: float, fee_rate: float, ts: float):
+        symbol = order["symbol"]
+        amount = order["remaining"]
+        position = self._positions.setdefault(symbol, {"amount": 0.0, "entry": 0.0})
+
+        if order["reduceOnly"]:
+            # Only the opposite side of an open position can be reduced
+            opposite = (
+                position["amount"] < 0
+                if order["side"] == "buy"
+                else position["amount"] > 0
+            )
+            amount = min(amount, abs(position["amount"])) if opposite else 0.0
+            if amount <= 0:
+                self._close_order(order, "expired", ts)
+                return
+
+        signed = amount if order["side"] == "buy" else -amount
+        held = position["amount"]
+        quote = self._quote(symbol)
+
+        if held == 0 or (held > 0) == (signed > 0):
+            total = held + signed
+            position["entry"] = (held * position["entry"] + signed * price) / total
+            position["amount"] = total
+        else:
+            closing = min(abs(signed), abs(held))
+            pnl = closing * (price - position["entry"]) * (1 if held > 0 else -1)
+            self._wallets[quote] = self._wallets.get(quote, 0.0) + pnl
+            if abs(signed) > abs(held):
+                position["amount"], position["entry"] = held + signed, price
+            else:
+                position["amount"] = held + signed
+                if abs(position["amount"]) < 1e-12:
+                    position["amount"], position["entry"] = 0.0, 0.0
+
+        fee = amount * price * fee_rate
+        self._wallets[quote] = self._wallets.get(quote, 0.0) - fee
+
+        filled = order["filled"] + amount
+        order["average"] = (
+            (order["average"] or 0.0) * order["filled"] + price * amount
+        ) / filled
+        order["filled"] = filled
+        order["remaining"] = order["amount"] - filled
+        order["cost"] = order["average"] * filled
+        order["fee"]["cost"] += fee
+        order["lastTradeTimestamp"] = int(ts)
+        order["trades"].append(
+            {"timestamp": int(ts), "price": price, "amount": amount, "fee": fee}
+        )
+        self._close_order(order, "closed", ts)
+
+    def _close_order(self, order: dict, status: str, ts: float):
+        order["status"] = status
+        order["info"]["status"] = status.upper()
+        order["info"]["updateTime"] = int(ts)
+        if order["id"] in self._open[order["symbol"]]:
+            self._open[order["symbol"]].remove(order["id"])
+
+    @staticmethod
+    def _quote(symbol: str) -> str:
+        return symbol.split("/")[1].split(":")[0]
+
+    # ---------------- Markets ---------------- #
+
+    def load_markets(self, reload: bool = False, params=None):
+        with self._lock:
+            if self.markets and not reload:
+                return self.markets
+            markets = {}
+            for symbol in self.symbols:
+                base, quote = symbol.split("/")[0], self._quote(symbol)
+                markets[symbol] = {
+                    "id": symbol.replace("/", "").split(":")[0],
+                    "symbol": symbol,
+                    "base": base,
+                    "quote": quote,
+                    "settle": quote,
+                    "type": "swap",
+                    "linear": True,
+                    "contract": True,
+                    "active": True,
+                    "taker": TAKER_FEE,
+                    "maker": MAKER_FEE,
+                    "precision": {"amount": 0.001, "price": 0.0001},
+                    "limits": {"amount": {"min": 0.001}, "leverage": {"max": 125}},
+                    "info": {},
+                }
+            currencies = {
+                code: {"id": code, "code": code, "precision": 1e-8}
+                for m in markets.values()
+                for code in (m["base"], m["quote"])
+            }
+            self.set_markets(markets, currencies)
+            return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+
+    def load_time_difference(self, params=None):
+        return 0
+
+    def set_leverage(self, leverage, symbol=None, params=None):
+        with self._lock:
+            self._leverage[symbol] = float(leverage)
+            return {"symbol": symbol, "leverage": float(leverage)}
+
+    # ---------------- Market data ---------------- #
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        with self._lock:
+            candles = self._visible(symbol)
+            timeframe_ms = math.timeframe_to_ms(timeframe)
+            if timeframe_ms % self._base_ms:
+                raise ccxt.BadRequest(f"simulator cannot build {timeframe} candles")
+
+            if timeframe_ms != self._base_ms:
+                candles = self._resample(candles, timeframe_ms)
+            if since is not None:
+                candles = candles[candles[:, 0] >= since]
+            if limit is not None:
+                candles = candles[:limit] if since is not None else candles[-limit:]
+            return candles.tolist()
+
+    @staticmethod
+    def _resample(candles: np.ndarray, timeframe_ms: int) -> np.ndarray:
+        buckets = candles[:, 0] // timeframe_ms * timeframe_ms
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(candles)] - 1
+        return np.column_stack(
+            (
+                buckets[starts],
+                candles[starts, 1],
+                np.maximum.reduceat(candles[:, 2], starts),
+                np.minimum.reduceat(candles[:, 3], starts),
+                candles[ends, 4],
+                np.add.reduceat(candles[:, 5], starts),
+            )
+        )
+
+    def fetch_ticker(self, symbol, params=None):
+        with self._lock:
+            candles = self._visible(symbol)
+            day = candles[candles[:, 0] > candles[-1, 0] - 86_400_000]
+            last = float(candles[-1, 4])
+            now = self.milliseconds()
+            return {
+                "symbol": symbol,
+                "timestamp": now,
+                "datetime": None,
+                "high": float(day[:, 2].max()),
+                "low": float(day[:, 3].min()),
+                "bid": last * (1 - BOOK_STEP),
+                "ask": last * (1 + BOOK_STEP),
+                "open": float(day[0, 1]),
+                "close": last,
+                "last": last,
+                "baseVolume": float(day[:, 5].sum()),
+                "quoteVolume": float((day[:, 5] * day[:, 4]).sum()),
+                "info": {},
+            }
+
+    def fetch_tickers(self, symbols=None, params=None):
+        return {s: self.fetch_ticker(s) for s in (symbols or self.symbols)}
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        with self._lock:
+            candles = self._visible(symbol)
+            last = float(candles[-1, 4])
+            depth = limit or BOOK_LEVELS
+            # Resting size per level scales with recent traded volume
+            size = float(candles[-20:, 5].mean()) / 10
+            steps = np.arange(1, depth + 1)
+            volumes = size * (1 + steps / 10)
+            return {
+                "symbol": symbol,
+                "bids": np.column_stack(
+                    (last * (1 - BOOK_STEP * steps), volumes)
+                ).tolist(),
+                "asks": np.column_stack(
+                    (last * (1 + BOOK_STEP * steps), volumes)
+                ).tolist(),
+                "timestamp": self.milliseconds(),
+                "datetime": None,
+                "nonce": None,
+            }
+
+    def fetch_order_books(self, symbols=None, limit=None, params=None):
+        return {s: self.fetch_order_book(s, limit) for s in (symbols or self.symbols)}
+
+    # ---------------- Account ---------------- #
+
+    def fetch_balance(self, params=None):
+        with self._lock:
+            self._match()
+            balance = {"info": {}, "free": {}, "used": {}, "total": {}}
+            for code, wallet in self._wallets.items():
+                used, unrealized = 0.0, 0.0
+                for symbol, position in self._positions.items():
+                    if self._quote(symbol) != code or position["amount"] == 0:
+                        continue
+                    last = self._last_price(symbol)
+                    leverage = self._leverage.get(symbol, self.default_leverage)
+                    used += abs(position["amount"]) * position["entry"] / leverage
+                    unrealized += position["amount"] * (last - position["entry"])
+                total = wallet + unrealized
+                entry = {"free": total - used, "used": used, "total": total}
+                balance[code] = entry
+                for key in ("free", "used", "total"):
+                    balance[key][code] = entry[key]
+            return balance
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        params = params or {}
+        with self._lock:
+            self._match()
+            kind, side = type.lower(), side.lower()
+            if kind not in ("limit", "market") + STOP_TYPES + TAKE_PROFIT_TYPES:
+                raise ccxt.InvalidOrder(f"simulator does not support {type} orders")
+            if amount is None or amount <= 0:
+                raise ccxt.InvalidOrder(f"Invalid amount {amount}")
+
+            last = self._last_price(symbol)
+            stop = params.get("stopPrice") or params.get("triggerPrice")
+            reduce_only = bool(params.get("reduceOnly"))
+            post_only = bool(params.get("postOnly"))
+            if kind not in ("limit", "market") and stop is None:
+                raise ccxt.ArgumentsRequired(f"{type} orders need a stopPrice")
+            if kind == "limit" and price is None:
+                raise ccxt.ArgumentsRequired("limit orders need a price")
+
+            is_buy = side == "buy"
+            crosses = kind == "limit" and (price >= last if is_buy else price <= last)
+            if crosses and post_only:
+                raise ccxt.OrderImmediatelyFillable(
+                    f"postOnly {side} at {price} would cross the last price {last}"
+                )
+
+            if not reduce_only:
+                leverage = self._leverage.get(symbol, self.default_leverage)
+                margin = amount * (price or last) / leverage
+                free = self.fetch_balance()[self._quote(symbol)]["free"]
+                if margin > free:
+                    raise ccxt.InsufficientFunds(
+                        f"{margin:.2f} margin needed, {free:.2f} free"
+                    )
+
+            now = self.milliseconds()
+            # Unique across restarts, order ids are primary keys in the database
+            order_id = f"{int(self._wall_start)}{next(self._ids):06d}"
+            order = {
+                "id": order_id,
+                "clientOrderId": None,
+                "timestamp": now,
+                "datetime": None,
+                "lastTradeTimestamp": None,
+                "symbol": symbol,
+                "type": type,
+                "timeInForce": "GTX" if post_only else "GTC",
+                "postOnly": post_only,
+                "reduceOnly": reduce_only,
+                "side": side,
+                "price": price,
+                "stopPrice": stop,
+                "triggerPrice": stop,
+                "amount": amount,
+                "filled": 0.0,
+                "remaining": amount,
+                "cost": 0.0,
+                "average": None,
+                "status": "open",
+                "fee": {"cost": 0.0, "currency": self._quote(symbol)},
+                "trades": [],
+                "info": {
+                    "orderId": order_id,
+                    "status": "NEW",
+                    "reduceOnly": str(reduce_only).lower(),
+                    "updateTime": now,
+                },
+            }
+            self._orders[order_id] = order
+            self._open[symbol].append(order_id)
+
+            if kind == "market":
+                slip = MARKET_SLIPPAGE if is_buy else -MARKET_SLIPPAGE
+                self._fill(order, last * (1 + slip), TAKER_FEE, now)
+            elif crosses:
+                self._fill(order, last, TAKER_FEE, now)
+            return dict(order)
+
+    def cancel_order(self, id, symbol=None, params=None):
+        with self._lock:
+            self._match()
+            order = self._orders.get(str(id))
+            if order is None or order["status"] != "open":
+                raise ccxt.OrderNotFound(f"simulator has no open order {id}")
+            self._close_order(order, "canceled", self.milliseconds())
+            return dict(order)
+
+    def fetch_order(self, id, symbol=None, params=None):
+        with self._lock:
+            self._match()
+            order = self._orders.get(str(id))
+            if order is None:
+                raise ccxt.OrderNotFound(f"simulator has no order {id}")
+            return dict(order)
+
+    def fetch_orders(self, symbol=None, since=None, limit=None, params=None):
+        with self._lock:
+            self._match()
+            orders = [
+                dict(o)
+                for o in self._orders.values()
+                if (symbol is None or o["symbol"] == symbol)
+                and (since is None or o["timestamp"] >= since)
+            ]
+            return orders[-limit:] if limit else orders
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        with self._lock:
+            self._match()
+            symbols = [symbol] if symbol else self.symbols
+            orders = [dict(self._orders[i]) for s in symbols for i in self._open[s]]
+            return orders[-limit:] if limit else orders
+
+    def fetch_positions(self, symbols=None, params=None):
+        with self._lock:
+            self._match()
+            return [
+                {
+                    "symbol": symbol,
+                    "contracts": abs(p["amount"]),
+                    "side": "long" if p["amount"] > 0 else "short",
+                    "entryPrice": p["entry"],
+                    "markPrice": self._last_price(symbol),
+                }
+                for symbol, p in self._positions.items()
+                if p["amount"] != 0 and (not symbols or symbol in symbols)
+            ]
+
+
+def create_client(session=None):
+    trading_config = settings.watcher.get_config()
+    logger.info(
+        "Using the simulated exchange"
+        + (
+            f", replaying {trading_config.simulator_replay} candles"
+            if trading_config.simulator_replay
+            else " with synthetic candles"
+        )
+    )
+    return SimulatedExchange(
+        trading_config.list_of_interest,
+        replay_exchange=trading_config.simulator_replay,
+    )
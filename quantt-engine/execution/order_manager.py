@@ -5,31 +5,11 @@ from loguru import logger
 from sqlalchemy.sql import False_
 
 import data.fetch as fetch
-from data.client import cached_client
+from data.resilience import safe_exchange_call
 from execution import risk_manager
 from persistance.connection import SessionLocal
 from persistance.models import GeneralOrder, TakeStopOrder
 
-# ------------------- Safe Helper ------------------- #
-
-
-def safe_exchange_call(func, *args, **kwargs):
-    try:
-        return func(*args, **kwargs)
-
-    except Exception as err:
-        logger.warning(f"Exchange error, recreating client: {err}")
-
-        cached_client.reset()
-
-        client = cached_client()
-
-        # retry using refreshed client
-        new_func = getattr(client, func.__name__)
-
-        return new_func(*args, **kwargs)
-
-
 # --------------------- Helpers --------------------- #
 
 
@@ -90,8 +70,6 @@ def _place_linked_order(
     to avoid UnboundLocalErrors and code duplication.
     """
     try:
-        time.sleep(0.5)
-
         order_data = safe_exchange_call(
             client.create_order,
             symbol=market,
@@ -3,7 +3,7 @@ from sqlalchemy import desc, select
 
 import data.fetch as fetch
 from config import settings
-from data.client import cached_client
+from data.resilience import safe_exchange_call
 from execution import risk_manager as rm
 from persistance.connection import SessionLocal
 from persistance.models import (
@@ -11,25 +11,6 @@ from persistance.models import (
     TakeStopOrder,
 )
 
-# ------------------- Safe Helper ------------------- #
-
-
-def safe_exchange_call(func, *args, **kwargs):
-    try:
-        return func(*args, **kwargs)
-
-    except Exception as err:
-        logger.warning(f"Exchange error, recreating client: {err}")
-
-        cached_client.reset()
-
-        client = cached_client()
-
-        # retry using refreshed client
-        new_func = getattr(client, func.__name__)
-
-        return new_func(*args, **kwargs)
-
 
 def manage_open_symbols():
     symbol_status = {}
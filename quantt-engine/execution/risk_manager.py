@@ -8,48 +8,62 @@ from config import risk
 r = risk.watcher.get_config()
 
 
-def smart_amount(market: str):
+def smart_amount(market: str, snapshot=None):
     try:
-        # 1. Fetch data
+        # 1. Fetch data (the ticker from the cycle's MarketSnapshot if given)
         bal = fetch.balance()
-        ticker = fetch.get_ticker(market)
+        ticker = (
+            snapshot.ticker(market)
+            if snapshot is not None
+            else fetch.get_ticker(market)
+        )
 
         last = ticker.get("last") or ticker.get("close")
 
         # 3. Extract Balance
         usdt_n = bal.get("USDT", {}).get("free")
 
-        # 4. Safety Check: Avoid Division by Zero
-        if not last or last <= 0 or math.isnan(last):
-            return 0.0
+        return position_size(usdt_n, last)
 
-        # 5. Calculation Logic
-        percentage = getattr(r, "percentage_of_capital_per_trade", 0.0)
-        leverage = getattr(r, "leverage", 1.0)
+    except Exception as e:
+        # Log the error if necessary: logger.info(f"Error in smart_amount: {e}")
+        return 0.0
 
-        limited = usdt_n * percentage
-        ma = (limited / last) * leverage
 
-        # 6. Final Polish
-        # Check result one last time before rounding
-        if math.isnan(ma) or math.isinf(ma):
-            return 0.0
+def position_size(free_balance: float, last: float) -> float:
+    """smart_amount's sizing from an already known free balance and price."""
+    # 4. Safety Check: Avoid Division by Zero
+    if not last or last <= 0 or math.isnan(last):
+        return 0.0
 
-        return round(ma, 4)
+    # 5. Calculation Logic
+    percentage = getattr(r, "percentage_of_capital_per_trade", 0.0)
+    leverage = getattr(r, "leverage", 1.0)
 
-    except Exception as e:
-        # Log the error if necessary: logger.info(f"Error in smart_amount: {e}")
+    limited = free_balance * percentage
+    ma = (limited / last) * leverage
+
+    # 6. Final Polish
+    # Check result one last time before rounding
+    if math.isnan(ma) or math.isinf(ma):
         return 0.0
 
+    return round(ma, 4)
+
 
-def blp(market: str, side: str, amount: float):
+def blp(market: str, side: str, amount: float, snapshot=None):
     """
     Search for the best price for limit type of orders, utilizing the order book.
     there might be some delays and inacuracies compared to the order book.
+    With a MarketSnapshot, the book and ticker are read from it.
     """
 
-    order_book = fetch.get_order_book(market)
-    ticker = fetch.get_ticker(market)
+    if snapshot is not None:
+        order_book = snapshot.order_book(market)
+        ticker = snapshot.ticker(market)
+    else:
+        order_book = fetch.get_order_book(market)
+        ticker = fetch.get_ticker(market)
     lp = ticker["last"]
 
     if side == "bullish" or side == "buy" or side == "Buy":
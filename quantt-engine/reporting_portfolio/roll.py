@@ -1,4 +1,3 @@
-import time
 from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
@@ -6,6 +5,7 @@ from sqlalchemy.orm import Session
 from config import store
 from data import fetch
 from persistance.models import GeneralOrder, TakeStopOrder
+from reporting_portfolio import series
 
 # ================================================================== #
 #  Initializations                                                   #
@@ -43,7 +43,6 @@ def get_closed_trades(session: Session) -> list[dict]:
 
     # PnL, No need for trades and others
     store_t = store_cfg.balances.get("USDT", 0.0)
-    time.sleep(1)
     actual = fetch.balance()
     actual_t = actual.get("USDT", {}).get("total", 0.0)
     untracked_pnl = actual_t - store_t
@@ -92,7 +91,7 @@ def get_closed_trades(session: Session) -> list[dict]:
 
 # ================================================================== #
 #  Series / graphic data — lists of {x, y} points for charts         #
-#  All series use trade-based `pnl`.                                  #
+#  All series use trade-based `pnl` (see reporting_portfolio.series). #
 # ================================================================== #
 
 
@@ -102,20 +101,7 @@ def get_equity_curve(session: Session) -> list[dict]:
     Each point: { timestamp (ISO), equity (float) }
     Frontend: Line chart.
     """
-    trades = get_closed_trades(session)
-    trades.sort(key=lambda t: t["exit_time"])
-
-    cumulative = 0.0
-    curve = []
-    for t in trades:
-        cumulative += t["pnl"]
-        curve.append(
-            {
-                "timestamp": t["exit_time"].isoformat(),
-                "equity": round(cumulative, 4),
-            }
-        )
-    return curve
+    return series.equity_curve(get_closed_trades(session))
 
 
 def get_daily_pnl(session: Session) -> list[dict]:
@@ -124,14 +110,7 @@ def get_daily_pnl(session: Session) -> list[dict]:
     Each point: { date (YYYY-MM-DD), pnl (float) }
     Frontend: Green/red bar chart.
     """
-    trades = get_closed_trades(session)
-    daily: dict[str, float] = {}
-
-    for t in trades:
-        day = t["exit_time"].strftime("%Y-%m-%d")
-        daily[day] = daily.get(day, 0.0) + t["pnl"]
-
-    return [{"date": day, "pnl": round(pnl, 4)} for day, pnl in sorted(daily.items())]
+    return series.daily_pnl(get_closed_trades(session))
 
 
 def get_drawdown_series(session: Session) -> list[dict]:
@@ -141,26 +120,7 @@ def get_drawdown_series(session: Session) -> list[dict]:
     Each point: { timestamp (ISO), drawdown_abs (float), drawdown_pct (float) }
     Frontend: Red filled area chart.
     """
-    trades = get_closed_trades(session)
-    trades.sort(key=lambda t: t["exit_time"])
-
-    cumulative = peak = 0.0
-    series = []
-
-    for t in trades:
-        cumulative += t["pnl"]
-        if cumulative > peak:
-            peak = cumulative
-        dd_abs = peak - cumulative
-        dd_pct = (dd_abs / peak * 100) if peak > 0 else 0.0
-        series.append(
-            {
-                "timestamp": t["exit_time"].isoformat(),
-                "drawdown_abs": round(dd_abs, 4),
-                "drawdown_pct": round(dd_pct, 2),
-            }
-        )
-    return series
+    return series.drawdown_series(get_closed_trades(session))
 
 
 def get_daily_trade_count(session: Session) -> list[dict]:
@@ -169,11 +129,4 @@ def get_daily_trade_count(session: Session) -> list[dict]:
     Each point: { date (YYYY-MM-DD), count (int) }
     Frontend: Bar chart.
     """
-    trades = get_closed_trades(session)
-    daily: dict[str, int] = {}
-
-    for t in trades:
-        day = t["exit_time"].strftime("%Y-%m-%d")
-        daily[day] = daily.get(day, 0) + 1
-
-    return [{"date": day, "count": count} for day, count in sorted(daily.items())]
+    return series.daily_trade_count(get_closed_trades(session))
@@ -0,0 +1,83 @@
+"""
+series.py
+Chart series built from a list of closed trades, shaped as
+reporting_portfolio.roll.get_closed_trades returns them (the backtester's
+trades have the same shape). No database or exchange access here: roll.py
+feeds them the live trades, backtesting.engine its simulated ones.
+"""
+
+# ================================================================== #
+#  Series — lists of {x, y} points for charts                        #
+#  All series use trade-based `pnl`.                                  #
+# ================================================================== #
+
+
+def equity_curve(trades: list[dict]) -> list[dict]:
+    """
+    Cumulative trade-based P&L over time.
+    Each point: { timestamp (ISO), equity (float) }
+    """
+    cumulative = 0.0
+    curve = []
+    for t in sorted(trades, key=lambda t: t["exit_time"]):
+        cumulative += t["pnl"]
+        curve.append(
+            {
+                "timestamp": t["exit_time"].isoformat(),
+                "equity": round(cumulative, 4),
+            }
+        )
+    return curve
+
+
+def daily_pnl(trades: list[dict]) -> list[dict]:
+    """
+    Trade-based P&L grouped by UTC calendar day.
+    Each point: { date (YYYY-MM-DD), pnl (float) }
+    """
+    daily: dict[str, float] = {}
+
+    for t in trades:
+        day = t["exit_time"].strftime("%Y-%m-%d")
+        daily[day] = daily.get(day, 0.0) + t["pnl"]
+
+    return [{"date": day, "pnl": round(pnl, 4)} for day, pnl in sorted(daily.items())]
+
+
+def drawdown_series(trades: list[dict]) -> list[dict]:
+    """
+    Drawdown at each closed trade exit using trade-based P&L —
+    how far below the running peak.
+    Each point: { timestamp (ISO), drawdown_abs (float), drawdown_pct (float) }
+    """
+    cumulative = peak = 0.0
+    series = []
+
+    for t in sorted(trades, key=lambda t: t["exit_time"]):
+        cumulative += t["pnl"]
+        if cumulative > peak:
+            peak = cumulative
+        dd_abs = peak - cumulative
+        dd_pct = (dd_abs / peak * 100) if peak > 0 else 0.0
+        series.append(
+            {
+                "timestamp": t["exit_time"].isoformat(),
+                "drawdown_abs": round(dd_abs, 4),
+                "drawdown_pct": round(dd_pct, 2),
+            }
+        )
+    return series
+
+
+def daily_trade_count(trades: list[dict]) -> list[dict]:
+    """
+    Number of trades closed per UTC calendar day.
+    Each point: { date (YYYY-MM-DD), count (int) }
+    """
+    daily: dict[str, int] = {}
+
+    for t in trades:
+        day = t["exit_time"].strftime("%Y-%m-%d")
+        daily[day] = daily.get(day, 0) + 1
+
+    return [{"date": day, "count": count} for day, count in sorted(daily.items())]
@@ -0,0 +1,307 @@
+"""
+batch.py
+Indicator votes for many symbols in one pass.
+
+Candle windows of the same length are stacked into one (symbols x candles x
+fields) CandleFrame and every indicator runs once along the candle axis for
+all of them. The votes are then aggregated per symbol by
+signal_generator.verdict, so a verdict is the same as the one
+avaliation_of_market returns for that symbol alone.
+
+Streamed indicators (signal_generator.market_streams) are read from each
+symbol's readings when it has them, like the per-symbol graph does.
+
+Structural signals (candlestick patterns, SMR) are detected for the whole
+stack at once too, then each symbol's patterns / events are seeded into the
+MarketEvaluation it gets: the votes are cast there, and its SMR events are
+reused by stop placement afterwards.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+import strategy.indicators as indicators
+import strategy.signal_generator as sg
+from data import cache
+from data.frame import CandleFrame
+from strategy.registry import EvaluationContext, IndicatorRegistry
+
+# Only full windows are batched, shorter ones (fresh listings) and symbols
+# with invalid indicator values go through avaliation_of_market instead
+MIN_CANDLES = 42
+
+# ----------------------- Helpers ----------------------- #
+
+
+class BatchVote(NamedTuple):
+    category: str
+    score: np.ndarray  # per symbol, NaN where the vote adds no score
+    side: np.ndarray  # per symbol, +1 / -1 / 0
+    counted: bool
+    valid: np.ndarray  # per symbol, False where an indicator value is invalid
+    value: Optional[np.ndarray] = None
+
+    def vote(self, index: int) -> sg.Vote:
+        score = self.score[index]
+        return sg.Vote(
+            self.category,
+            None if np.isnan(score) else float(score),
+            int(self.side[index]),
+            self.counted,
+            None if self.value is None else float(self.value[index]),
+        )
+
+
+def _finite(*values) -> np.ndarray:
+    return np.logical_and.reduce([np.isfinite(v) for v in values])
+
+
+def _binary_vote(category: str, bullish: np.ndarray, valid: np.ndarray) -> BatchVote:
+    return BatchVote(
+        category, bullish.astype(float), np.where(bullish, 1, -1), True, valid
+    )
+
+
+def _stack_votes(votes: List[Optional[sg.Vote]], category: str) -> BatchVote:
+    """Per-symbol Votes as one BatchVote, None marks a symbol that raised."""
+    valid = np.array([v is not None for v in votes])
+    score = np.array(
+        [np.nan if v is None or v.score is None else v.score for v in votes]
+    )
+    side = np.array([0 if v is None else v.side for v in votes])
+    return BatchVote(category, score, side, True, valid)
+
+
+def _streamed(streams, name: str, compute) -> Tuple[np.ndarray, ...]:
+    """
+    signal_generator._streamed for every symbol: the readings of `name`
+    stacked per field, compute() on the stacked frame for symbols without one.
+    """
+    readings = [None if s is None else s.get(name) for s in streams or ()]
+    if readings and all(r is not None for r in readings):
+        return tuple(np.array(field, dtype=float) for field in zip(*readings))
+
+    fields = tuple(np.array(field, dtype=float) for field in compute())
+    for i, reading in enumerate(readings):
+        if reading is not None:
+            for field, value in zip(fields, reading):
+                field[i] = value
+    return fields
+
+
+def _per_symbol(name: str, category: str, evaluations, **stacked) -> BatchVote:
+    """
+    Evaluate `name` in each symbol's own MarketEvaluation context, `stacked`
+    holds per-symbol node values seeded into those contexts first.
+    """
+    votes = []
+    for i, evaluation in enumerate(evaluations):
+        evaluation.context.seed(**{node: values[i] for node, values in stacked.items()})
+        try:
+            votes.append(evaluation.context[name])
+        except ValueError:
+            votes.append(None)
+    return _stack_votes(votes, category)
+
+
+# --------------------- BATCHED GRAPH --------------------- #
+
+# Same node names as signal_generator.graph, every node returns a BatchVote.
+# The values come from the strategy.indicators functions themselves, which
+# run along the candle axis of the stacked frame (one value per symbol), or
+# from the "streams" seed: one market_streams readings dict (or None) per symbol.
+graph = IndicatorRegistry()
+
+
+@graph.register("vwap", inputs=("frame", "streams"))
+def _vwap(frame, streams):
+    value, mean = _streamed(streams, "vwap", lambda: indicators.vwap(frame)[:2])
+    return _binary_vote("trend", value > mean, _finite(value, mean))
+
+
+@graph.register("rsi", inputs=("frame", "streams"))
+def _rsi(frame, streams):
+    value, _ = _streamed(streams, "rsi", lambda: indicators.rsi(frame)[:2])
+    return BatchVote(
+        "momentum", value / 100.0, np.where(value > 50, 1, -1), True, _finite(value)
+    )
+
+
+@graph.register("tnk", inputs=("frame",))
+def _tnk(frame):
+    tenkan, kijun = indicators.tenkan_and_kijun(frame)
+    return _binary_vote("trend", tenkan > kijun, _finite(tenkan, kijun))
+
+
+@graph.register("macd", inputs=("frame",))
+def _macd(frame):
+    hist = indicators.macd(frame)[2]
+    return _binary_vote("momentum", hist > 0, _finite(hist))
+
+
+@graph.register("ema", inputs=("frame", "streams"))
+def _ema(frame, streams):
+    value, mean = _streamed(streams, "ema", lambda: indicators.ema(frame)[:2])
+    return _binary_vote("trend", value > mean, _finite(value, mean))
+
+
+@graph.register("atr", inputs=("frame", "streams"))
+def _atr(frame, streams):
+    value, mean = _streamed(streams, "atr", lambda: indicators.atr(frame)[:2])
+    ratio = np.minimum(value / (mean + 1e-9), 1.0)
+    side = np.zeros(len(value), dtype=int)
+    return BatchVote("structure", ratio, side, False, _finite(value, mean))
+
+
+@graph.register("roc", inputs=("frame",))
+def _roc(frame):
+    value, _, _ = indicators.roc(frame)
+    return _binary_vote("momentum", value > 0, _finite(value))
+
+
+@graph.register("st", inputs=("frame",))
+def _st(frame):
+    _, direction, _ = indicators.supertrend(frame)
+    valid = np.ones(frame.symbols, dtype=bool)
+    return _binary_vote("trend", direction == "up", valid)
+
+
+@graph.register("bb", inputs=("frame", "streams"))
+def _bb(frame, streams):
+    upper, middle, lower, mean_width = _streamed(
+        streams, "bb", lambda: sg._bb_reading(frame)
+    )
+    ratio = np.minimum((upper - lower) / (mean_width + 1e-9), 1.0)
+    valid = _finite(upper, middle, lower, mean_width)
+    side = np.zeros(len(ratio), dtype=int)
+    return BatchVote("structure", ratio, side, False, valid)
+
+
+@graph.register("adx", inputs=("frame", "streams"))
+def _adx(frame, streams):
+    value, mean = _streamed(streams, "adx", lambda: indicators.adx(frame)[:2])
+    side = np.zeros(len(value), dtype=int)
+    return BatchVote(
+        "trend",
+        np.minimum(value / 50.0, 1.0),
+        side,
+        False,
+        _finite(value, mean),
+        value=value,
+    )
+
+
+@graph.register("obv", inputs=("frame", "streams"))
+def _obv(frame, streams):
+    value, mean = _streamed(streams, "obv", lambda: indicators.obv(frame)[:2])
+    return _binary_vote("volume", value > mean, _finite(value, mean))
+
+
+@graph.register("patterns", inputs=("frame",))
+def _patterns(frame):
+    return indicators.detect_candlestick_patterns(frame.tail(14))
+
+
+@graph.register("smr_events", inputs=("frame",))
+def _smr_events(frame):
+    return indicators.smr(frame)
+
+
+@graph.register("dscp", inputs=("evaluations", "patterns"))
+def _dscp(evaluations, patterns):
+    return _per_symbol("dscp", "structure", evaluations, patterns=patterns)
+
+
+@graph.register("smr", inputs=("evaluations", "smr_events"))
+def _smr(evaluations, smr_events):
+    return _per_symbol("smr", "structure", evaluations, smr_events=smr_events)
+
+
+# --------------------- FINAL AVALIATION --------------------- #
+
+
+def evaluate_frames(
+    markets: Sequence[str],
+    windows,
+    parameters: list[str],
+    streams: Optional[Sequence[Optional[dict]]] = None,
+) -> List[Optional[sg.MarketEvaluation]]:
+    """
+    Evaluations of equal-length candle windows ((len(markets), n, 6), one per
+    market) stacked into one frame, with the market_streams readings of each
+    window (or None) when given. None where an indicator value is invalid,
+    those take the per-symbol path to surface the error.
+    """
+    parameters_lower = [p.lower() for p in parameters]
+    names = list(dict.fromkeys(p for p in parameters_lower if p in sg.SIGNALS))
+
+    frame = CandleFrame(windows)
+    evaluations = [
+        sg.MarketEvaluation(
+            market, frame.symbol(i), None if streams is None else streams[i]
+        )
+        for i, market in enumerate(markets)
+    ]
+    votes = EvaluationContext(
+        graph, frame=frame, streams=streams, evaluations=evaluations
+    ).evaluate(names)
+
+    valid = np.ones(len(markets), dtype=bool)
+    for vote in votes.values():
+        valid &= vote.valid
+
+    for i, evaluation in enumerate(evaluations):
+        if valid[i]:
+            evaluation.verdict = sg.verdict(
+                {name: vote.vote(i) for name, vote in votes.items()},
+                parameters_lower,
+            )
+    return [e if e.verdict is not None else None for e in evaluations]
+
+
+def evaluate_markets(
+    markets: Sequence[str], parameters: list[str]
+) -> Dict[str, sg.MarketEvaluation]:
+    """
+    {market: signal_generator.evaluate_market(market, parameters)},
+    evaluated one stacked window group at a time.
+    """
+    # The window and the streams of a market read one snapshot of its history,
+    # later syncs (the scheduler, other markets) do not reach either
+    windows, streams = {}, {}
+    for market in markets:
+        history = cache.cached_history(market=market)
+        windows[market] = history[-sg.WINDOW :]
+        streams[market] = sg.market_streams(market, history)
+
+    groups: Dict[int, List[str]] = {}
+    for market, window in windows.items():
+        groups.setdefault(len(window), []).append(market)
+
+    evaluations = {}
+    for length, group in groups.items():
+        if length < MIN_CANDLES:
+            continue
+
+        group_windows = [windows[market] for market in group]
+        group_streams = [streams[market] for market in group]
+        for evaluation in evaluate_frames(
+            group, group_windows, parameters, group_streams
+        ):
+            if evaluation is not None:
+                evaluations[evaluation.market] = evaluation
+
+    # Leftovers take the per-symbol path, which also raises their errors
+    return {
+        market: evaluations.get(market) or sg.evaluate_market(market, parameters)
+        for market in markets
+    }
+
+
+def avaliation_of_markets(
+    markets: Sequence[str], parameters: list[str]
+) -> Dict[str, dict]:
+    """Verdict table {market: avaliation_of_market(market, parameters)}."""
+    evaluations = evaluate_markets(markets, parameters)
+    return {market: evaluation.verdict for market, evaluation in evaluations.items()}
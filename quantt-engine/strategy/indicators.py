@@ -1,57 +1,66 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np  # type: ignore
 from loguru import logger
+from numpy.lib.stride_tricks import sliding_window_view
 
 import utils.math as smath
+from data.frame import Candles, as_frame
 
 # ---------------- TECHNICAL INDICATORS ---------------- #
 
+# Every indicator below runs along the last (candle) axis of the frame, so a
+# batched CandleFrame (see strategy.batch) gets one value per symbol: the
+# floats documented in each Returns become arrays over the symbol axis.
+
+
+def _last(series: np.ndarray):
+    """Last value of `series`, a float for a single-symbol series."""
+    last = series[..., -1]
+    return float(last) if np.ndim(last) == 0 else last
+
+
+def _mean(series: np.ndarray):
+    """Mean of `series` over the candle axis, a float for a single-symbol series."""
+    mean = np.mean(series, axis=-1)
+    return float(mean) if np.ndim(mean) == 0 else mean
+
+
 # ---------- VWAP-indicator ----------#
 
 
-def vwap(candles: List[List[float]], period: int = 14, use_typical_price: bool = True):
+def vwap(candles: Candles, period: int = 14, use_typical_price: bool = True):
     """
     Returns:
         vwap_value: float   # last VWAP value
         vwap_mean:  float   # mean VWAP over the window
-        vwap_series: list   # full series of VWAP values
+        vwap_series: np.ndarray  # full series of VWAP values
     """
     if len(candles) < period:
         logger.warning("Not enough candles to compute VWAP")
 
-    candles = np.asarray(candles, dtype=float)
-
-    # OHLC structure
-    highs = candles[:, 2]
-    lows = candles[:, 3]
-    closes = candles[:, 4]
-    volumes = candles[:, 5]
+    frame = as_frame(candles)
+    volumes = frame.volume
 
     if use_typical_price:
-        prices = (highs + lows + closes) / 3
+        prices = frame.typical_price
     else:
-        prices = closes
-
-    pv = prices * volumes
-    vwap_series = []
+        prices = frame.close
 
-    # Sliding window calculation (non-vectorized)
-    for i in range(period, len(candles) + 1):
-        window_pv = pv[i - period : i]
-        window_vol = volumes[i - period : i]
+    # Rolling window sums from cumulative sums: O(n) instead of O(n * period)
+    window_pv = smath.rolling_sum(prices * volumes, period)
+    window_vol = smath.rolling_sum(volumes, period)
 
-        sum_vol = np.sum(window_vol)
+    # Count traded candles per window exactly, so float residue left by the
+    # cumulative sums can never pass for real volume on a dead window
+    traded = smath.rolling_sum(volumes != 0, period)
+    last_prices = prices[..., period - 1 :]
 
-        if sum_vol == 0:
-            current_vwap = prices[i - 1]
-        else:
-            current_vwap = np.sum(window_pv) / sum_vol
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap_series = np.where(traded > 0, window_pv / window_vol, last_prices)
 
-        vwap_series.append(current_vwap)
-
-    vwap_value = float(vwap_series[-1])
-    vwap_mean = float(np.mean(vwap_series))
+    vwap_value = _last(vwap_series)
+    vwap_mean = _mean(vwap_series)
 
     return vwap_value, vwap_mean, vwap_series
 
@@ -60,7 +69,7 @@ def vwap(candles: List[List[float]], period: int = 14, use_typical_price: bool =
 
 
 def rsi(
-    candles: List[List[float]],
+    candles: Candles,
     period: int = 14,
     mode: str = "close-close",  # "close-close" (standard) | "open-close"
 ):
@@ -68,21 +77,19 @@ def rsi(
     Returns:
         rsi_value: float   # last RSI value
         rsi_mean:  float   # mean RSI over the window
+        rsi_series: np.ndarray  # full series of RSI values
     """
 
     if len(candles) < period + 1:
         logger.warning("Not enough candles to compute RSI")
 
-    candles = np.asarray(candles, dtype=float)
-
-    opens = candles[:, 1]
-    closes = candles[:, 4]
+    frame = as_frame(candles)
 
     # --- price deltas ---
     if mode == "close-close":
-        deltas = np.diff(closes)
+        deltas = frame.close_diff
     elif mode == "open-close":
-        deltas = closes - opens
+        deltas = frame.close - frame.open
     else:
         logger.error(f"mode must be 'close-close' or 'open-close', actual mode: {mode}")
 
@@ -90,27 +97,16 @@ def rsi(
     gains = np.clip(deltas, 0.0, None)
     losses = np.clip(-deltas, 0.0, None)
 
-    # --- Wilder initialization (first 14) ---
-    avg_gain = gains[:period].mean()
-    avg_loss = losses[:period].mean()
-
-    rsi_series = []
-
-    # --- Wilder smoothing over remaining candles ---
-    for i in range(period, len(gains)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    # --- Wilder smoothing (seed = SMA of the first `period` deltas) ---
+    avg_gain = smath.wilder_smoothing(gains, period)[..., 1:]
+    avg_loss = smath.wilder_smoothing(losses, period)[..., 1:]
 
-        if avg_loss == 0:
-            rsi_val = 100.0
-        else:
-            rs = avg_gain / avg_loss
-            rsi_val = 100.0 - (100.0 / (1.0 + rs))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        rsi_series = np.where(avg_loss == 0, 100.0, 100.0 - (100.0 / (1.0 + rs)))
 
-        rsi_series.append(rsi_val)
-
-    rsi_value = float(rsi_series[-1])
-    rsi_mean = float(np.mean(rsi_series))
+    rsi_value = _last(rsi_series)
+    rsi_mean = _mean(rsi_series)
 
     return rsi_value, rsi_mean, rsi_series
 
@@ -119,7 +115,7 @@ def rsi(
 
 
 def tenkan_and_kijun(
-    candles: List[List[float]],
+    candles: Candles,
     conversion_period: int = 9,  # Tenkan-sen
     base_period: int = 26,  # Kijun-sen
 ):
@@ -132,19 +128,19 @@ def tenkan_and_kijun(
     if len(candles) < base_period:
         logger.warning("Not enough candles for tenkan and kijun.")
 
-    candles = np.asarray(candles, dtype=float)
+    frame = as_frame(candles)
 
-    highs = candles[:, 2]
-    lows = candles[:, 3]
+    highs = frame.high
+    lows = frame.low
 
     # --- Conversion Line (Tenkan-sen) ---
-    tenkan_high = np.max(highs[-conversion_period:])
-    tenkan_low = np.min(lows[-conversion_period:])
+    tenkan_high = np.max(highs[..., -conversion_period:], axis=-1)
+    tenkan_low = np.min(lows[..., -conversion_period:], axis=-1)
     tenkan_sen = (tenkan_high + tenkan_low) / 2.0
 
     # --- Base Line (Kijun-sen) ---
-    kijun_high = np.max(highs[-base_period:])
-    kijun_low = np.min(lows[-base_period:])
+    kijun_high = np.max(highs[..., -base_period:], axis=-1)
+    kijun_low = np.min(lows[..., -base_period:], axis=-1)
     kijun_sen = (kijun_high + kijun_low) / 2.0
 
     return tenkan_sen, kijun_sen
@@ -154,7 +150,7 @@ def tenkan_and_kijun(
 
 
 def macd(
-    candles: List[List[float]],
+    candles: Candles,
     fast_period: int = 12,
     slow_period: int = 26,
     signal_period: int = 9,
@@ -165,95 +161,71 @@ def macd(
         macd_value: float        # last MACD line value
         signal_value: float      # last signal line value
         hist_value: float        # last histogram value
-        macd_series: list[float]
-        signal_series: list[float]
-        hist_series: list[float]
+        macd_series: np.ndarray
+        signal_series: np.ndarray
+        hist_series: np.ndarray
     """
 
     if len(candles) < slow_period + signal_period:
         logger.warning("Not enough candles to compute MACD")
 
-    candles = np.asarray(candles, dtype=float)
-
-    opens = candles[:, 1]
-    highs = candles[:, 2]
-    lows = candles[:, 3]
-    closes = candles[:, 4]
+    frame = as_frame(candles)
 
     # --- price selection ---
     if price_mode == "close":
-        price = closes
+        price = frame.close
     elif price_mode == "hl2":
-        price = (highs + lows) / 2.0
+        price = frame.hl2
     elif price_mode == "ohlc4":
-        price = (opens + highs + lows + closes) / 4.0
+        price = (frame.open + frame.high + frame.low + frame.close) / 4.0
     else:
         logger.error(
             f"price_mode must be 'close', 'hl2', or 'ohlc4' actual price_mode: {price_mode}"
         )
 
-    def ema(series, period):
-        alpha = 2.0 / (period + 1.0)
-        ema_vals = [series[0]]
-        for i in range(1, len(series)):
-            ema_vals.append(alpha * series[i] + (1 - alpha) * ema_vals[-1])
-        return np.array(ema_vals)
-
-    # --- MACD components ---
-    ema_fast = ema(price, fast_period)
-    ema_slow = ema(price, slow_period)
+    # --- MACD components (EMAs seeded with the first value) ---
+    ema_fast = smath.ema_series(price, fast_period)
+    ema_slow = smath.ema_series(price, slow_period)
 
     macd_line = ema_fast - ema_slow
-    signal_line = ema(macd_line, signal_period)
+    signal_line = smath.ema_series(macd_line, signal_period)
     histogram = macd_line - signal_line
 
-    macd_value = float(macd_line[-1])
-    signal_value = float(signal_line[-1])
-    hist_value = float(histogram[-1])
+    macd_value = _last(macd_line)
+    signal_value = _last(signal_line)
+    hist_value = _last(histogram)
 
     return (
         macd_value,
         signal_value,
         hist_value,
-        macd_line.tolist(),
-        signal_line.tolist(),
-        histogram.tolist(),
+        macd_line,
+        signal_line,
+        histogram,
     )
 
 
 # ---------- EMA-indicator ----------#
 
 
-def ema(candles: List[List[float]], period: int = 20):
+def ema(candles: Candles, period: int = 20):
     """
     Returns:
         ema_value: float   # last EMA value
         ema_mean:  float   # mean EMA over the window
-        ema_series: list   # full series of EMA values
+        ema_series: np.ndarray  # full series of EMA values
     """
     if len(candles) < period:
         logger.warning("Not enough candles to compute EMA")
         return 0.0, 0.0, []
 
-    candles = np.asarray(candles, dtype=float)
-    closes = candles[:, 4]
-
-    ema_series = []
+    closes = as_frame(candles).close
 
-    # Initialize with the SMA of the first 'period' candles
-    current_ema = np.mean(closes[:period])
-    ema_series.append(current_ema)
+    # Initialized with the SMA of the first 'period' candles
+    ema_series = smath.ema_series(closes, period, seed="sma")
 
-    # Calculate the smoothing multiplier
-    multiplier = 2 / (period + 1)
-
-    # Calculate remaining EMA values
-    for i in range(period, len(closes)):
-        current_ema = (closes[i] - current_ema) * multiplier + current_ema
-        ema_series.append(current_ema)
-
-    ema_value = float(ema_series[-1])
-    ema_mean = float(np.mean(ema_series))
+    ema_value = _last(ema_series)
+    ema_mean = _mean(ema_series)
 
     return ema_value, ema_mean, ema_series
 
@@ -261,40 +233,25 @@ def ema(candles: List[List[float]], period: int = 20):
 # ---------- ATR-indicator ----------#
 
 
-def atr(candles: List[List[float]], period: int = 14) -> Tuple[float, float, list]:
+def atr(candles: Candles, period: int = 14) -> Tuple[float, float, np.ndarray]:
     """
     Returns:
         atr_value: float    # last ATR value
         atr_mean:  float    # mean ATR over the window
-        atr_series: list    # full series of ATR values
+        atr_series: np.ndarray  # full series of ATR values
     """
     if len(candles) < period + 1:
         logger.warning("Not enough candles to compute ATR")
         return 0.0, 0.0, []
 
-    candles = np.asarray(candles, dtype=float)
-    highs = candles[:, 2]
-    lows = candles[:, 3]
-    closes = candles[:, 4]
-
-    tr1 = highs[1:] - lows[1:]
-    tr2 = np.abs(highs[1:] - closes[:-1])
-    tr3 = np.abs(lows[1:] - closes[:-1])
-
-    tr = np.maximum(tr1, np.maximum(tr2, tr3))
+    tr = as_frame(candles).true_range
 
-    # The first ATR value is the SMA of the first 'period' TRs
-    atr_series = []
-    current_atr = np.mean(tr[:period])
-    atr_series.append(current_atr)
+    # The first ATR value is the SMA of the first 'period' TRs,
+    # subsequent values use Wilder's: (Prev_ATR * (n-1) + Current_TR) / n
+    atr_series = smath.wilder_smoothing(tr, period)
 
-    # Subsequent values use Wilder's: (Prev_ATR * (n-1) + Current_TR) / n
-    for i in range(period, len(tr)):
-        current_atr = (current_atr * (period - 1) + tr[i]) / period
-        atr_series.append(current_atr)
-
-    atr_value = float(atr_series[-1])
-    atr_mean = float(np.mean(atr_series))
+    atr_value = _last(atr_series)
+    atr_mean = _mean(atr_series)
 
     return atr_value, atr_mean, atr_series
 
@@ -302,7 +259,7 @@ def atr(candles: List[List[float]], period: int = 14) -> Tuple[float, float, lis
 # ---------- ROC-indicator ----------#
 
 
-def roc(candles: List[List[float]], period: int = 12):
+def roc(candles: Candles, period: int = 12):
     """
     Returns:
         roc_value: float   # last ROC value (percentage)
@@ -313,18 +270,17 @@ def roc(candles: List[List[float]], period: int = 12):
         logger.warning("Not enough candles to compute ROC")
         return 0.0, 0.0, []
 
-    candles = np.asarray(candles, dtype=float)
-    closes = candles[:, 4]
+    closes = as_frame(candles).close
 
     # Calculate ROC: ((Current - Past) / Past) * 100
     # We slice to align the 'current' with the 'past'
-    current_prices = closes[period:]
-    past_prices = closes[:-period]
+    current_prices = closes[..., period:]
+    past_prices = closes[..., :-period]
 
     roc_series = ((current_prices - past_prices) / past_prices) * 100
 
-    roc_value = float(roc_series[-1])
-    roc_mean = float(np.mean(roc_series))
+    roc_value = _last(roc_series)
+    roc_mean = _mean(roc_series)
 
     return roc_value, roc_mean, roc_series.tolist()
 
@@ -332,8 +288,52 @@ def roc(candles: List[List[float]], period: int = 12):
 # ---------- ST-indicator ----------#
 
 
+@smath.jit
+def _supertrend_state(closes, basic_ub, basic_lb, period):
+    # One row per symbol, (rows, n) closes and (rows, n - period) basic bands
+    rows, n = closes.shape
+    st_series = np.zeros((rows, n))
+    direction = np.ones((rows, n), dtype=np.int64)  # 1 for Up, -1 for Down
+
+    for row in range(rows):
+        upper_band = np.zeros(n)
+        lower_band = np.zeros(n)
+
+        for i in range(period, n):
+            ub = basic_ub[row, i - period]
+            lb = basic_lb[row, i - period]
+            prev_close = closes[row, i - 1]
+
+            # Final Upper Band (Cannot move up if price is below previous upper band)
+            if ub < upper_band[i - 1] or prev_close > upper_band[i - 1]:
+                upper_band[i] = ub
+            else:
+                upper_band[i] = upper_band[i - 1]
+
+            # Final Lower Band (Cannot move down if price is above previous lower band)
+            if lb > lower_band[i - 1] or prev_close < lower_band[i - 1]:
+                lower_band[i] = lb
+            else:
+                lower_band[i] = lower_band[i - 1]
+
+            # Determine Direction
+            if closes[row, i] > upper_band[i - 1]:
+                direction[row, i] = 1
+            elif closes[row, i] < lower_band[i - 1]:
+                direction[row, i] = -1
+            else:
+                direction[row, i] = direction[row, i - 1]
+
+            if direction[row, i] == 1:
+                st_series[row, i] = lower_band[i]
+            else:
+                st_series[row, i] = upper_band[i]
+
+    return st_series, direction
+
+
 def supertrend(
-    candles: List[List[float]], period: int = 10, multiplier: float = 3.0
+    candles: Candles, period: int = 10, multiplier: float = 3.0
 ) -> Tuple[float, str, list]:
     """
     Returns:
@@ -345,115 +345,75 @@ def supertrend(
         logger.warning("Not enough candles for SuperTrend")
         return 0.0, "neutral", []
 
-    candles = np.asarray(candles, dtype=float)
-    highs = candles[:, 2]
-    lows = candles[:, 3]
-    closes = candles[:, 4]
-
-    # 1. Calculate ATR rolling window
-    atr_values = np.zeros(len(candles))
-    for i in range(1, len(candles)):
-        tr = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1]),
-        )
-        atr_values[i] = tr
-
-    # Simple Moving Average of TR to get ATR
-    # We'll use a manual rolling mean to stay consistent with your ATR function
-    def get_atr_at_index(idx):
-        return np.mean(atr_values[max(1, idx - period + 1) : idx + 1])
-
-    # 2. Initialize variables
-    st_series = [0.0] * len(candles)
-    direction = [1] * len(candles)  # 1 for Up, -1 for Down
-
-    upper_band = np.zeros(len(candles))
-    lower_band = np.zeros(len(candles))
-
-    for i in range(period, len(candles)):
-        current_atr = get_atr_at_index(i)
-        median_price = (highs[i] + lows[i]) / 2
-
-        basic_ub = median_price + (multiplier * current_atr)
-        basic_lb = median_price - (multiplier * current_atr)
-
-        # Final Upper Band (Cannot move up if price is below previous upper band)
-        if basic_ub < upper_band[i - 1] or closes[i - 1] > upper_band[i - 1]:
-            upper_band[i] = basic_ub
-        else:
-            upper_band[i] = upper_band[i - 1]
-
-        # Final Lower Band (Cannot move down if price is above previous lower band)
-        if basic_lb > lower_band[i - 1] or closes[i - 1] < lower_band[i - 1]:
-            lower_band[i] = basic_lb
-        else:
-            lower_band[i] = lower_band[i - 1]
-
-        # Determine Direction
-        if closes[i] > upper_band[i - 1]:
-            direction[i] = 1
-        elif closes[i] < lower_band[i - 1]:
-            direction[i] = -1
-        else:
-            direction[i] = direction[i - 1]
-
-        st_series[i] = lower_band[i] if direction[i] == 1 else upper_band[i]
+    frame = as_frame(candles)
+    closes = frame.close
+
+    # 1. ATR as the mean of the last `period` true ranges, each window reduced
+    #    by np.mean like the per-candle slices were: a running sum rounds
+    #    differently, which flips band / direction comparisons at ties
+    atr_values = sliding_window_view(frame.true_range, period, axis=-1).mean(axis=-1)
+
+    # 2. Basic bands, then the sequential final-band / direction state machine
+    median_price = frame.hl2[..., period:]
+    basic_ub = median_price + (multiplier * atr_values)
+    basic_lb = median_price - (multiplier * atr_values)
+
+    n = closes.shape[-1]
+    st_series, direction = _supertrend_state(
+        np.ascontiguousarray(closes.reshape(-1, n)),
+        np.ascontiguousarray(basic_ub.reshape(-1, n - period)),
+        np.ascontiguousarray(basic_lb.reshape(-1, n - period)),
+        period,
+    )
+    st_series = st_series.reshape(closes.shape)
+    direction = direction.reshape(closes.shape)
 
-    last_st = float(st_series[-1])
-    last_dir = "up" if direction[-1] == 1 else "down"
+    last_st = _last(st_series)
+    last_dir = np.where(direction[..., -1] == 1, "up", "down")
+    last_dir = str(last_dir) if last_dir.ndim == 0 else last_dir
 
-    return last_st, last_dir, st_series[period:]
+    return last_st, last_dir, st_series[..., period:].tolist()
 
 
 # ---------- BB-indicator ----------#
 
 
 def bollinger_bands(
-    candles: List[List[float]], period: int = 20, std_dev_multiplier: float = 2.0
+    candles: Candles, period: int = 20, std_dev_multiplier: float = 2.0
 ):
     """
     Returns:
         last_bands: tuple   # (upper, middle, lower) for the latest candle
         bb_mean_width: float # mean bandwidth (volatility proxy)
-        bb_series: dict     # full series for upper, middle, and lower
+        bb_series: dict     # upper, middle, lower and bandwidth series (ndarrays)
     """
     if len(candles) < period:
         logger.warning("Not enough candles to compute Bollinger Bands")
 
-    candles = np.asarray(candles, dtype=float)
-    closes = candles[:, 4]
-
-    upper_series = []
-    middle_series = []
-    lower_series = []
-    bandwidth_series = []
-
-    for i in range(period, len(closes) + 1):
-        window = closes[i - period : i]
+    closes = as_frame(candles).close
 
-        sma = np.mean(window)
-        std = np.std(window)
+    # One pass of rolling moments instead of np.mean / np.std per window
+    middle_series, std_series = smath.rolling_mean_std(closes, period)
 
-        upper = sma + (std_dev_multiplier * std)
-        lower = sma - (std_dev_multiplier * std)
+    upper_series = middle_series + (std_dev_multiplier * std_series)
+    lower_series = middle_series - (std_dev_multiplier * std_series)
 
-        upper_series.append(upper)
-        middle_series.append(sma)
-        lower_series.append(lower)
-
-        # Bandwidth is a useful secondary metric: (Upper - Lower) / Middle
-        bandwidth_series.append((upper - lower) / sma)
+    # Bandwidth is a useful secondary metric: (Upper - Lower) / Middle
+    bandwidth_series = (upper_series - lower_series) / middle_series
 
     last_bands = (
-        float(upper_series[-1]),
-        float(middle_series[-1]),
-        float(lower_series[-1]),
+        _last(upper_series),
+        _last(middle_series),
+        _last(lower_series),
     )
-    bb_mean_width = float(np.mean(bandwidth_series))
+    bb_mean_width = _mean(bandwidth_series)
 
-    bb_series = {"upper": upper_series, "middle": middle_series, "lower": lower_series}
+    bb_series = {
+        "upper": upper_series,
+        "middle": middle_series,
+        "lower": lower_series,
+        "bandwidth": bandwidth_series,
+    }
 
     return last_bands, bb_mean_width, bb_series
 
@@ -461,30 +421,26 @@ def bollinger_bands(
 # ---------- ADX-indicator ----------#
 
 
-def adx(candles: List[List[float]], period: int = 14):
+def adx(candles: Candles, period: int = 14):
     if len(candles) < period * 2:
         logger.warning("Not enough candles to compute ADX")
 
-    candles = np.asarray(candles, dtype=float)
-    highs = candles[:, 2]
-    lows = candles[:, 3]
-    closes = candles[:, 4]
+    frame = as_frame(candles)
 
-    up_move = np.diff(highs)
-    down_move = -np.diff(lows)
+    up_move = np.diff(frame.high)
+    down_move = -np.diff(frame.low)
 
     plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
     minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
 
-    tr = np.maximum(highs[1:] - lows[1:], np.abs(highs[1:] - closes[:-1]))
-    tr = np.maximum(tr, np.abs(lows[1:] - closes[:-1]))
+    tr = frame.true_range
 
     def smooth(data, per):
-        smoothed = np.zeros(len(data))
-        seed = np.mean(data[:per])
-        smoothed[per - 1] = seed if not np.isnan(seed) else 0.0
-        for i in range(per, len(data)):
-            smoothed[i] = (smoothed[i - 1] * (per - 1) + data[i]) / per
+        smoothed = np.zeros(data.shape)
+        seed = np.mean(data[..., :per], axis=-1)
+        seed = np.where(np.isnan(seed), 0.0, seed)
+        smoothed[..., per - 1] = seed
+        smoothed[..., per:] = smath.recursive_filter(data[..., per:], 1.0 / per, seed)
         return smoothed
 
     tr_smooth = smooth(tr, period)
@@ -501,21 +457,21 @@ def adx(candles: List[List[float]], period: int = 14):
     # Final NaN/inf sweep before returning
     adx_series = np.nan_to_num(adx_series, nan=0.0, posinf=100.0, neginf=0.0)
 
-    adx_value = float(adx_series[-1])
-    adx_mean = float(np.mean(adx_series))
+    adx_value = _last(adx_series)
+    adx_mean = _mean(adx_series)
 
-    if np.isnan(adx_value) or np.isinf(adx_value):
+    if not np.all(np.isfinite(adx_value)):
         raise ValueError(f"ADX computation produced an invalid adx_value: {adx_value}")
-    if np.isnan(adx_mean) or np.isinf(adx_mean):
+    if not np.all(np.isfinite(adx_mean)):
         raise ValueError(f"ADX computation produced an invalid adx_mean: {adx_mean}")
 
-    return adx_value, adx_mean, adx_series.tolist()
+    return adx_value, adx_mean, adx_series
 
 
 # ---------- OBV-indicator ----------#
 
 
-def obv(candles: List[List[float]]):
+def obv(candles: Candles):
     """
     Returns:
         obv_value: float    # last OBV value
@@ -525,24 +481,22 @@ def obv(candles: List[List[float]]):
     if len(candles) < 2:
         logger.warning("Not enough candles to compute OBV")
 
-    candles = np.asarray(candles, dtype=float)
-
-    closes = candles[:, 4]
-    volumes = candles[:, 5]
+    frame = as_frame(candles)
+    volumes = frame.volume
 
     # Calculate price changes
     # We use np.diff and then pad with a 0 at the start to keep arrays same length
-    price_change = np.diff(closes)
-    price_change = np.insert(price_change, 0, 0)
+    first = np.zeros(volumes.shape[:-1] + (1,))
+    price_change = np.concatenate((first, frame.close_diff), axis=-1)
 
     # Determine direction: +1 if price up, -1 if price down, 0 if flat
     direction = np.sign(price_change)
 
     # Cumulative sum of (direction * volume)
-    obv_series = np.cumsum(direction * volumes)
+    obv_series = np.cumsum(direction * volumes, axis=-1)
 
-    obv_value = float(obv_series[-1])
-    obv_mean = float(np.mean(obv_series))
+    obv_value = _last(obv_series)
+    obv_mean = _mean(obv_series)
 
     return obv_value, obv_mean, obv_series.tolist()
 
@@ -554,159 +508,139 @@ def obv(candles: List[List[float]]):
 # ============================================================
 
 
+# Pattern type codes, the "type" field of a pattern record indexes this tuple
+CANDLESTICK_PATTERNS = (
+    "bullish_engulfing",
+    "bearish_engulfing",
+    "hammer_like",
+    "shooting_star_like",
+    "dragonfly_doji",
+    "gravestone_doji",
+    "doji_star",
+    "momentum_candle",
+)
+
+PATTERN_DTYPE = np.dtype(
+    [
+        ("type", np.int8),
+        ("index", np.int64),
+        ("multiplicator", np.float64),
+        ("volume_strength", np.float64),
+    ]
+)
+
+
 def detect_candlestick_patterns(
-    candles: List[List[float]],
+    candles: Candles,
     volume_period: int = 20,
     min_volume_strength: float = 1.2,
-) -> List[Dict]:
-
-    candles = np.asarray(candles, dtype=float)
-    avg_vol = smath.average_volume(candles, volume_period)
-
-    patterns = []
-
-    for i in range(1, len(candles)):
-        prev = candles[i - 1]
-        curr = candles[i]
+):
+    """
+    Returns:
+        patterns: np.recarray  # PATTERN_DTYPE records ordered by candle index,
+                               # type codes index CANDLESTICK_PATTERNS
 
-        body_p, _, _ = smath.candle_parts(prev)
-        body_c, uw, lw = smath.candle_parts(curr)
+    A batched frame gets a list of those, one per symbol: every rule is
+    evaluated along the candle axis of all windows at once.
+    """
+    frame = as_frame(candles)
+    rows = frame.rows
+    avg_vol = np.asarray(smath.average_volume(rows, volume_period))[..., None]
+
+    opens = frame.open
+    closes = frame.close
+    volumes = frame.volume
+
+    # Candle anatomy computed once for the whole window
+    body, upper_wick, lower_wick = smath.candle_parts_columns(rows)
+
+    # Every array below is aligned to the current candle i = 1 .. n-1
+    body_p, body_c = body[..., :-1], body[..., 1:]
+    uw, lw = upper_wick[..., 1:], lower_wick[..., 1:]
+    bull_c, bear_c = closes[..., 1:] > opens[..., 1:], closes[..., 1:] < opens[..., 1:]
+    bull_p, bear_p = (
+        closes[..., :-1] > opens[..., :-1],
+        closes[..., :-1] < opens[..., :-1],
+    )
+    sign = np.where(bull_c, 1.0, -1.0)
 
-        if body_p == 0:
-            continue  # avoid doji-engulfed noise
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_strength = np.where(avg_vol > 0, volumes[..., 1:] / avg_vol, 0.0)
 
-        volume_strength = curr[5] / avg_vol if avg_vol > 0 else 0.0
-        if volume_strength < min_volume_strength:
-            continue
+    # avoid doji-engulfed noise, then apply the volume filter
+    pending = (body_p != 0) & (volume_strength >= min_volume_strength)
+    has_body = body_c > 0
 
-        # ----------------------------------------------------
-        # Engulfing (strict, body-based)
-        # ----------------------------------------------------
+    with np.errstate(divide="ignore", invalid="ignore"):
         multiplier = body_c / body_p
-
-        if multiplier >= 2:
-            if curr[4] > curr[1] and prev[4] < prev[1]:
-                patterns.append(
-                    {
-                        "type": "bullish_engulfing",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(multiplier),
-                        "volume_strength": volume_strength,
-                    }
-                )
-                continue
-
-            if curr[4] < curr[1] and prev[4] > prev[1]:
-                patterns.append(
-                    {
-                        "type": "bearish_engulfing",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(-multiplier),
-                        "volume_strength": volume_strength,
-                    }
-                )
-                continue
-
-        # ----------------------------------------------------
-        # Hammer / Shooting Star / Hanging Man / Inverted Hammer
-        # ----------------------------------------------------
-        if body_c > 0:
-            # Hammer / Hanging Man (long lower wick)
-            if lw >= 2 * body_c and uw <= body_c:
-                mult = lw / body_c
-                patterns.append(
-                    {
-                        "type": "hammer_like",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(mult),
-                        "volume_strength": volume_strength,
-                    }
-                )
-                continue
-
-            # Shooting Star / Inverted Hammer (long upper wick)
-            if uw >= 2 * body_c and lw <= body_c:
-                mult = uw / body_c
-                patterns.append(
-                    {
-                        "type": "shooting_star_like",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(-mult),
-                        "volume_strength": volume_strength,
-                    }
-                )
-                continue
-
-        # ----------------------------------------------------
-        # Dragonfly / Gravestone Doji (wick dominance)
-        # ----------------------------------------------------
-        if body_c > 0:
-            if lw >= 3 * body_c and uw <= body_c * 0.2:
-                mult = lw / body_c
-                patterns.append(
-                    {
-                        "type": "dragonfly_doji",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(mult),
-                        "volume_strength": volume_strength,
-                    }
-                )
-                continue
-
-            if uw >= 3 * body_c and lw <= body_c * 0.2:
-                mult = uw / body_c
-                patterns.append(
-                    {
-                        "type": "gravestone_doji",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(-mult),
-                        "volume_strength": volume_strength,
-                    }
-                )
-                continue
-
-        # ----------------------------------------------------
-        # Doji Star (relative to previous body)
-        # ----------------------------------------------------
-        if body_c < body_p * 0.3 and (uw + lw) > body_p:
-            mult = (uw + lw) / body_p
-            sign = 1 if curr[4] > curr[1] else -1
-            patterns.append(
-                {
-                    "type": "doji_star",
-                    "index": i,
-                    "multiplicator": smath.clamp_multiplier(sign * mult),
-                    "volume_strength": volume_strength,
-                }
-            )
-
-        # ----------------------------------------------------
-        # Momentum Candle (body dominance + volume)
-        # ----------------------------------------------------
-        if i >= 3:
-            body_1, _, _ = smath.candle_parts(candles[i - 1])
-            body_2, _, _ = smath.candle_parts(candles[i - 2])
-            body_3, _, _ = smath.candle_parts(candles[i - 3])
-
-            prev_body_sum = body_1 + body_2 + body_3
-
-            # avoid division noise
-            if prev_body_sum > 0 and body_c >= 2 * prev_body_sum:
-                # stricter volume requirement
-                if volume_strength >= min_volume_strength:
-                    mult = body_c / prev_body_sum
-                    sign = 1 if curr[4] > curr[1] else -1
-
-                    patterns.append(
-                        {
-                            "type": "momentum_candle",
-                            "index": i,
-                            "multiplicator": smath.clamp_multiplier(sign * mult),
-                            "volume_strength": volume_strength,
-                        }
-                    )
-
-    return patterns
+        lower_ratio = lw / body_c
+        upper_ratio = uw / body_c
+        wick_ratio = (uw + lw) / body_p
+
+        # Momentum: current body against the sum of the three previous bodies
+        prev_body_sum = np.zeros(body_c.shape)
+        prev_body_sum[..., 2:] = smath.rolling_sum(body, 3)[..., : body_c.shape[-1] - 2]
+        momentum_ratio = body_c / prev_body_sum
+
+    # (rule, multiplicator, exclusive) in evaluation order: an exclusive rule
+    # claims the candle, like the `continue` of a per-candle loop
+    rules = [
+        ((multiplier >= 2) & bull_c & bear_p, multiplier, True),
+        ((multiplier >= 2) & bear_c & bull_p, -multiplier, True),
+        (has_body & (lw >= 2 * body_c) & (uw <= body_c), lower_ratio, True),
+        (has_body & (uw >= 2 * body_c) & (lw <= body_c), -upper_ratio, True),
+        (has_body & (lw >= 3 * body_c) & (uw <= body_c * 0.2), lower_ratio, True),
+        (has_body & (uw >= 3 * body_c) & (lw <= body_c * 0.2), -upper_ratio, True),
+        ((body_c < body_p * 0.3) & ((uw + lw) > body_p), sign * wick_ratio, False),
+        (
+            (prev_body_sum > 0) & (body_c >= 2 * prev_body_sum),
+            sign * momentum_ratio,
+            False,
+        ),
+    ]
+
+    # Hits as (symbol, candle) pairs, symbol 0 for a single-symbol frame
+    pending = pending.reshape(frame.symbols or 1, -1)
+    found, symbols = [], []
+    for code, (rule, mult, exclusive) in enumerate(rules):
+        symbol, hits = np.nonzero(pending & rule.reshape(pending.shape))
+        if exclusive:
+            pending[symbol, hits] = False
+
+        records = np.empty(len(hits), dtype=PATTERN_DTYPE)
+        records["type"] = code
+        records["index"] = hits + 1
+        records["multiplicator"] = smath.clamp_multiplier(
+            mult.reshape(pending.shape)[symbol, hits]
+        )
+        records["volume_strength"] = volume_strength.reshape(pending.shape)[
+            symbol, hits
+        ]
+        found.append(records)
+        symbols.append(symbol)
+
+    patterns = np.concatenate(found)
+    symbols = np.concatenate(symbols)
+    order = np.lexsort((patterns["type"], patterns["index"], symbols))
+    patterns = patterns[order].view(np.recarray)
+
+    if not frame.symbols:
+        return patterns
+    bounds = np.searchsorted(symbols[order], np.arange(1, frame.symbols))
+    return np.split(patterns, bounds)
+
+
+def patterns_as_dicts(patterns: np.ndarray) -> List[Dict]:
+    """Adapter from detect_candlestick_patterns records to the list-of-dicts format."""
+    return [
+        {
+            "type": CANDLESTICK_PATTERNS[code],
+            "index": int(index),
+            "multiplicator": float(mult),
+            "volume_strength": float(strength),
+        }
+        for code, index, mult, strength in patterns.tolist()
+    ]
 
 
 # ============================================================
@@ -715,165 +649,218 @@ def detect_candlestick_patterns(
 
 
 def smr(
-    candles: List[List[float]],
+    candles: Candles,
     swing_left: int = 2,
     swing_right: int = 2,
     volume_period: int = 20,
     min_volume_strength: float = 1.1,
     min_fvg_size: float = 0.0,  # Minimum % size of the gap to be recorded
-) -> List[Dict]:
-
-    candles = np.asarray(candles, dtype=float)
-    avg_vol = smath.average_volume(candles, volume_period)
-
-    events = []
-
-    highs = candles[:, 2]
-    lows = candles[:, 3]
-    closes = candles[:, 4]
-    volumes = candles[:, 5]
-
-    # -------- Detect swings once --------
-    swing_highs = {}
-    swing_lows = {}
-
-    for i in range(swing_left, len(candles) - swing_right):
-        if highs[i] == np.max(highs[i - swing_left : i + swing_right + 1]):
-            swing_highs[i] = highs[i]
-        if lows[i] == np.min(lows[i - swing_left : i + swing_right + 1]):
-            swing_lows[i] = lows[i]
-
-    swing_high_idxs = sorted(swing_highs.keys())
-    swing_low_idxs = sorted(swing_lows.keys())
-
-    last_high = None
-    last_low = None
-    prev_high = None
-    prev_low = None
-
-    trend = None
-    hi_ptr = 0
-    lo_ptr = 0
-
-    for i in range(len(candles)):
-        volume_strength = volumes[i] / avg_vol if avg_vol > 0 else 1.0
-
-        # -------- FVG Detection (Requires at least 3 candles) --------
-        if i >= 2:
-            # Bullish FVG: Low of candle[i] > High of candle[i-2]
-            if lows[i] > highs[i - 2]:
-                gap_size = (lows[i] - highs[i - 2]) / highs[i - 2] * 100
-                if gap_size > min_fvg_size:
-                    events.append(
+    swings: Optional[Tuple[np.ndarray, np.ndarray]] = None,  # from swing_indices
+) -> list:
+    """
+    Returns:
+        events: list[dict]  # FVG, HH/LH/HL/LL and BOS/CHOCH events ordered
+                            # by candle index
+
+    A batched frame gets a list of those, one per symbol: gaps, swings and
+    swing levels are found along the candle axis of all windows at once,
+    only the BOS / CHOCH trend walk runs per symbol. `swings` is for
+    single-symbol frames.
+    """
+    frame = as_frame(candles)
+    symbols = frame.symbols or 1
+    n = len(frame)
+
+    # One row per symbol
+    highs, lows, closes, volumes = (
+        series.reshape(symbols, n)
+        for series in (frame.high, frame.low, frame.close, frame.volume)
+    )
+    avg_vol = np.reshape(smath.average_volume(frame.rows, volume_period), (-1, 1))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_strength = np.where(avg_vol > 0, volumes / avg_vol, 1.0)
+
+    # Events are collected as (index, order, event) and sorted once at the end,
+    # `order` keeps the per-candle sequence: FVG, highs, lows, BOS / CHOCH
+    keyed = [[] for _ in range(symbols)]
+
+    # -------- FVG Detection (masked, requires at least 3 candles) --------
+    if n >= 3:
+        # Bullish FVG: Low of candle[i] > High of candle[i-2]
+        bullish = lows[:, 2:] > highs[:, :-2]
+        # Bearish FVG: High of candle[i] < Low of candle[i-2]
+        bearish = ~bullish & (highs[:, 2:] < lows[:, :-2])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bull_gap = (lows[:, 2:] - highs[:, :-2]) / highs[:, :-2] * 100
+            bear_gap = (lows[:, :-2] - highs[:, 2:]) / lows[:, :-2] * 100
+
+        # (mask, gap, "top" and "bottom" columns indexed by the gap candle)
+        fvgs = (
+            ("fvg_bullish", bullish & (bull_gap > min_fvg_size), bull_gap, 2, 0),
+            ("fvg_bearish", bearish & (bear_gap > min_fvg_size), bear_gap, 0, 2),
+        )
+        for name, mask, gap, top_at, bottom_at in fvgs:
+            symbol, j = np.nonzero(mask)
+            i = j + 2
+            columns = zip(
+                symbol.tolist(),
+                i.tolist(),
+                lows[symbol, j + top_at].tolist(),
+                highs[symbol, j + bottom_at].tolist(),
+                smath.clamp_multiplier(gap[symbol, j]).tolist(),
+                volume_strength[symbol, i].tolist(),
+            )
+            for s, index, top, bottom, mult, strength in columns:
+                keyed[s].append(
+                    (
+                        index,
+                        0,
                         {
-                            "type": "fvg_bullish",
-                            "index": i,
-                            "top": lows[i],
-                            "bottom": highs[i - 2],
-                            "multiplicator": smath.clamp_multiplier(gap_size),
-                            "volume_strength": volume_strength,
-                        }
+                            "type": name,
+                            "index": index,
+                            "top": top,
+                            "bottom": bottom,
+                            "multiplicator": mult,
+                            "volume_strength": strength,
+                        },
                     )
+                )
 
-            # Bearish FVG: High of candle[i] < Low of candle[i-2]
-            elif highs[i] < lows[i - 2]:
-                gap_size = (lows[i - 2] - highs[i]) / lows[i - 2] * 100
-                if gap_size > min_fvg_size:
-                    events.append(
+    # -------- Detect swings once (sliding-window extremes) --------
+    if swings is None:
+        high_mask, low_mask = smath.swing_masks(highs, lows, swing_left, swing_right)
+    else:
+        high_mask, low_mask = np.zeros((2, symbols, n), dtype=bool)
+        high_mask[0, swings[0]] = True
+        low_mask[0, swings[1]] = True
+
+    # A swing is only known `swing_right` candles after it printed
+    last_high = _confirmed_levels(high_mask, highs, swing_right)
+    last_low = _confirmed_levels(low_mask, lows, swing_right)
+
+    _swing_events(
+        keyed, high_mask, highs, swing_right, ("HH", "LH"), 1, volume_strength
+    )
+    _swing_events(keyed, low_mask, lows, swing_right, ("HL", "LL"), 2, volume_strength)
+
+    # -------- BOS / CHOCH (sequential trend state, volume filtered) --------
+    for s in range(symbols):
+        trend = None
+        events = keyed[s]
+        active = np.flatnonzero(volume_strength[s] >= min_volume_strength)
+        columns = zip(
+            active.tolist(),
+            last_high[s, active].tolist(),
+            last_low[s, active].tolist(),
+            closes[s, active].tolist(),
+            volume_strength[s, active].tolist(),
+        )
+
+        for i, high, low, close, strength in columns:
+            # -------- Initialize trend --------
+            if trend is None and high and low:
+                trend = "up" if close > high else "down"
+                continue
+
+            if high and close > high:
+                event_type = "bos_bullish" if trend == "up" else "choch_bullish"
+                mult = (close - high) / high * 100
+                events.append(
+                    (
+                        i,
+                        3,
                         {
-                            "type": "fvg_bearish",
+                            "type": event_type,
                             "index": i,
-                            "top": lows[i - 2],
-                            "bottom": highs[i],
-                            "multiplicator": smath.clamp_multiplier(gap_size),
-                            "volume_strength": volume_strength,
-                        }
+                            "multiplicator": smath.clamp_multiplier(mult),
+                            "volume_strength": strength,
+                        },
                     )
-
-        # -------- advance swing pointers --------
-        while (
-            hi_ptr < len(swing_high_idxs) and swing_high_idxs[hi_ptr] + swing_right <= i
-        ):
-            idx = swing_high_idxs[hi_ptr]
-            val = swing_highs[idx]
-            prev_high = last_high
-            last_high = val
-            hi_ptr += 1
-
-            if prev_high is not None:
-                mult = (
-                    abs(last_high - prev_high) / prev_high * 100
-                    if prev_high != 0
-                    else 0
-                )
-                events.append(
-                    {
-                        "type": "HH" if last_high > prev_high else "LH",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(mult),
-                        "volume_strength": volume_strength,
-                    }
                 )
+                trend = "up"
 
-        while (
-            lo_ptr < len(swing_low_idxs) and swing_low_idxs[lo_ptr] + swing_right <= i
-        ):
-            idx = swing_low_idxs[lo_ptr]
-            val = swing_lows[idx]
-            prev_low = last_low
-            last_low = val
-            lo_ptr += 1
-
-            if prev_low is not None:
-                mult = abs(last_low - prev_low) / prev_low * 100 if prev_low != 0 else 0
+            if low and close < low:
+                event_type = "bos_bearish" if trend == "down" else "choch_bearish"
+                mult = (low - close) / low * 100
                 events.append(
-                    {
-                        "type": "HL" if last_low > prev_low else "LL",
-                        "index": i,
-                        "multiplicator": smath.clamp_multiplier(mult),
-                        "volume_strength": volume_strength,
-                    }
+                    (
+                        i,
+                        4,
+                        {
+                            "type": event_type,
+                            "index": i,
+                            "multiplicator": smath.clamp_multiplier(mult),
+                            "volume_strength": strength,
+                        },
+                    )
                 )
+                trend = "down"
 
-        # -------- volume filter for BOS / CHOCH --------
-        if volume_strength < min_volume_strength:
-            continue
+    for events in keyed:
+        events.sort(key=lambda item: (item[0], item[1]))
+    found = [[event for _, _, event in events] for events in keyed]
 
-        close = closes[i]
+    return found if frame.symbols else found[0]
 
-        # -------- Initialize trend --------
-        if trend is None and last_high and last_low:
-            trend = "up" if close > last_high else "down"
-            continue
 
-        # -------- BOS / CHOCH --------
-        if last_high and close > last_high:
-            event_type = "bos_bullish" if trend == "up" else "choch_bullish"
-            mult = (close - last_high) / last_high * 100
-            events.append(
-                {
-                    "type": event_type,
-                    "index": i,
-                    "multiplicator": smath.clamp_multiplier(mult),
-                    "volume_strength": volume_strength,
-                }
-            )
-            trend = "up"
+def _confirmed_levels(mask: np.ndarray, levels: np.ndarray, delay: int) -> np.ndarray:
+    """Most recent swing level known at each candle, 0.0 while none is confirmed."""
+    n = mask.shape[-1]
+    # Index of the swing confirmed at each candle, -1 where none is
+    confirmed = np.full(mask.shape, -1)
+    if delay < n:
+        confirmed[:, delay:] = np.where(mask[:, : n - delay], np.arange(n - delay), -1)
+
+    latest = np.maximum.accumulate(confirmed, axis=-1)
+    known = np.take_along_axis(levels, np.maximum(latest, 0), axis=-1)
+    return np.where(latest >= 0, known, 0.0)
 
-        if last_low and close < last_low:
-            event_type = "bos_bearish" if trend == "down" else "choch_bearish"
-            mult = (last_low - close) / last_low * 100
-            events.append(
+
+def _swing_events(
+    keyed: List[list],
+    mask: np.ndarray,
+    levels: np.ndarray,
+    delay: int,
+    names: Tuple[str, str],
+    order: int,
+    volume_strength: np.ndarray,
+):
+    """
+    HH/LH (or HL/LL) events into `keyed`, one per swing after the first of
+    its symbol, at its confirmation.
+    """
+    symbol, idxs = np.nonzero(mask)
+    values = levels[symbol, idxs]
+    # Pairs of consecutive swings of the same symbol
+    pairs = symbol[1:] == symbol[:-1]
+    prev, last = values[:-1][pairs], values[1:][pairs]
+    symbol, at = symbol[1:][pairs], idxs[1:][pairs] + delay
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mult = np.where(prev != 0, np.abs(last - prev) / prev * 100, 0.0)
+
+    columns = zip(
+        symbol.tolist(),
+        at.tolist(),
+        (last > prev).tolist(),
+        smath.clamp_multiplier(mult).tolist(),
+        volume_strength[symbol, at].tolist(),
+    )
+    for s, i, higher, mult, strength in columns:
+        keyed[s].append(
+            (
+                i,
+                order,
                 {
-                    "type": event_type,
+                    "type": names[0] if higher else names[1],
                     "index": i,
-                    "multiplicator": smath.clamp_multiplier(mult),
-                    "volume_strength": volume_strength,
-                }
+                    "multiplicator": mult,
+                    "volume_strength": strength,
+                },
             )
-            trend = "down"
-
-    return events
+        )
 
 
 # ============================================================
@@ -881,7 +868,7 @@ def smr(
 # ============================================================
 
 
-def pivot_points_fibonacci(candles: List[List[float]]) -> Dict[str, float]:
+def pivot_points_fibonacci(candles: Candles) -> Dict[str, float]:
     """
     Calculates Fibonacci Pivot Points based on the most recent completed period.
     Typically used with Daily candles to find levels for the next day.
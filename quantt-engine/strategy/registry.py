@@ -0,0 +1,82 @@
+"""
+registry.py
+Indicator dependency graph.
+
+Every node declares the nodes it reads (its inputs). An EvaluationContext
+resolves a node's inputs before the node itself and memoizes every result,
+so intermediates shared by several indicators are computed exactly once per
+evaluation and nodes nobody asked for are never computed at all.
+
+Per-candle derived series (true range, close diffs, typical price...) are
+memoized by the CandleFrame seeded into the context, so indicators reading
+the same frame share them as well.
+"""
+
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Tuple
+
+
+class Node(NamedTuple):
+    name: str
+    inputs: Tuple[str, ...]
+    compute: Callable[..., Any]
+
+
+class IndicatorRegistry:
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+
+    def register(self, name: str, inputs: Iterable[str] = ()):
+        """Decorator: `compute` receives the resolved inputs positionally."""
+
+        def decorator(func):
+            if name in self.nodes:
+                raise ValueError(f"Node '{name}' is already registered.")
+            self.nodes[name] = Node(name, tuple(inputs), func)
+            return func
+
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.nodes
+
+
+class EvaluationContext:
+    """
+    One evaluation of the graph. Seeds (e.g. frame=..., market=...) are the
+    leaves every node can read, results live as long as the context does.
+    """
+
+    def __init__(self, registry: IndicatorRegistry, **seeds):
+        self.registry = registry
+        self._values: Dict[str, Any] = dict(seeds)
+        self._resolving = set()
+
+    def __getitem__(self, name: str):
+        if name in self._values:
+            return self._values[name]
+
+        node = self.registry.nodes.get(name)
+        if node is None:
+            raise KeyError(f"Unknown indicator node: '{name}'")
+        if name in self._resolving:
+            raise ValueError(f"Dependency cycle detected at node '{name}'")
+
+        self._resolving.add(name)
+        try:
+            args = [self[dep] for dep in node.inputs]
+            self._values[name] = node.compute(*args)
+        finally:
+            self._resolving.discard(name)
+
+        return self._values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def seed(self, **seeds):
+        """Add leaves after construction, e.g. nodes computed for many contexts at once."""
+        self._values.update(seeds)
+
+    def evaluate(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Resolve the requested nodes (and only what they depend on)."""
+        return {name: self[name] for name in names}
@@ -1,12 +1,18 @@
 import math
+import threading
+from typing import Dict, NamedTuple, Optional
 
 import numpy as np
 from loguru import logger
 
 import strategy.indicators as indicators
-from config import risk
+import utils.math as smath
+from config import risk, settings
 from data import cache
 from data.cache import cached_p14
+from data.frame import CandleFrame
+from strategy.registry import EvaluationContext, IndicatorRegistry
+from strategy.streaming import IndicatorStreams
 from utils.math import scale_0_100
 
 r = risk.watcher.get_config()
@@ -29,9 +35,12 @@ def _check_nan(value, name: str):
 # --------------------- Auxiliaries --------------------- #
 
 
-def get_signal_candlestick_patterns(market: str):
-    candles = cache.cached_p14(market=market)
-    patterns = indicators.detect_candlestick_patterns(candles=candles)
+def get_signal_candlestick_patterns(market: str, candles=None, patterns=None):
+    if candles is None:
+        candles = cache.cached_p14(market=market)
+    if patterns is None:
+        patterns = indicators.detect_candlestick_patterns(candles=candles)
+    patterns = indicators.patterns_as_dicts(patterns)
 
     m_force_bull, m_force_bear = 0.0, 0.0
     conf_bull, conf_bear = 0, 0
@@ -53,9 +62,11 @@ def get_signal_candlestick_patterns(market: str):
     return m_force_bull, m_force_bear, conf_bull, conf_bear
 
 
-def get_signal_smr(market: str):
-    candles = cache.cached_p42(market=market)
-    smr_events = indicators.smr(candles=candles)
+def get_signal_smr(market: str, candles=None, smr_events=None):
+    if candles is None:
+        candles = CandleFrame(cache.cached_p42(market=market))
+    if smr_events is None:
+        smr_events = indicators.smr(candles=candles)
 
     m_force_bull, m_force_bear = 0.0, 0.0
     conf_bull, conf_bear = 0, 0
@@ -101,184 +112,292 @@ def get_signal_smr(market: str):
     return m_force_bull, m_force_bear, conf_bull, conf_bear
 
 
-# --------------------- FINAL AVALIATION --------------------- #
+# --------------------- STREAMED INDICATORS --------------------- #
 
+# Candles per evaluated frame, the cached_p42 window
+WINDOW = 42
 
-def avaliation_of_market(Market: str, parameters: list[str]) -> dict:
-    candles = cache.cached_p42(market=Market)
+# IndicatorStreams per (market, timeframe, exchange), seeded on first use
+_streams: Dict[tuple, IndicatorStreams] = {}
+_streams_lock = threading.Lock()
 
-    bull_votes = 0
-    bear_votes = 0
-    total_signals = 0
 
-    category_scores = {"trend": [], "momentum": [], "volume": [], "structure": []}
+def market_streams(market: str, history) -> dict:
+    """
+    IndicatorStreams readings of `market` advanced to `history`, every candle
+    held for it (cache.cached_history, a copy taken under the buffer lock).
+    Only candles new since the previous call are pushed.
+    """
+    trading_config = settings.watcher.get_config()
+    key = (market, trading_config.timeframe, trading_config.exchange)
+    with _streams_lock:
+        streams = _streams.get(key)
+        if streams is None:
+            streams = _streams[key] = IndicatorStreams(WINDOW)
+    return streams.advance(history)
 
-    adx_val = 20.0
-    atr_ratio = 0.5
 
-    parameters_lower = [p.lower() for p in parameters]
+def _streamed(streams: Optional[dict], name: str, compute) -> tuple:
+    """Reading of `name` from market_streams, or compute() on the frame without one."""
+    reading = None if streams is None else streams.get(name)
+    return reading if reading is not None else compute()
+
+
+def _bb_reading(frame) -> tuple:
+    (upper, middle, lower), bb_mean_width, _ = indicators.bollinger_bands(frame)
+    return upper, middle, lower, bb_mean_width
+
+
+# --------------------- INDICATOR GRAPH --------------------- #
+
+
+class Vote(NamedTuple):
+    category: str  # "trend" | "momentum" | "volume" | "structure"
+    score: Optional[float]  # contribution to the category grade, None to skip
+    side: int  # +1 bullish vote, -1 bearish vote, 0 no vote
+    counted: bool  # whether it counts towards total_signals
+    value: Optional[float] = None  # raw indicator value, when the caller needs it
+
+
+def _binary_vote(category: str, bullish: bool) -> Vote:
+    return Vote(category, 1.0 if bullish else 0.0, 1 if bullish else -1, True)
+
+
+def _force_vote(name: str, forces) -> Vote:
+    m_force_bull, m_force_bear, conf_bull, conf_bear = forces
+    _check_nan(m_force_bull, f"{name}_m_force_bull")
+    _check_nan(m_force_bear, f"{name}_m_force_bear")
+    _check_nan(conf_bull, f"{name}_conf_bull")
+    _check_nan(conf_bear, f"{name}_conf_bear")
+    if m_force_bull > m_force_bear:
+        return Vote("structure", min(m_force_bull + conf_bull, 1.0), 1, True)
+    if m_force_bear > m_force_bull:
+        return Vote("structure", max(0.0, 1.0 - (m_force_bear + conf_bear)), -1, True)
+    return Vote("structure", None, 0, True)
+
+
+# Every entry of TradingConfig.list_of_parameters (lower-cased) is a node that
+# returns a Vote; shared intermediates (swings, SMR events) are nodes too.
+# Nodes with a streamed indicator read it from the "streams" seed (readings of
+# market_streams) when there is one, and compute it from the frame otherwise.
+graph = IndicatorRegistry()
 
-    if "vwap" in parameters_lower:
-        vwap_value, vwap_mean, vwap_series = indicators.vwap(candles)
-        _check_nan(vwap_value, "vwap_value")
-        _check_nan(vwap_mean, "vwap_mean")
-        score = 1.0 if vwap_value > vwap_mean else 0.0
-        category_scores["trend"].append(score)
-        if score > 0.5:
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
-
-    if "rsi" in parameters_lower:
-        rsi_value, rsi_mean, rsi_series = indicators.rsi(candles)
-        _check_nan(rsi_value, "rsi_value")
-        score = rsi_value / 100.0
-        category_scores["momentum"].append(score)
-        if rsi_value > 50:
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
-
-    if "tnk" in parameters_lower:
-        tenkan_sen, kijun_sen = indicators.tenkan_and_kijun(candles)
-        _check_nan(tenkan_sen, "tenkan_sen")
-        _check_nan(kijun_sen, "kijun_sen")
-        score = 1.0 if tenkan_sen > kijun_sen else 0.0
-        category_scores["trend"].append(score)
-        if score > 0.5:
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
-
-    if "macd" in parameters_lower:
-        (
-            macd_value,
-            signal_value,
-            hist_value,
-            macd_series,
-            signal_series,
-            hist_series,
-        ) = indicators.macd(candles)
-        _check_nan(hist_value, "macd_hist_value")
-        score = 1.0 if hist_value > 0 else 0.0
-        category_scores["momentum"].append(score)
-        if hist_value > 0:
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
-
-    if "ema" in parameters_lower:
-        ema_value, ema_mean, ema_series = indicators.ema(candles)
-        _check_nan(ema_value, "ema_value")
-        _check_nan(ema_mean, "ema_mean")
-        score = 1.0 if ema_value > ema_mean else 0.0
-        category_scores["trend"].append(score)
-        if score > 0.5:
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
-
-    if "atr" in parameters_lower:
-        atr_value, atr_mean, atr_series = indicators.atr(candles)
-        _check_nan(atr_value, "atr_value")
-        _check_nan(atr_mean, "atr_mean")
-        atr_ratio = min(atr_value / (atr_mean + 1e-9), 1.0)
-        category_scores["structure"].append(atr_ratio)
-
-    if "roc" in parameters_lower:
-        roc_value, roc_mean, roc_series = indicators.roc(candles)
-        _check_nan(roc_value, "roc_value")
-        score = 1.0 if roc_value > 0 else 0.0
-        category_scores["momentum"].append(score)
-        if roc_value > 0:
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
-
-    if "st" in parameters_lower:
-        last_st, last_dir, st_series = indicators.supertrend(candles)
-        if not isinstance(last_dir, str):
-            raise ValueError(
-                f"Indicator 'supertrend_dir' returned a non-string value: {last_dir!r}"
-            )
-        score = 1.0 if last_dir == "up" else 0.0
-        category_scores["trend"].append(score)
-        if last_dir == "up":
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
-
-    if "bb" in parameters_lower:
-        last_bands, bb_mean_width, bb_series = indicators.bollinger_bands(candles)
-        upper, middle, lower = last_bands
-        _check_nan(upper, "bb_upper")
-        _check_nan(middle, "bb_middle")
-        _check_nan(lower, "bb_lower")
-        _check_nan(bb_mean_width, "bb_mean_width")
-        bb_width = upper - lower
-        squeeze_ratio = min(bb_width / (bb_mean_width + 1e-9), 1.0)
-        category_scores["structure"].append(squeeze_ratio)
-
-    if "adx" in parameters_lower:
-        adx_value, adx_mean, adx_series = indicators.adx(candles)
-        _check_nan(adx_value, "adx_value")
-        _check_nan(adx_mean, "adx_mean")
-        adx_val = adx_value
-        score = min(adx_value / 50.0, 1.0)
-        category_scores["trend"].append(score)
-
-    if "obv" in parameters_lower:
-        obv_value, obv_mean, obv_series = indicators.obv(candles)
-        _check_nan(obv_value, "obv_value")
-        _check_nan(obv_mean, "obv_mean")
-        score = 1.0 if obv_value > obv_mean else 0.0
-        category_scores["volume"].append(score)
-        if obv_value > obv_mean:
-            bull_votes += 1
-        else:
-            bear_votes += 1
-        total_signals += 1
 
-    if "dscp" in parameters_lower:
-        m_force_bull, m_force_bear, conf_bull, conf_bear = (
-            get_signal_candlestick_patterns(Market)
+@graph.register("swings", inputs=("frame",))
+def _swings(frame):
+    return smath.swing_indices(frame.high, frame.low)
+
+
+@graph.register("smr_events", inputs=("frame", "swings"))
+def _smr_events(frame, swings):
+    return indicators.smr(frame, swings=swings)
+
+
+@graph.register("patterns", inputs=("frame",))
+def _patterns(frame):
+    # The last 14 candles of the evaluated frame, the same window cached_p14
+    # serves live, so replayed frames (backtesting) are evaluated as they were
+    return indicators.detect_candlestick_patterns(frame.tail(14))
+
+
+@graph.register("vwap", inputs=("frame", "streams"))
+def _vwap(frame, streams):
+    vwap_value, vwap_mean = _streamed(
+        streams, "vwap", lambda: indicators.vwap(frame)[:2]
+    )
+    _check_nan(vwap_value, "vwap_value")
+    _check_nan(vwap_mean, "vwap_mean")
+    return _binary_vote("trend", vwap_value > vwap_mean)
+
+
+@graph.register("rsi", inputs=("frame", "streams"))
+def _rsi(frame, streams):
+    rsi_value, _ = _streamed(streams, "rsi", lambda: indicators.rsi(frame)[:2])
+    _check_nan(rsi_value, "rsi_value")
+    return Vote("momentum", rsi_value / 100.0, 1 if rsi_value > 50 else -1, True)
+
+
+@graph.register("tnk", inputs=("frame",))
+def _tnk(frame):
+    tenkan_sen, kijun_sen = indicators.tenkan_and_kijun(frame)
+    _check_nan(tenkan_sen, "tenkan_sen")
+    _check_nan(kijun_sen, "kijun_sen")
+    return _binary_vote("trend", tenkan_sen > kijun_sen)
+
+
+@graph.register("macd", inputs=("frame",))
+def _macd(frame):
+    hist_value = indicators.macd(frame)[2]
+    _check_nan(hist_value, "macd_hist_value")
+    return _binary_vote("momentum", hist_value > 0)
+
+
+@graph.register("ema", inputs=("frame", "streams"))
+def _ema(frame, streams):
+    ema_value, ema_mean = _streamed(streams, "ema", lambda: indicators.ema(frame)[:2])
+    _check_nan(ema_value, "ema_value")
+    _check_nan(ema_mean, "ema_mean")
+    return _binary_vote("trend", ema_value > ema_mean)
+
+
+@graph.register("atr", inputs=("frame", "streams"))
+def _atr(frame, streams):
+    atr_value, atr_mean = _streamed(streams, "atr", lambda: indicators.atr(frame)[:2])
+    _check_nan(atr_value, "atr_value")
+    _check_nan(atr_mean, "atr_mean")
+    atr_ratio = min(atr_value / (atr_mean + 1e-9), 1.0)
+    return Vote("structure", atr_ratio, 0, False)
+
+
+@graph.register("roc", inputs=("frame",))
+def _roc(frame):
+    roc_value, _, _ = indicators.roc(frame)
+    _check_nan(roc_value, "roc_value")
+    return _binary_vote("momentum", roc_value > 0)
+
+
+@graph.register("st", inputs=("frame",))
+def _st(frame):
+    _, last_dir, _ = indicators.supertrend(frame)
+    if not isinstance(last_dir, str):
+        raise ValueError(
+            f"Indicator 'supertrend_dir' returned a non-string value: {last_dir!r}"
         )
-        _check_nan(m_force_bull, "dscp_m_force_bull")
-        _check_nan(m_force_bear, "dscp_m_force_bear")
-        _check_nan(conf_bull, "dscp_conf_bull")
-        _check_nan(conf_bear, "dscp_conf_bear")
-        if m_force_bull > m_force_bear:
-            bull_votes += 1
-            category_scores["structure"].append(min(m_force_bull + conf_bull, 1.0))
-        elif m_force_bear > m_force_bull:
-            bear_votes += 1
-            category_scores["structure"].append(
-                max(0.0, 1.0 - (m_force_bear + conf_bear))
-            )
-        total_signals += 1
-
-    if "smr" in parameters_lower:
-        m_force_bull, m_force_bear, conf_bull, conf_bear = get_signal_smr(Market)
-        _check_nan(m_force_bull, "smr_m_force_bull")
-        _check_nan(m_force_bear, "smr_m_force_bear")
-        _check_nan(conf_bull, "smr_conf_bull")
-        _check_nan(conf_bear, "smr_conf_bear")
-        if m_force_bull > m_force_bear:
-            bull_votes += 1
-            category_scores["structure"].append(min(m_force_bull + conf_bull, 1.0))
-        elif m_force_bear > m_force_bull:
-            bear_votes += 1
-            category_scores["structure"].append(
-                max(0.0, 1.0 - (m_force_bear + conf_bear))
-            )
-        total_signals += 1
+    return _binary_vote("trend", last_dir == "up")
+
+
+@graph.register("bb", inputs=("frame", "streams"))
+def _bb(frame, streams):
+    upper, middle, lower, bb_mean_width = _streamed(
+        streams, "bb", lambda: _bb_reading(frame)
+    )
+    _check_nan(upper, "bb_upper")
+    _check_nan(middle, "bb_middle")
+    _check_nan(lower, "bb_lower")
+    _check_nan(bb_mean_width, "bb_mean_width")
+    squeeze_ratio = min((upper - lower) / (bb_mean_width + 1e-9), 1.0)
+    return Vote("structure", squeeze_ratio, 0, False)
+
+
+@graph.register("adx", inputs=("frame", "streams"))
+def _adx(frame, streams):
+    adx_value, adx_mean = _streamed(streams, "adx", lambda: indicators.adx(frame)[:2])
+    _check_nan(adx_value, "adx_value")
+    _check_nan(adx_mean, "adx_mean")
+    return Vote("trend", min(adx_value / 50.0, 1.0), 0, False, value=adx_value)
+
+
+@graph.register("obv", inputs=("frame", "streams"))
+def _obv(frame, streams):
+    obv_value, obv_mean = _streamed(streams, "obv", lambda: indicators.obv(frame)[:2])
+    _check_nan(obv_value, "obv_value")
+    _check_nan(obv_mean, "obv_mean")
+    return _binary_vote("volume", obv_value > obv_mean)
+
+
+@graph.register("dscp", inputs=("market", "frame", "patterns"))
+def _dscp(market, frame, patterns):
+    return _force_vote(
+        "dscp", get_signal_candlestick_patterns(market, frame.tail(14), patterns)
+    )
+
+
+@graph.register("smr", inputs=("market", "frame", "smr_events"))
+def _smr(market, frame, smr_events):
+    return _force_vote("smr", get_signal_smr(market, frame, smr_events))
+
+
+# Nodes that can be enabled from TradingConfig.list_of_parameters
+SIGNALS = (
+    "vwap",
+    "rsi",
+    "tnk",
+    "macd",
+    "ema",
+    "atr",
+    "roc",
+    "st",
+    "bb",
+    "adx",
+    "obv",
+    "dscp",
+    "smr",
+)
+
+
+# --------------------- FINAL AVALIATION --------------------- #
+
+
+class MarketEvaluation:
+    """
+    One market in one cycle: its candle frame and the graph context holding
+    everything computed so far (swings, SMR events, stop levels...).
+    Pass it on to get_loss_and_profit_stops / is_iceberg so nothing
+    structural is recomputed within the cycle.
+
+    `streams` are the market_streams readings at the frame's last candle,
+    without them every indicator is computed from the frame.
+    """
+
+    def __init__(self, market: str, frame: CandleFrame, streams: Optional[dict] = None):
+        self.market = market
+        self.frame = frame
+        self.context = EvaluationContext(
+            graph, frame=frame, market=market, streams=streams
+        )
+        self.verdict: Optional[dict] = None
+
+    @classmethod
+    def load(cls, market: str) -> "MarketEvaluation":
+        # The frame and the streams read the same snapshot of the history
+        history = cache.cached_history(market=market)
+        return cls(
+            market,
+            CandleFrame(history[-WINDOW:]),
+            market_streams(market, history),
+        )
+
+    @property
+    def swings(self):
+        return self.context["swings"]
+
+    @property
+    def smr_events(self):
+        return self.context["smr_events"]
+
+    def evaluate(self, parameters: list[str]) -> dict:
+        parameters_lower = [p.lower() for p in parameters]
+        votes = self.context.evaluate(
+            dict.fromkeys(p for p in parameters_lower if p in SIGNALS)
+        )
+        self.verdict = verdict(votes, parameters_lower)
+        return self.verdict
+
+
+def evaluate_market(Market: str, parameters: list[str]) -> MarketEvaluation:
+    # Converted once, every indicator below reads the same columnar frame
+    evaluation = MarketEvaluation.load(Market)
+    evaluation.evaluate(parameters)
+    return evaluation
+
+
+def avaliation_of_market(Market: str, parameters: list[str]) -> dict:
+    return evaluate_market(Market, parameters).verdict
+
+
+def verdict(votes: Dict[str, Vote], parameters_lower: list[str]) -> dict:
+    """Aggregate the votes of one market into direction, confidence and grades."""
+    bull_votes = sum(1 for v in votes.values() if v.side > 0)
+    bear_votes = sum(1 for v in votes.values() if v.side < 0)
+    total_signals = sum(1 for v in votes.values() if v.counted)
+
+    category_scores = {"trend": [], "momentum": [], "volume": [], "structure": []}
+    for vote in votes.values():
+        if vote.score is not None:
+            category_scores[vote.category].append(vote.score)
+
+    adx_val = votes["adx"].value if "adx" in votes else 20.0
+    atr_ratio = votes["atr"].score if "atr" in votes else 0.5
 
     # Aggregate results
     direction = "neutral"
@@ -319,29 +438,39 @@ def avaliation_of_market(Market: str, parameters: list[str]) -> dict:
 # --------------------- LOSS AND PROFIT STOPS --------------------- #
 
 
-def get_loss_and_profit_stops(market: str, direction: str):
-    """
-    This function serves to get the stop_loss and take_profit of a determinited market.
-    Based on the strength and confidence of the market movement.
-    Determining the market based on previous smr.
-    """
-
-    candles = cache.cached_p42(market)
-    actual_value = candles[-1][4]
-    stop_losses_events = indicators.smr(candles=candles)
-
+@graph.register("stop_levels", inputs=("frame", "smr_events"))
+def _stop_levels(frame, smr_events):
+    """Most recent structural high and low (None when there is none)."""
     last_high_val = None
     last_low_val = None
 
-    # 1. Iterate to find the MOST RECENT structural points
-    for a in stop_losses_events:
+    for a in smr_events:
         i = a["index"]
         idx = max(0, i - 2)
 
         if a["type"] in ("HH", "LH"):
-            last_high_val = candles[idx][2]
+            last_high_val = float(frame.high[idx])
         elif a["type"] in ("HL", "LL"):
-            last_low_val = candles[idx][3]
+            last_low_val = float(frame.low[idx])
+
+    return last_high_val, last_low_val
+
+
+def get_loss_and_profit_stops(
+    market: str, direction: str, evaluation: Optional[MarketEvaluation] = None
+):
+    """
+    This function serves to get the stop_loss and take_profit of a determinited market.
+    Based on the strength and confidence of the market movement.
+    Determining the market based on previous smr.
+    """
+    if evaluation is None:
+        evaluation = MarketEvaluation.load(market)
+
+    actual_value = float(evaluation.frame.close[-1])
+
+    # 1. The MOST RECENT structural points, from this cycle's SMR events
+    last_high_val, last_low_val = evaluation.context["stop_levels"]
 
     # 2. Assign SL based on direction
     if direction == "buy":
@@ -368,15 +497,24 @@ def get_loss_and_profit_stops(market: str, direction: str):
 # --------------------- ICEBERG HELPER --------------------- #
 
 
-def is_iceberg(symbol: str, maximum_share: float, amount: float, price: float):
-    candles = np.asarray(cached_p14(symbol), dtype=float)
+def is_iceberg(
+    symbol: str,
+    maximum_share: float,
+    amount: float,
+    price: float,
+    evaluation: Optional[MarketEvaluation] = None,
+):
+    if evaluation is not None:
+        volumes = evaluation.frame.tail(14).volume
+    else:
+        volumes = CandleFrame(cached_p14(symbol)).volume
 
-    if len(candles) < 14:
-        logger.error(f"Not enough candles to check iceberg: {len(candles)}")
+    if len(volumes) < 14:
+        logger.error(f"Not enough candles to check iceberg: {len(volumes)}")
         return False, amount
 
     # Take only the last 14 volume entries and average them
-    avg_vol = np.mean(candles[-14:, 5])
+    avg_vol = np.mean(volumes[-14:])
 
     if avg_vol == 0:
         logger.error("Not enough volume to check iceberg.")
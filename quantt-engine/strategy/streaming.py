@@ -0,0 +1,515 @@
+"""
+streaming.py
+Stateful counterparts of strategy.indicators with O(1) per-candle updates.
+
+Each indicator is seeded once from history, then fed with:
+    update(candle)        -> a new candle opened, the previous one is final
+    replace_last(candle)  -> the newest (still forming) candle changed
+    push(candle)          -> picks one of the above from the candle timestamp
+
+Candles use the ccxt layout [ts, open, high, low, close, volume] and values
+match the last value of the batch functions in strategy.indicators.
+
+IndicatorStreams bundles the ones the signal graph reads, per series, with
+the rolling means the graph compares them against.
+"""
+
+import copy
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# ------------------------------ Base classes ------------------------------ #
+
+
+class StreamingIndicator:
+    """
+    Recursive indicator: `_step(state, candle)` returns a new state and never
+    mutates the old one, so the state before the newest candle is kept around
+    and replace_last() only has to step from it again.
+    """
+
+    def __init__(self):
+        self._before_last = None
+        self._state = None
+        self.last_timestamp = None
+
+    def _step(self, state, candle):
+        raise NotImplementedError
+
+    def _value(self, state):
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        """Latest indicator value, None while the indicator is still warming up."""
+        if self._state is None:
+            return None
+        return self._value(self._state)
+
+    def seed(self, candles: List[List[float]]):
+        """Feed a history of candles, the last one is treated as still forming."""
+        for candle in candles:
+            self.update(candle)
+        return self
+
+    def update(self, candle: List[float]):
+        self._before_last = self._state
+        self._state = self._step(self._state, candle)
+        self.last_timestamp = candle[0]
+        return self.value
+
+    def replace_last(self, candle: List[float]):
+        if self._state is None:
+            return self.update(candle)
+        self._state = self._step(self._before_last, candle)
+        self.last_timestamp = candle[0]
+        return self.value
+
+    def push(self, candle: List[float]):
+        if self.last_timestamp is not None and candle[0] == self.last_timestamp:
+            return self.replace_last(candle)
+        return self.update(candle)
+
+    def snapshot(self) -> dict:
+        """Copy of the full internal state, see restore()."""
+        return copy.deepcopy(vars(self))
+
+    def restore(self, snapshot: dict):
+        vars(self).update(copy.deepcopy(snapshot))
+        return self
+
+
+class _WindowedIndicator(StreamingIndicator):
+    """
+    Rolling-window indicator: keeps the last `period` entries in a deque with
+    running sums. Sums are rebuilt from the window every `period` updates so
+    float drift cannot accumulate on long-lived streams.
+    """
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self._window = deque()
+        self._sums = None
+        self._since_rebuild = 0
+
+    def _entry(self, candle):
+        raise NotImplementedError
+
+    def _rebuild(self):
+        self._sums = [math.fsum(column) for column in zip(*self._window)]
+        self._since_rebuild = 0
+
+    def _add(self, entry, sign: float):
+        for k, v in enumerate(entry):
+            self._sums[k] += sign * v
+
+    @property
+    def value(self):
+        if len(self._window) < self.period:
+            return None
+        return self._value(self._window[-1])
+
+    def update(self, candle: List[float]):
+        entry = self._entry(candle)
+        self._window.append(entry)
+
+        if self._sums is None:
+            self._rebuild()
+        else:
+            self._add(entry, 1.0)
+            if len(self._window) > self.period:
+                self._add(self._window.popleft(), -1.0)
+
+            self._since_rebuild += 1
+            if self._since_rebuild >= self.period:
+                self._rebuild()
+
+        self.last_timestamp = candle[0]
+        return self.value
+
+    def replace_last(self, candle: List[float]):
+        if not self._window:
+            return self.update(candle)
+
+        entry = self._entry(candle)
+        self._add(self._window[-1], -1.0)
+        self._add(entry, 1.0)
+        self._window[-1] = entry
+
+        self.last_timestamp = candle[0]
+        return self.value
+
+
+# ---------------- TECHNICAL INDICATORS ---------------- #
+
+# ---------- EMA ----------#
+
+
+class StreamingEMA(StreamingIndicator):
+    """indicators.ema: seeded with the SMA of the first `period` closes."""
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self.alpha = 2.0 / (period + 1.0)
+
+    def _step(self, state, candle):
+        # state: (count, running sum while seeding | ema afterwards)
+        count, acc = state or (0, 0.0)
+        close = float(candle[4])
+
+        if count < self.period - 1:
+            return count + 1, acc + close
+        if count == self.period - 1:
+            return count + 1, (acc + close) / self.period
+        return count + 1, acc + self.alpha * (close - acc)
+
+    def _value(self, state):
+        count, acc = state
+        return acc if count >= self.period else None
+
+
+# ---------- RSI ----------#
+
+
+class StreamingRSI(StreamingIndicator):
+    """indicators.rsi (close-close): Wilder-smoothed gains and losses."""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+
+    def _step(self, state, candle):
+        # state: (deltas seen, previous close, avg gain, avg loss)
+        close = float(candle[4])
+        if state is None:
+            return 0, close, 0.0, 0.0
+
+        count, prev_close, avg_gain, avg_loss = state
+        delta = close - prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+
+        if count < self.period:
+            # Seeding: sums of the first `period` deltas, averaged on the last one
+            avg_gain += gain
+            avg_loss += loss
+            if count == self.period - 1:
+                avg_gain /= self.period
+                avg_loss /= self.period
+        else:
+            avg_gain = (avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (avg_loss * (self.period - 1) + loss) / self.period
+
+        return count + 1, close, avg_gain, avg_loss
+
+    def _value(self, state):
+        count, _, avg_gain, avg_loss = state
+        if count <= self.period:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+
+
+# ---------- ATR ----------#
+
+
+def _true_range(candle, prev_close: float) -> float:
+    high, low = float(candle[2]), float(candle[3])
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class StreamingATR(StreamingIndicator):
+    """indicators.atr: Wilder-smoothed true range, seeded with its SMA."""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+
+    def _step(self, state, candle):
+        # state: (true ranges seen, previous close, running sum | atr)
+        close = float(candle[4])
+        if state is None:
+            return 0, close, 0.0
+
+        count, prev_close, acc = state
+        tr = _true_range(candle, prev_close)
+
+        if count < self.period - 1:
+            acc += tr
+        elif count == self.period - 1:
+            acc = (acc + tr) / self.period
+        else:
+            acc = (acc * (self.period - 1) + tr) / self.period
+
+        return count + 1, close, acc
+
+    def _value(self, state):
+        count, _, acc = state
+        return acc if count >= self.period else None
+
+
+# ---------- ADX ----------#
+
+
+class StreamingADX(StreamingIndicator):
+    """indicators.adx: Wilder-smoothed TR / +DM / -DM, DX smoothed again into ADX."""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+
+    def _smooth(self, count, acc, x):
+        # Same seeding as indicators.adx smooth(): sum, then SMA, then Wilder
+        if count < self.period - 1:
+            return acc + x
+        if count == self.period - 1:
+            return (acc + x) / self.period
+        return (acc * (self.period - 1) + x) / self.period
+
+    def _step(self, state, candle):
+        # state: (moves seen, previous high, previous low, previous close,
+        #         smoothed tr, smoothed +dm, smoothed -dm, dx sum | adx)
+        high, low, close = float(candle[2]), float(candle[3]), float(candle[4])
+        if state is None:
+            return 0, high, low, close, 0.0, 0.0, 0.0, 0.0
+
+        count, prev_high, prev_low, prev_close, tr_s, plus_s, minus_s, adx = state
+
+        up_move = high - prev_high
+        down_move = prev_low - low
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+        tr = _true_range(candle, prev_close)
+
+        tr_s = self._smooth(count, tr_s, tr)
+        plus_s = self._smooth(count, plus_s, plus_dm)
+        minus_s = self._smooth(count, minus_s, minus_dm)
+
+        # Before the smoothing is seeded the batch version divides zeros
+        if count >= self.period - 1:
+            tr_safe = tr_s if tr_s >= 1e-10 else 1e-10
+            plus_di = 100 * (plus_s / tr_safe)
+            minus_di = 100 * (minus_s / tr_safe)
+            dx = 100 * abs(plus_di - minus_di) / (abs(plus_di) + abs(minus_di) + 1e-10)
+        else:
+            dx = 0.0
+
+        adx = self._smooth(count, adx, dx)
+
+        return count + 1, high, low, close, tr_s, plus_s, minus_s, adx
+
+    def _value(self, state):
+        count, adx = state[0], state[-1]
+        if count < self.period:
+            return None
+        # Same NaN / inf sweep as the batch version
+        if math.isnan(adx):
+            return 0.0
+        if math.isinf(adx):
+            return 100.0 if adx > 0 else 0.0
+        return adx
+
+
+# ---------- VWAP ----------#
+
+
+class StreamingVWAP(_WindowedIndicator):
+    """indicators.vwap: rolling-window VWAP, last price on zero-volume windows."""
+
+    def __init__(self, period: int = 14, use_typical_price: bool = True):
+        super().__init__(period)
+        self.use_typical_price = use_typical_price
+
+    def _entry(self, candle):
+        high, low, close = float(candle[2]), float(candle[3]), float(candle[4])
+        volume = float(candle[5])
+        price = (high + low + close) / 3 if self.use_typical_price else close
+        # (price * volume, volume, traded flag, price)
+        return price * volume, volume, 1.0 if volume != 0 else 0.0, price
+
+    def _value(self, last_entry):
+        pv_sum, vol_sum, traded, _ = self._sums
+        if traded < 0.5:
+            return last_entry[3]
+        return pv_sum / vol_sum
+
+
+# ---------- BB ----------#
+
+
+class StreamingBB(_WindowedIndicator):
+    """indicators.bollinger_bands: (upper, middle, lower) of the rolling window."""
+
+    def __init__(self, period: int = 20, std_dev_multiplier: float = 2.0):
+        super().__init__(period)
+        self.std_dev_multiplier = std_dev_multiplier
+        self._shift: Optional[float] = None
+
+    def _entry(self, candle):
+        close = float(candle[4])
+        # Moments are taken around the first close seen (assumed mean)
+        if self._shift is None:
+            self._shift = close
+        x = close - self._shift
+        return x, x * x
+
+    def _value(self, last_entry):
+        s1, s2 = self._sums
+        mean = s1 / self.period
+        std = math.sqrt(max(s2 / self.period - mean * mean, 0.0))
+
+        middle = mean + self._shift
+        upper = middle + (self.std_dev_multiplier * std)
+        lower = middle - (self.std_dev_multiplier * std)
+        return upper, middle, lower
+
+
+# ---------- OBV ----------#
+
+
+class StreamingOBV(StreamingIndicator):
+    """indicators.obv: cumulative signed volume."""
+
+    def _step(self, state, candle):
+        # state: (previous close, obv)
+        close, volume = float(candle[4]), float(candle[5])
+        if state is None:
+            return close, 0.0
+
+        prev_close, obv = state
+        if close > prev_close:
+            obv += volume
+        elif close < prev_close:
+            obv -= volume
+        return close, obv
+
+    def _value(self, state):
+        return state[1]
+
+
+# ---------- Rolling mean ----------#
+
+
+class StreamingMean(_WindowedIndicator):
+    """Mean of the last `period` values of a stream, fed [ts, value] pairs."""
+
+    def _entry(self, point):
+        return (float(point[1]),)
+
+    def _value(self, last_entry):
+        return self._sums[0] / self.period
+
+
+# ---------------- INDICATOR SET ---------------- #
+
+
+# signal_generator.graph nodes IndicatorStreams can stream
+STREAMED = ("vwap", "rsi", "ema", "atr", "bb", "adx", "obv")
+
+
+def _bandwidth(bands) -> float:
+    upper, middle, lower = bands
+    return (upper - lower) / middle if middle != 0 else math.nan
+
+
+class IndicatorStreams:
+    """
+    The streamed indicators of signal_generator.graph for one candle series,
+    with the graph's default periods. Each one also keeps the rolling mean
+    of as many of its values as its strategy.indicators series holds over a
+    `window`-candle frame, so readings() has the (value, mean) pairs those
+    functions return for the latest window (ADX averages its warmed-up
+    values only, indicators.adx also averages the leading zeros).
+    `names` limits the set (the graph computes the others from the frame).
+
+    advance() is thread-safe, the series is shared by whoever evaluates it.
+    """
+
+    def __init__(self, window: int = 42, names: Optional[Iterable[str]] = None):
+        self.window = window
+        self.names = STREAMED if names is None else tuple(names)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        streamed = {
+            "vwap": StreamingVWAP(14),
+            "rsi": StreamingRSI(14),
+            "ema": StreamingEMA(20),
+            "atr": StreamingATR(14),
+            "bb": StreamingBB(20),
+            "adx": StreamingADX(14),
+            "obv": StreamingOBV(),
+        }
+        self.indicators: Dict[str, StreamingIndicator] = {
+            name: indicator
+            for name, indicator in streamed.items()
+            if name in self.names
+        }
+        # Values each indicator has on a `window`-candle frame
+        window = self.window
+        lengths = {
+            "vwap": window - 13,
+            "rsi": window - 15,
+            "ema": window - 19,
+            "atr": window - 14,
+            "bb": window - 19,
+            "adx": window - 14,
+            "obv": window,
+        }
+        self.means = {name: StreamingMean(lengths[name]) for name in self.indicators}
+        self.last_timestamp = None
+
+    def push(self, candle: List[float]):
+        """StreamingIndicator.push for every indicator and its mean."""
+        for name, indicator in self.indicators.items():
+            value = indicator.push(candle)
+            if value is not None:
+                tracked = _bandwidth(value) if name == "bb" else value
+                self.means[name].push((candle[0], tracked))
+        self.last_timestamp = candle[0]
+
+    def readings(self) -> Dict[str, Optional[Tuple[float, ...]]]:
+        """
+        {name: (value, mean)}, (upper, middle, lower, mean bandwidth) for
+        "bb", None while an indicator or its mean is warming up.
+        """
+        readings = {}
+        for name, indicator in self.indicators.items():
+            value, mean = indicator.value, self.means[name].value
+            if value is None or mean is None:
+                readings[name] = None
+            elif name == "bb":
+                readings[name] = (*value, mean)
+            else:
+                readings[name] = (value, mean)
+        return readings
+
+    def advance(self, history: np.ndarray) -> Dict[str, Optional[Tuple[float, ...]]]:
+        """
+        Catch up with `history` ((n, 6) candles, oldest first, the last one
+        still forming) and return the readings. Only candles from the last one
+        pushed on are fed; the streams are reseeded from the whole history when
+        that candle is not in it any more (a gap, another series).
+
+        `history` must not change during the call: pass a snapshot such as
+        CandleStore.window() returns, never a view of a buffer still synced.
+        """
+        with self._lock:
+            start = 0
+            if self.last_timestamp is not None and len(history):
+                ts = history[:, 0]
+                start = int(np.searchsorted(ts, self.last_timestamp))
+                if start == len(ts) or ts[start] != self.last_timestamp:
+                    self._reset()
+                    start = 0
+
+            for candle in np.asarray(history[start:]).tolist():
+                self.push(candle)
+            return self.readings()
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Modules import each other from the quantt-engine root ("from data import cache")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def random_candles(n: int, seed: int = 0, start: int = 1_700_000_000_000, step=900_000):
+    """(n, 6) ccxt candles of a seeded random walk, `step` ms apart."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.r_[close[0], close[:-1]] + rng.normal(0, 0.2, n)
+    high = np.maximum(open_, close) + rng.exponential(0.5, n)
+    low = np.minimum(open_, close) - rng.exponential(0.5, n)
+    volume = rng.exponential(1000, n)
+    ts = start + np.arange(n) * step
+    return np.c_[ts, open_, high, low, close, volume]
+
+
+@pytest.fixture
+def candles():
+    return random_candles
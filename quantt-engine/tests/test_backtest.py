@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import backtesting.engine as bt
+
+HOUR = 60 * 60 * 1000
+# First candle opens on a funding settlement, the next one is 8 candles later
+T0 = (1_700_000_000_000 // bt.FUNDING_INTERVAL_MS + 1) * bt.FUNDING_INTERVAL_MS
+
+
+def _flat(n: int) -> np.ndarray:
+    ts = T0 + np.arange(n) * HOUR
+    return np.column_stack((ts, *np.full((4, n), 100.0), np.ones(n)))
+
+
+def test_fills_fees_and_funding(monkeypatch):
+    candles = _flat(16)
+    candles[10, 2] = 111.0  # long take profit at 110
+    candles[14, 1:5] = (106.0, 107.0, 105.5, 106.0)  # short stop 105 gapped
+
+    side = np.zeros(16, dtype=np.int8)
+    side[0], side[12] = 1, -1
+    stops = np.full((16, 2), np.nan)
+    stops[0], stops[12] = (95.0, 110.0), (105.0, 90.0)
+    signals = {"BTC/USDT": (side, np.ones(16), stops)}
+
+    monkeypatch.setattr(bt.Backtester, "signals", lambda self, candles: signals)
+    monkeypatch.setattr(
+        bt.risk_manager,
+        "r",
+        SimpleNamespace(
+            leverage=2, percentage_of_capital_per_trade=0.1, cross_isolated="isolated"
+        ),
+    )
+
+    backtester = bt.Backtester(
+        balance=10_000.0, parameters=[], execution_order="market", workers=1
+    )
+    result = backtester.run({"BTC/USDT": candles}, "1h")
+    long, short = result.trades
+
+    # Long: 20 filled at the next open, funding settled once while held
+    entry_fee, exit_fee = 20 * 100 * bt.TAKER_FEE, 20 * 110 * bt.TAKER_FEE
+    funding = 20 * 100 * bt.FUNDING_RATE
+    assert (long["side"], long["amount"]) == ("buy", 20)
+    assert (long["entry_price"], long["exit_price"]) == (100.0, 110.0)
+    assert long["exit_reason"] == "take_profit"
+    assert long["fees"] == pytest.approx(entry_fee + exit_fee)
+    assert long["funding"] == pytest.approx(funding)
+    assert long["pnl"] == pytest.approx(20 * 10 - entry_fee - exit_fee - funding)
+
+    # Short: sized on the balance after the long, stopped at the gapped open
+    amount = round(np.floor((10_000 + long["pnl"]) * 0.1 / 100 * 2 * 1000) / 1000, 2)
+    fees = amount * (100 + 106) * bt.TAKER_FEE
+    assert (short["side"], short["amount"]) == ("sell", amount)
+    assert (short["exit_price"], short["exit_reason"]) == (106.0, "stop_loss")
+    assert short["funding"] == 0.0
+    assert short["pnl"] == pytest.approx(-6 * amount - fees)
+
+    # Flat at the end: the balance moved by exactly the trades' P&L
+    total = long["pnl"] + short["pnl"]
+    assert result.balance == pytest.approx(10_000 + total)
+    assert result.balance_curve[-1]["balance"] == round(result.balance, 4)
+    assert [p["equity"] for p in result.equity_curve] == [
+        round(long["pnl"], 4),
+        round(total, 4),
+    ]
+    assert result.daily_trade_count == [
+        {"date": long["exit_time"].strftime("%Y-%m-%d"), "count": 2}
+    ]
+
+
+def test_signals_match_each_window_evaluated_alone(monkeypatch, candles):
+    rows = candles(400, seed=9)
+    parameters = [name.upper() for name in bt.sg.SIGNALS]
+    monkeypatch.setattr(bt, "CHUNK", 100)  # windows spread over several chunks
+    monkeypatch.setattr(
+        bt.risk.watcher, "get_config", lambda: SimpleNamespace(acceptable_confidence=0)
+    )
+
+    backtester = bt.Backtester(parameters=parameters, workers=1)
+    side, strength, stops = backtester.signals({"BTC/USDT": rows})["BTC/USDT"]
+
+    streams = bt.IndicatorStreams(bt.WINDOW)
+    for i, candle in enumerate(rows.tolist()):
+        streams.push(candle)
+        if i < bt.WINDOW - 1:
+            assert side[i] == 0
+            continue
+        evaluation = bt.sg.MarketEvaluation(
+            "BTC/USDT",
+            bt.CandleFrame(rows[i - bt.WINDOW + 1 : i + 1]),
+            streams.readings(),
+        )
+        verdict = evaluation.evaluate(parameters)
+        if verdict["direction"] == "neutral":
+            assert side[i] == 0
+            continue
+        assert side[i] == (1 if verdict["direction"] == "buy" else -1)
+        assert strength[i] == verdict["strength"]
+        expected = bt.sg.get_loss_and_profit_stops(
+            "BTC/USDT", verdict["direction"], evaluation
+        )
+        assert tuple(stops[i]) == expected[:2]
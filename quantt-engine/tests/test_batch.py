@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import strategy.batch as batch
+import strategy.indicators as indicators
+import strategy.signal_generator as sg
+from data.frame import CandleFrame
+
+INDICATORS = (
+    indicators.vwap,
+    indicators.rsi,
+    indicators.tenkan_and_kijun,
+    indicators.macd,
+    indicators.ema,
+    indicators.atr,
+    indicators.roc,
+    indicators.supertrend,
+    indicators.bollinger_bands,
+    indicators.adx,
+    indicators.obv,
+)
+
+
+def _windows(candles, symbols: int, seed: int):
+    windows = np.array([candles(42, seed=seed * 100 + i) for i in range(symbols)])
+    # Dead candles exercise the zero-volume branches
+    windows[0, 10:30, 5] = 0.0
+    return windows
+
+
+@pytest.mark.parametrize("indicator", INDICATORS, ids=lambda f: f.__name__)
+def test_batched_indicator_matches_each_window(candles, indicator):
+    windows = _windows(candles, symbols=6, seed=1)
+    batched = indicator(CandleFrame(windows))
+
+    for i, window in enumerate(windows):
+        single = indicator(CandleFrame(window))
+        for batched_value, value in zip(batched[:2], single[:2]):
+            batched_value = np.asarray(batched_value)[..., i]
+            if isinstance(value, str):
+                assert batched_value == value
+                continue
+            # Reductions over a stacked axis may round in another order
+            np.testing.assert_allclose(batched_value, np.asarray(value), rtol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_verdicts_match_single_symbol(candles, seed):
+    windows = _windows(candles, symbols=8, seed=seed)
+    markets = [f"M{i}/USDT" for i in range(len(windows))]
+    parameters = [name.upper() for name in sg.SIGNALS]
+
+    evaluations = batch.evaluate_frames(markets, windows, parameters)
+
+    for market, window, evaluation in zip(markets, windows, evaluations):
+        single = sg.MarketEvaluation(market, CandleFrame(window))
+        try:
+            expected = single.evaluate(parameters)
+        except ValueError:
+            assert evaluation is None
+            continue
+        if evaluation is not None:
+            assert evaluation.verdict == expected
+
+
+def test_markets_read_one_snapshot_per_market(monkeypatch, candles):
+    synced = {"n": 100}
+    history = candles(200, seed=7)
+    calls = []
+
+    def cached_history(market, timeframe=None):
+        calls.append(("history", market))
+        synced["n"] += 1  # every read sees a newer sync
+        return history[: synced["n"]].copy()
+
+    streamed = {}
+
+    def market_streams(market, snapshot):
+        calls.append(("streams", market))
+        streamed[market] = snapshot
+        return None
+
+    framed = {}
+
+    def evaluate_frames(markets, windows, parameters, streams=None):
+        framed.update(zip(markets, windows))
+        return [None] * len(markets)
+
+    monkeypatch.setattr(batch.cache, "cached_history", cached_history)
+    monkeypatch.setattr(sg, "market_streams", market_streams)
+    monkeypatch.setattr(batch, "evaluate_frames", evaluate_frames)
+    monkeypatch.setattr(sg, "evaluate_market", lambda market, parameters: market)
+
+    markets = [f"M{i}/USDT" for i in range(4)]
+    batch.evaluate_markets(markets, ["RSI"])
+
+    # Streams advance on the snapshot before anything else syncs
+    assert calls == [(call, m) for m in markets for call in ("history", "streams")]
+    for market in markets:
+        np.testing.assert_array_equal(framed[market], streamed[market][-sg.WINDOW :])
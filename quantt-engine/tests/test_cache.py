@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from data import cache
+from utils import math
+
+
+@pytest.mark.parametrize("timeframe", ["1m", "15m", "1h", "4h", "1d", "1w"])
+def test_window_ttl_refreshes_the_forming_candle(timeframe):
+    until_close = math.next_candle_close(timeframe) / 1000 - time.time()
+    ttl = cache._window_ttl(("BTC/USDT", timeframe, None))
+
+    assert 0.0 <= ttl <= math.get_cache_timing(timeframe)
+    assert ttl <= until_close + 1.0
+
+
+def test_get_or_load_waits_for_load_many():
+    ttl_cache = cache.TTLCache(60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load_batch(keys):
+        calls.append(("batch", tuple(keys)))
+        started.set()
+        release.wait(5)
+        return {"a": 1}  # "b" failed
+
+    def load_one(key):
+        calls.append(("single", key))
+        return 2
+
+    prefetch = threading.Thread(
+        target=ttl_cache.load_many, args=(["a", "b"], load_batch)
+    )
+    prefetch.start()
+    started.wait(5)
+
+    results = {}
+    readers = [
+        threading.Thread(
+            target=lambda k=k: results.update(
+                {k: ttl_cache.get_or_load(k, lambda: load_one(k))}
+            )
+        )
+        for k in ("a", "b")
+    ]
+    for reader in readers:
+        reader.start()
+    deadline = time.time() + 5
+    while ttl_cache.coalesced < 2 and time.time() < deadline:
+        time.sleep(0.001)
+    assert ttl_cache.coalesced == 2  # both readers wait on the batch
+    release.set()
+    for thread in [prefetch, *readers]:
+        thread.join(5)
+
+    assert results == {"a": 1, "b": 2}
+    assert calls == [("batch", ("a", "b")), ("single", "b")]
+    # Fresh and in-flight keys are left alone
+    assert ttl_cache.load_many(["a", "b"], load_batch) == {}
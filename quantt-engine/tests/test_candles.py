@@ -0,0 +1,132 @@
+import threading
+import time
+
+import numpy as np
+
+import data.candles as candles_module
+from data.archive import OHLCVArchive
+from data.candles import CandleStore, RingBuffer
+
+MINUTE = 60_000
+
+
+def test_ring_buffer_tail_is_contiguous_after_wrapping():
+    buffer = RingBuffer(capacity=4)
+    for ts in range(7):
+        buffer.append([ts, 0, 0, 0, 0, 0])
+    buffer.replace_last([6, 1, 1, 1, 1, 1])
+
+    np.testing.assert_array_equal(buffer.tail(3)[:, 0], [4, 5, 6])
+    assert buffer.tail(10).shape == (4, 6)
+    assert buffer.tail(1)[0, 4] == 1
+
+
+def test_held_window_survives_later_syncs(monkeypatch, candles):
+    now = time.time() * 1000
+    history = candles(60, start=int(now // MINUTE - 59) * MINUTE, step=MINUTE)
+    served = {"n": 50}
+
+    def get_ohlcv(symbol, timeframe, limit, since=None):
+        rows = history[: served["n"]]
+        rows = rows if since is None else rows[rows[:, 0] >= since]
+        return rows[-limit:].tolist()
+
+    monkeypatch.setattr(candles_module.fetch, "get_OHLCV", get_ohlcv)
+    store = CandleStore(capacity=5)
+    store.sync("A/USDT", "1m")
+    window = store.window("A/USDT", "1m", 5)
+
+    served["n"] = 52
+    store.sync("A/USDT", "1m")
+
+    np.testing.assert_array_equal(window, history[45:50])
+
+
+class _SlowArchive:
+    """Archive whose restart backfill takes a while, nothing is stored."""
+
+    def __init__(self):
+        self.seeded = []
+
+    def sync(self, exchange, symbol, timeframe):
+        self.seeded.append(symbol)
+        time.sleep(0.05)
+
+    def read(self, exchange, symbol, timeframe):
+        return np.empty((0, 6))
+
+    def append(self, exchange, symbol, timeframe, rows):
+        return 0
+
+    def fill_gaps(self, exchange, symbol, timeframe):
+        return []
+
+
+def test_concurrent_syncs_keep_the_buffer_consistent(monkeypatch, candles):
+    now = time.time() * 1000
+    history = candles(120, start=int(now // MINUTE - 119) * MINUTE, step=MINUTE)
+
+    def exchange_rows(since, limit):
+        time.sleep(0.001)  # let the other threads interleave
+        rows = history if since is None else history[history[:, 0] >= since]
+        return rows[-limit:].tolist()
+
+    monkeypatch.setattr(
+        candles_module.fetch,
+        "get_OHLCV",
+        lambda symbol, timeframe, limit, since=None: exchange_rows(since, limit),
+    )
+    archive = _SlowArchive()
+    store = CandleStore(capacity=50, archive=archive)
+    markets = ["A/USDT", "B/USDT", "C/USDT"]
+
+    def fetch_many(requests):
+        return {
+            m: exchange_rows(since, limit) for m, (limit, since) in requests.items()
+        }
+
+    def worker(i):
+        for _ in range(20):
+            if i % 2:
+                store.sync_many(markets, "1m", "test", fetch_many)
+            else:
+                store.sync(markets[i % 3], "1m", "test")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each series is seeded (and backfilled) once, every sync lands in it
+    assert sorted(archive.seeded) == markets
+    for market in markets:
+        window = store.window(market, "1m", 50, "test")
+        np.testing.assert_array_equal(window, history[-50:])
+
+
+def test_seeding_fills_archive_gaps(monkeypatch, tmp_path, candles):
+    now = time.time() * 1000
+    history = candles(200, start=int(now // MINUTE - 199) * MINUTE, step=MINUTE)
+
+    def get_ohlcv(symbol, timeframe, limit, since=None):
+        rows = history if since is None else history[history[:, 0] >= since]
+        return rows[:limit].tolist() if since is not None else rows[-limit:].tolist()
+
+    monkeypatch.setattr(candles_module.fetch, "get_OHLCV", get_ohlcv)
+    monkeypatch.setattr("data.archive.fetch.get_OHLCV", get_ohlcv)
+
+    archive = OHLCVArchive(root=tmp_path)
+    # An older run stored the start of the series with a hole in it
+    archive.append("test", "A/USDT", "1m", np.delete(history[:120], range(40, 60), 0))
+    assert archive.gaps("test", "A/USDT", "1m")
+
+    store = CandleStore(capacity=50, archive=archive)
+    store.sync("A/USDT", "1m", "test")
+
+    assert archive.gaps("test", "A/USDT", "1m") == []
+    # Every closed candle is stored, the forming one is only in the buffer
+    np.testing.assert_array_equal(archive.read("test", "A/USDT", "1m"), history[:-1])
+    np.testing.assert_array_equal(
+        store.window("A/USDT", "1m", 50, "test"), history[-50:]
+    )
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+import strategy.indicators as indicators
+import utils.math as smath
+from data.frame import CandleFrame
+
+
+def _baseline_supertrend(candles, period: int = 10, multiplier: float = 3.0):
+    """The per-candle SuperTrend loop indicators.supertrend replaced."""
+    highs, lows, closes = candles[:, 2], candles[:, 3], candles[:, 4]
+
+    atr_values = np.zeros(len(candles))
+    for i in range(1, len(candles)):
+        atr_values[i] = max(
+            highs[i] - lows[i],
+            abs(highs[i] - closes[i - 1]),
+            abs(lows[i] - closes[i - 1]),
+        )
+
+    st_series = [0.0] * len(candles)
+    direction = [1] * len(candles)
+    upper_band = np.zeros(len(candles))
+    lower_band = np.zeros(len(candles))
+
+    for i in range(period, len(candles)):
+        current_atr = np.mean(atr_values[max(1, i - period + 1) : i + 1])
+        median_price = (highs[i] + lows[i]) / 2
+        basic_ub = median_price + (multiplier * current_atr)
+        basic_lb = median_price - (multiplier * current_atr)
+
+        if basic_ub < upper_band[i - 1] or closes[i - 1] > upper_band[i - 1]:
+            upper_band[i] = basic_ub
+        else:
+            upper_band[i] = upper_band[i - 1]
+
+        if basic_lb > lower_band[i - 1] or closes[i - 1] < lower_band[i - 1]:
+            lower_band[i] = basic_lb
+        else:
+            lower_band[i] = lower_band[i - 1]
+
+        if closes[i] > upper_band[i - 1]:
+            direction[i] = 1
+        elif closes[i] < lower_band[i - 1]:
+            direction[i] = -1
+        else:
+            direction[i] = direction[i - 1]
+
+        st_series[i] = lower_band[i] if direction[i] == 1 else upper_band[i]
+
+    last_dir = "up" if direction[-1] == 1 else "down"
+    return float(st_series[-1]), last_dir, st_series[period:]
+
+
+@pytest.mark.parametrize("seed, period", [(0, 10), (1, 10), (2, 7), (3, 14)])
+def test_supertrend_is_bit_exact_with_the_baseline_loop(candles, seed, period):
+    rows = candles(3000, seed=seed)
+
+    assert indicators.supertrend(rows, period) == _baseline_supertrend(rows, period)
+
+
+def _windows(rows, n: int):
+    return np.swapaxes(sliding_window_view(rows, n, axis=0), 1, 2)
+
+
+def test_batched_candlestick_patterns_match_each_window(candles):
+    rows = candles(800, seed=4)
+    rows[100:130, 5] = 0.0  # dead candles
+    rows[500:520, 1] = rows[500:520, 4]  # dojis
+    windows = _windows(rows, 14)
+
+    batched = indicators.detect_candlestick_patterns(CandleFrame(windows))
+
+    assert len(batched) == len(windows)
+    for window, patterns in zip(windows, batched):
+        single = indicators.detect_candlestick_patterns(CandleFrame(window))
+        assert patterns.tolist() == single.tolist()
+
+
+def test_batched_smr_matches_each_window(candles):
+    rows = candles(800, seed=5)
+    rows[300:345, 5] = 0.0  # whole windows without volume
+    rows[600:610, 2:5] = rows[600, 2]  # tied swing highs
+    windows = _windows(rows, 42)
+
+    batched = indicators.smr(CandleFrame(windows))
+
+    assert len(batched) == len(windows)
+    for window, events in zip(windows, batched):
+        frame = CandleFrame(window)
+        swings = smath.swing_indices(frame.high, frame.low)
+        assert events == indicators.smr(frame)
+        assert events == indicators.smr(frame, swings=swings)
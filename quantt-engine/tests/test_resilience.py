@@ -0,0 +1,55 @@
+import ccxt
+import pytest
+
+import data.resilience as resilience
+
+
+class _Client:
+    def __init__(self, id, errors):
+        self.id = id
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"id": "1"}
+
+    def create_order(self, *args, **kwargs):
+        return self._call()
+
+    def fetch_order(self, *args, **kwargs):
+        return self._call()
+
+
+@pytest.fixture(autouse=True)
+def _no_waiting(monkeypatch):
+    monkeypatch.setattr(resilience.limiter, "acquire", lambda *a, **k: None)
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+
+
+@pytest.mark.parametrize(
+    "error", [ccxt.RequestTimeout, ccxt.ExchangeNotAvailable, ccxt.NetworkError]
+)
+def test_orders_are_not_retried_after_network_errors(error):
+    client = _Client(f"orders-{error.__name__}", [error("connection dropped")])
+
+    with pytest.raises(error):
+        resilience.exchange_call("create_order", "BTC/USDT", client=client)
+    assert client.calls == 1
+
+
+@pytest.mark.parametrize("error", [ccxt.RateLimitExceeded, ccxt.DDoSProtection])
+def test_orders_are_retried_after_rate_limits(error):
+    client = _Client(f"limits-{error.__name__}", [error("slow down")])
+
+    assert resilience.exchange_call("create_order", "BTC/USDT", client=client)
+    assert client.calls == 2
+
+
+def test_reads_are_retried_after_network_errors():
+    client = _Client("reads", [ccxt.ExchangeNotAvailable("down")])
+
+    assert resilience.exchange_call("fetch_order", "1", client=client)
+    assert client.calls == 2
@@ -0,0 +1,138 @@
+import ccxt
+import numpy as np
+import pytest
+
+from exchange.simulator import MAKER_FEE, TAKER_FEE, SimulatedExchange
+
+SYMBOL = "BTC/USDT"
+MINUTE = 60_000
+ORIGIN = 1_700_000_040_000  # a minute open
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> int:
+        return int(self.now)
+
+
+def _exchange(bars):
+    """
+    Simulator replaying `bars` (open, high, low, close) one minute apart from
+    ORIGIN, after a flat candle closing at 100. The clock starts at ORIGIN.
+    """
+    rows = [(ORIGIN - MINUTE, 100.0, 100.0, 100.0, 100.0, 1.0)]
+    rows += [(ORIGIN + i * MINUTE, *bar, 1.0) for i, bar in enumerate(bars)]
+
+    exchange = SimulatedExchange([SYMBOL], start=ORIGIN)
+    exchange._replay = True
+    exchange._candles[SYMBOL] = np.array(rows, dtype=float)
+    exchange.milliseconds = Clock(ORIGIN)
+    return exchange
+
+
+def _close_all(exchange, bars: int):
+    """Move the clock past the close of the first `bars` bars."""
+    exchange.milliseconds.now = ORIGIN + bars * MINUTE
+
+
+def _position(exchange) -> float:
+    positions = exchange.fetch_positions([SYMBOL])
+    if not positions:
+        return 0.0
+    side = 1 if positions[0]["side"] == "long" else -1
+    return side * positions[0]["contracts"]
+
+
+def test_stop_wins_over_take_profit_hit_in_the_same_candle():
+    exchange = _exchange([(100, 100.5, 99.5, 100), (100, 104, 96, 100)])
+    exchange.create_order(SYMBOL, "market", "buy", 1.0)
+    # The take profit is placed first, matching order must not decide
+    take_profit = exchange.create_order(
+        SYMBOL,
+        "take_profit_market",
+        "sell",
+        1.0,
+        params={"stopPrice": 103, "reduceOnly": True},
+    )
+    stop = exchange.create_order(
+        SYMBOL, "stop_market", "sell", 1.0, params={"stopPrice": 97, "reduceOnly": True}
+    )
+
+    _close_all(exchange, 2)
+
+    assert exchange.fetch_order(stop["id"])["status"] == "closed"
+    assert exchange.fetch_order(stop["id"])["average"] == 97
+    assert exchange.fetch_order(take_profit["id"])["status"] == "expired"
+    assert _position(exchange) == 0.0
+
+
+def test_stop_fills_at_the_open_when_the_candle_gaps_past_it():
+    exchange = _exchange([(100, 100.5, 99.5, 100), (95, 96, 94, 95)])
+    exchange.create_order(SYMBOL, "market", "buy", 1.0)
+    stop = exchange.create_order(
+        SYMBOL, "stop_market", "sell", 1.0, params={"stopPrice": 97, "reduceOnly": True}
+    )
+
+    _close_all(exchange, 2)
+
+    assert exchange.fetch_order(stop["id"])["average"] == 95
+
+
+def test_limit_fills_at_its_price_as_maker():
+    exchange = _exchange([(100, 100.5, 99.5, 100), (100, 100, 97.5, 98.5)])
+    wallet = exchange.fetch_balance()["USDT"]["total"]
+    order = exchange.create_order(SYMBOL, "limit", "buy", 2.0, 98)
+
+    _close_all(exchange, 1)
+    assert exchange.fetch_order(order["id"])["status"] == "open"
+
+    _close_all(exchange, 2)
+    filled = exchange.fetch_order(order["id"])
+    assert filled["status"] == "closed"
+    assert filled["average"] == 98
+    assert filled["fee"]["cost"] == pytest.approx(2.0 * 98 * MAKER_FEE)
+    assert _position(exchange) == 2.0
+    assert exchange._wallets["USDT"] == pytest.approx(wallet - 2.0 * 98 * MAKER_FEE)
+
+
+def test_crossing_limit_takes_unless_post_only():
+    exchange = _exchange([(100, 100.5, 99.5, 100)])
+
+    with pytest.raises(ccxt.OrderImmediatelyFillable):
+        exchange.create_order(SYMBOL, "limit", "buy", 1.0, 101, {"postOnly": True})
+
+    order = exchange.create_order(SYMBOL, "limit", "buy", 1.0, 101)
+    assert order["status"] == "closed"
+    assert order["average"] == 100
+    assert order["fee"]["cost"] == pytest.approx(100 * TAKER_FEE)
+
+
+def test_reduce_only_is_capped_to_the_position_and_expires_without_one():
+    exchange = _exchange([(100, 100.5, 99.5, 100), (100, 100, 96, 97)])
+    exchange.create_order(SYMBOL, "market", "buy", 1.0)
+    stop = exchange.create_order(
+        SYMBOL, "stop_market", "sell", 5.0, params={"stopPrice": 97, "reduceOnly": True}
+    )
+    # Would open a long, but there is no short to reduce
+    orphan = exchange.create_order(
+        SYMBOL, "stop_market", "buy", 1.0, params={"stopPrice": 99, "reduceOnly": True}
+    )
+
+    _close_all(exchange, 2)
+
+    assert exchange.fetch_order(stop["id"])["filled"] == 1.0
+    assert exchange.fetch_order(orphan["id"])["status"] == "expired"
+    assert _position(exchange) == 0.0
+
+
+def test_order_placed_mid_candle_skips_the_rest_of_it():
+    exchange = _exchange([(100, 100.5, 97, 100), (100, 100.5, 99, 100)])
+    exchange.milliseconds.now = ORIGIN + MINUTE / 2
+    # The first candle already traded at 97, but before the order existed
+    order = exchange.create_order(SYMBOL, "limit", "buy", 1.0, 98)
+
+    _close_all(exchange, 2)
+
+    assert exchange.fetch_order(order["id"])["status"] == "open"
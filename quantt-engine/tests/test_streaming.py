@@ -0,0 +1,185 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import data.candles as candles_module
+import strategy.batch as batch
+import strategy.indicators as indicators
+import strategy.signal_generator as sg
+import strategy.streaming as streaming
+from data.candles import CandleStore
+from data.frame import CandleFrame
+
+STREAMS = (
+    (streaming.StreamingVWAP, indicators.vwap),
+    (streaming.StreamingRSI, indicators.rsi),
+    (streaming.StreamingEMA, indicators.ema),
+    (streaming.StreamingATR, indicators.atr),
+    (streaming.StreamingBB, indicators.bollinger_bands),
+    (streaming.StreamingADX, indicators.adx),
+    (streaming.StreamingOBV, indicators.obv),
+)
+
+
+def _rows(candles, n: int = 120, seed: int = 3):
+    rows = candles(n, seed=seed)
+    # Dead candles exercise the zero-volume branches
+    rows[30:40, 5] = 0.0
+    return rows
+
+
+def _expected(indicator, rows):
+    return indicator(CandleFrame(np.asarray(rows)))[0]
+
+
+def _assert_matches(stream, indicator, rows):
+    np.testing.assert_allclose(
+        np.asarray(stream.value), np.asarray(_expected(indicator, rows)), rtol=1e-9
+    )
+
+
+def _forming(row):
+    """`row` as it looks later in the same candle."""
+    row = row.copy()
+    row[4] += 1.5
+    row[2] = max(row[2], row[4])
+    row[5] += 250.0
+    return row
+
+
+@pytest.mark.parametrize(
+    "cls, indicator", STREAMS, ids=lambda x: getattr(x, "__name__", "")
+)
+def test_streaming_matches_indicator(candles, cls, indicator):
+    rows = _rows(candles)
+
+    stream = cls().seed(rows[:80].tolist())
+    _assert_matches(stream, indicator, rows[:80])
+
+    # Past the windowed rebuilds too
+    for k in range(80, 110):
+        stream.update(rows[k].tolist())
+        _assert_matches(stream, indicator, rows[: k + 1])
+
+    snapshot = stream.snapshot()
+    forming = _forming(rows[110])
+    stream.update(rows[110].tolist())
+    stream.replace_last(forming.tolist())
+    _assert_matches(stream, indicator, np.vstack([rows[:110], forming]))
+
+    stream.push(rows[110].tolist())  # same timestamp, replaces again
+    _assert_matches(stream, indicator, rows[:111])
+
+    stream.restore(snapshot)
+    _assert_matches(stream, indicator, rows[:110])
+    stream.update(rows[110].tolist())
+    _assert_matches(stream, indicator, rows[:111])
+
+
+def test_indicator_streams_match_window(candles):
+    window = _rows(candles, n=sg.WINDOW, seed=5)
+    readings = streaming.IndicatorStreams(sg.WINDOW).advance(window)
+
+    frame = CandleFrame(window)
+    expected = {
+        "vwap": indicators.vwap(frame)[:2],
+        "rsi": indicators.rsi(frame)[:2],
+        "ema": indicators.ema(frame)[:2],
+        "atr": indicators.atr(frame)[:2],
+        "bb": sg._bb_reading(frame),
+        "obv": indicators.obv(frame)[:2],
+    }
+    for name, values in expected.items():
+        np.testing.assert_allclose(readings[name], values, rtol=1e-9, err_msg=name)
+    # The ADX mean skips the warm-up zeros indicators.adx averages in
+    assert readings["adx"][0] == pytest.approx(indicators.adx(frame)[0], rel=1e-9)
+
+
+def test_indicator_streams_advance_like_a_reseed(candles):
+    rows = _rows(candles, n=150, seed=7)
+    streams = streaming.IndicatorStreams(sg.WINDOW)
+
+    streams.advance(rows[:60])
+    streams.advance(np.vstack([rows[:70], _forming(rows[70])]))
+    readings = streams.advance(rows[20:120])  # the cache trims old candles
+
+    expected = streaming.IndicatorStreams(sg.WINDOW).advance(rows[:120])
+    for name, values in expected.items():
+        np.testing.assert_allclose(readings[name], values, rtol=1e-9, err_msg=name)
+
+    # A history that does not contain the last candle pushed reseeds
+    readings = streams.advance(rows[130:150])
+    expected = streaming.IndicatorStreams(sg.WINDOW).advance(rows[130:150])
+    assert readings.keys() == expected.keys()
+    for name, values in expected.items():
+        if values is None:
+            assert readings[name] is None
+        else:
+            np.testing.assert_allclose(readings[name], values, rtol=1e-9)
+
+
+def test_batch_verdicts_read_streams(candles):
+    histories = [_rows(candles, n=200, seed=10 + i) for i in range(6)]
+    windows = np.array([history[-sg.WINDOW :] for history in histories])
+    streams = [
+        streaming.IndicatorStreams(sg.WINDOW).advance(history) for history in histories
+    ]
+    streams[2] = None  # falls back to the frame
+    markets = [f"M{i}/USDT" for i in range(len(windows))]
+    parameters = [name.upper() for name in sg.SIGNALS]
+
+    evaluations = batch.evaluate_frames(markets, windows, parameters, streams)
+
+    for market, window, readings, evaluation in zip(
+        markets, windows, streams, evaluations
+    ):
+        single = sg.MarketEvaluation(market, CandleFrame(window), readings)
+        try:
+            expected = single.evaluate(parameters)
+        except ValueError:
+            assert evaluation is None
+            continue
+        if evaluation is not None:
+            assert evaluation.verdict == expected
+
+
+def test_streams_advance_while_the_store_syncs(monkeypatch, candles):
+    minute = 60_000
+    now = time.time() * 1000
+    history = candles(400, start=int(now // minute - 399) * minute, step=minute)
+    served = {"n": 100}
+
+    def get_ohlcv(symbol, timeframe, limit, since=None):
+        rows = history[: served["n"]]
+        rows = rows if since is None else rows[rows[:, 0] >= since]
+        return rows[-limit:].tolist()
+
+    monkeypatch.setattr(candles_module.fetch, "get_OHLCV", get_ohlcv)
+    store = CandleStore(capacity=60)
+    store.sync("A/USDT", "1m")
+    done = threading.Event()
+
+    streams = streaming.IndicatorStreams(sg.WINDOW)
+
+    def syncer():
+        while served["n"] < len(history):
+            # Stay within the buffer, a reseed would hide skipped candles
+            while history[served["n"] - 30, 0] > (streams.last_timestamp or 0):
+                time.sleep(0.0001)
+            served["n"] += 1
+            store.sync("A/USDT", "1m")
+        done.set()
+
+    thread = threading.Thread(target=syncer)
+    thread.start()
+    while not done.is_set():
+        streams.advance(store.window("A/USDT", "1m", store.capacity))
+    thread.join()
+    readings = streams.advance(store.window("A/USDT", "1m", store.capacity))
+
+    # Seeded from the first window held, then no candle skipped or folded twice
+    expected = streaming.IndicatorStreams(sg.WINDOW).advance(history[40:])
+    for name, values in expected.items():
+        np.testing.assert_allclose(readings[name], values, rtol=1e-9, err_msg=name)
@@ -1,11 +1,22 @@
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+except ImportError:  # numba only ships with the "backtest" extra
+    njit = None
 
 # -------------------------------- Helpers ----------------------------------------- #
 
 
-def average_volume(candles: np.ndarray, period: int = 20) -> float:
-    vols = candles[-period:, 5]
-    return float(vols.mean())
+def average_volume(candles: np.ndarray, period: int = 20):
+    """Mean of the last `period` volumes, one per window for stacked (..., n, 6) candles."""
+    mean = candles[..., -period:, 5].mean(axis=-1)
+    return float(mean) if np.ndim(mean) == 0 else mean
 
 
 def candle_parts(c):
@@ -16,30 +27,280 @@ def candle_parts(c):
     return body, upper_wick, lower_wick
 
 
+def candle_parts_columns(candles: np.ndarray):
+    """Vectorized candle_parts: body, upper wick and lower wick arrays for every candle."""
+    o, h, l, c_ = candles[..., 1], candles[..., 2], candles[..., 3], candles[..., 4]
+    body = np.abs(c_ - o)
+    upper_wick = h - np.maximum(o, c_)
+    lower_wick = np.minimum(o, c_) - l
+    return body, upper_wick, lower_wick
+
+
+def swing_masks(
+    highs: np.ndarray, lows: np.ndarray, left: int = 2, right: int = 2
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Boolean masks of swing highs / lows along the last axis: candles that are
+    the extreme of their [i - left, i + right] window (False at the edges).
+    """
+    high_mask = np.zeros(highs.shape, dtype=bool)
+    low_mask = np.zeros(lows.shape, dtype=bool)
+    width = left + right + 1
+    n = highs.shape[-1]
+    if n < width:
+        return high_mask, low_mask
+
+    window_max = sliding_window_view(highs, width, axis=-1).max(axis=-1)
+    window_min = sliding_window_view(lows, width, axis=-1).min(axis=-1)
+
+    high_mask[..., left : n - right] = highs[..., left : n - right] == window_max
+    low_mask[..., left : n - right] = lows[..., left : n - right] == window_min
+    return high_mask, low_mask
+
+
+def swing_indices(
+    highs: np.ndarray, lows: np.ndarray, left: int = 2, right: int = 2
+) -> tuple[np.ndarray, np.ndarray]:
+    """Indices of swing highs / lows: the extreme of their [i - left, i + right] window."""
+    high_mask, low_mask = swing_masks(highs, lows, left, right)
+    return np.flatnonzero(high_mask), np.flatnonzero(low_mask)
+
+
 def swing_points(candles: np.ndarray, left: int = 2, right: int = 2):
     highs = candles[:, 2]
     lows = candles[:, 3]
 
-    swing_highs = []
-    swing_lows = []
+    high_idxs, low_idxs = swing_indices(highs, lows, left, right)
 
-    for i in range(left, len(candles) - right):
-        if highs[i] == np.max(highs[i - left : i + right + 1]):
-            swing_highs.append((i, highs[i]))
-        if lows[i] == np.min(lows[i - left : i + right + 1]):
-            swing_lows.append((i, lows[i]))
+    swing_highs = [(int(i), highs[i]) for i in high_idxs]
+    swing_lows = [(int(i), lows[i]) for i in low_idxs]
 
     return swing_highs, swing_lows
 
 
-def clamp_multiplier(value: float, min_v: float = -25.0, max_v: float = 25.0) -> float:
-    return float(np.clip(value, min_v, max_v))
+def rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Sum of every full `period` window along the last axis, computed from
+    cumulative sums in O(n). Leading axes (e.g. symbols) are independent.
+    """
+    values = np.asarray(values, dtype=float)
+    lead, n = values.shape[:-1], values.shape[-1]
+    if period <= 0 or n < period:
+        return np.empty(lead + (0,), dtype=float)
+
+    # Cumulative sums restart every `period` values: a window is then a block
+    # suffix plus the next block's prefix, so rounding stays at window scale
+    # instead of growing with the length of the whole series.
+    blocks = -(-n // period)
+    padded = np.zeros(lead + (blocks * period,))
+    padded[..., :n] = values
+    csum = np.cumsum(padded.reshape(lead + (blocks, period)), axis=-1)
+
+    block, offset = np.divmod(np.arange(n - period + 1), period)
+    head = np.where(offset > 0, csum[..., block, offset - 1], 0.0)
+    tail = np.where(
+        offset > 0, csum[..., np.minimum(block + 1, blocks - 1), offset - 1], 0.0
+    )
+    return csum[..., block, -1] - head + tail
+
+
+def rolling_mean_std(values: np.ndarray, period: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and population standard deviation of every full `period` window
+    along the last axis.
+
+    Moments are summed on values shifted by the series mean (assumed-mean
+    compensation) so sum(x^2) - sum(x)^2 / n does not cancel away the
+    variance of high-priced, low-volatility series.
+    """
+    values = np.asarray(values, dtype=float)
+    if period <= 0 or values.shape[-1] < period:
+        empty = np.empty(values.shape[:-1] + (0,), dtype=float)
+        return empty, empty
+
+    shift = values.mean(axis=-1, keepdims=True)
+    shifted = values - shift
+
+    s1 = rolling_sum(shifted, period)
+    s2 = rolling_sum(shifted * shifted, period)
+
+    mean = s1 / period
+    variance = np.maximum(s2 / period - mean * mean, 0.0)
+
+    return mean + shift, np.sqrt(variance)
+
+
+# ------------------------------ Recursive filters ---------------------------------- #
+
+# Largest exponent a filter block may reach, keeps decay ** -k far from overflow
+_MAX_BLOCK_EXPONENT = 300.0
+
+
+def jit(func):
+    """Compile `func` with numba when it is installed, otherwise return it untouched."""
+    if njit is None:
+        return func
+    return njit(cache=True, nogil=True)(func)
+
+
+@jit
+def _recursive_filter_loop(values, alpha, initial):
+    rows, n = values.shape
+    out = np.empty((rows, n))
+    for r in range(rows):
+        prev = initial[r]
+        for i in range(n):
+            prev = prev + alpha * (values[r, i] - prev)
+            out[r, i] = prev
+    return out
+
+
+def recursive_filter(values: np.ndarray, alpha: float, initial) -> np.ndarray:
+    """
+    First-order recursive filter y[i] = (1 - alpha) * y[i-1] + alpha * x[i]
+    along the last axis, starting from y[-1] = initial (same output as
+    scipy.signal.lfilter). `initial` is a scalar or one value per leading row.
+
+    Without numba the recurrence is solved in closed form block by block:
+    y[k] = decay^(k+1) * (y[-1] + sum_j alpha * x[j] * decay^-(j+1)),
+    with blocks sized so decay^-k never overflows.
+    """
+    values = np.asarray(values, dtype=float)
+    lead, n = values.shape[:-1], values.shape[-1]
+    initial = np.broadcast_to(np.asarray(initial, dtype=float), lead)
+    if n == 0:
+        return np.empty(values.shape, dtype=float)
+
+    if njit is not None:
+        out = _recursive_filter_loop(
+            np.ascontiguousarray(values.reshape(-1, n)),
+            float(alpha),
+            np.ascontiguousarray(initial.reshape(-1)),
+        )
+        return out.reshape(values.shape)
+
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return values.copy()
+
+    log_decay = np.log(decay)
+    block = int(min(n, max(1.0, _MAX_BLOCK_EXPONENT // -log_decay)))
+    steps = np.arange(1, block + 1)
+    growth = np.exp(-log_decay * steps)
+    shrink = np.exp(log_decay * steps)
+
+    out = np.empty_like(values)
+    prev = initial.copy()
+    for start in range(0, n, block):
+        chunk = values[..., start : start + block]
+        size = chunk.shape[-1]
+        acc = np.cumsum(alpha * chunk * growth[:size], axis=-1)
+        out[..., start : start + size] = shrink[:size] * (prev[..., None] + acc)
+        prev = out[..., start + size - 1]
+
+    return out
+
+
+def wilder_smoothing(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder's running average along the last axis, seeded with the SMA of the
+    first `period` values: y[i] = (y[i-1] * (period - 1) + x[i]) / period.
+
+    Returns the seed followed by the smoothed tail (n - period + 1 values).
+    """
+    values = np.asarray(values, dtype=float)
+    if values.shape[-1] < period:
+        return np.empty(values.shape[:-1] + (0,), dtype=float)
+
+    seed = values[..., :period].mean(axis=-1)
+    tail = recursive_filter(values[..., period:], 1.0 / period, seed)
+    return np.concatenate((seed[..., None], tail), axis=-1)
+
+
+def ema_series(values: np.ndarray, period: int, seed: str = "first") -> np.ndarray:
+    """
+    Exponential moving average with alpha = 2 / (period + 1) along the last axis.
+
+    seed="first": starts from the first value, returns n points.
+    seed="sma":   starts from the SMA of the first `period` values,
+                  returns n - period + 1 points.
+    """
+    values = np.asarray(values, dtype=float)
+    alpha = 2.0 / (period + 1.0)
+
+    if seed == "first":
+        if values.shape[-1] == 0:
+            return np.empty(values.shape, dtype=float)
+        tail = recursive_filter(values[..., 1:], alpha, values[..., 0])
+        return np.concatenate((values[..., :1], tail), axis=-1)
+
+    if seed == "sma":
+        if values.shape[-1] < period:
+            return np.empty(values.shape[:-1] + (0,), dtype=float)
+        start = values[..., :period].mean(axis=-1)
+        tail = recursive_filter(values[..., period:], alpha, start)
+        return np.concatenate((start[..., None], tail), axis=-1)
+
+    raise ValueError(f"seed must be 'first' or 'sma', actual seed: {seed}")
+
+
+def clamp_multiplier(value, min_v: float = -25.0, max_v: float = 25.0):
+    """Clamp a multiplier (or an array of them) to [min_v, max_v]."""
+    if np.ndim(value) == 0:
+        # Called per event by the structural walks, np.clip costs more than
+        # the comparison itself on scalars (NaN passes through either way)
+        return float(min(max(value, min_v), max_v))
+    return np.clip(value, min_v, max_v)
 
 
 def scale_0_100(value: float, max_value: float) -> float:
     return round(min(abs(value) / max_value, 1.0) * 100, 2)
 
 
+_TIMEFRAME_UNITS_MS = {
+    "s": 1000,
+    "m": 60 * 1000,
+    "h": 60 * 60 * 1000,
+    "d": 24 * 60 * 60 * 1000,
+    "w": 7 * 24 * 60 * 60 * 1000,
+    "M": 30 * 24 * 60 * 60 * 1000,
+    "y": 365 * 24 * 60 * 60 * 1000,
+}
+
+
+def timeframe_to_ms(tm: str) -> int:
+    """Length of a ccxt timeframe ("15m", "4h", "1d"...) in milliseconds."""
+    amount, unit = tm[:-1], tm[-1]
+    if unit not in _TIMEFRAME_UNITS_MS or not amount.isdigit():
+        raise ValueError(f"Unsupported timeframe: {tm}")
+    return int(amount) * _TIMEFRAME_UNITS_MS[unit]
+
+
+# Unix epoch fell on a Thursday, weekly candles open on Monday 00:00 UTC
+_WEEK_OFFSET_MS = 4 * _TIMEFRAME_UNITS_MS["d"]
+
+
+def next_candle_close(tm: str, now_ms: Optional[float] = None) -> int:
+    """
+    ms timestamp at which the candle of timeframe `tm` forming at `now_ms`
+    (default: now) closes. Boundaries are UTC, as exchanges align them.
+    """
+    now_ms = time.time() * 1000 if now_ms is None else now_ms
+    timeframe_ms = timeframe_to_ms(tm)
+    amount, unit = int(tm[:-1]), tm[-1]
+
+    if unit in ("M", "y"):
+        current = datetime.fromtimestamp(now_ms / 1000, tz=timezone.utc)
+        months = current.year * 12 + current.month - 1
+        step = amount if unit == "M" else 12 * amount
+        months = months - months % step + step
+        close = datetime(months // 12, months % 12 + 1, 1, tzinfo=timezone.utc)
+        return int(close.timestamp() * 1000)
+
+    offset = _WEEK_OFFSET_MS if unit == "w" else 0
+    return int((now_ms - offset) // timeframe_ms + 1) * timeframe_ms + offset
+
+
 def get_cache_timing(tm: str) -> int:
     if tm == "1m" or tm == "5m" or tm == "15m" or tm == "30m" or tm == "1h":
         return 60